@@ -0,0 +1,192 @@
+"""
+Matrices de transition empiriques sur l'historique des résultats (NumPy).
+
+Pour chaque jeu N d'une journée: couleur à la position k du premier groupe du jeu N
+-> couleurs présentes dans le premier groupe d'au moins un des jeux N+a..N+a+r
+(exactement la fenêtre vérifiée par le bot pour une prédiction issue du jeu N).
+Comptages par plage horaire (celle du jeu N) et par position k:
+    counts[plage, k, source, cible]  observations où la cible est présente dans la fenêtre
+    totals[plage, k, source]         observations complètes de la couleur source
+Construction en bloc depuis la base des résultats (une journée à la fois, vectorisée),
+puis mise à jour incrémentale à chaque nouveau jeu, sans tout recalculer.
+Les probabilités donnent des tables de règles suggérées, à comparer aux règles statiques.
+"""
+import logging
+from datetime import datetime
+
+import numpy as np
+
+from config import ALL_SUITS, MAX_GAME_NUMBER, SUIT_DISPLAY
+from engine import TIME_SLOT_RULES, WAT_TZ, time_slot_at
+from game_cycle import SUIT_CODES
+from parsing import get_suit_at_position
+
+logger = logging.getLogger(__name__)
+
+SLOTS = ('morning', 'afternoon', 'evening')
+SLOT_INDEX = {slot: i for i, slot in enumerate(SLOTS)}
+MAX_K = 3           # Positions k analysées (le premier groupe compte 2 ou 3 cartes)
+N_SUITS = len(ALL_SUITS)
+
+# Masque de couleurs (4 bits) -> présence de chaque couleur, dans l'ordre de ALL_SUITS
+_PRESENCE = np.array([[(mask >> i) & 1 for i in range(N_SUITS)] for mask in range(1 << N_SUITS)], dtype=np.int64)
+
+
+class TransitionMatrices:
+    """Matrices de transition par plage horaire et position k, pour un couple (a, r)."""
+
+    def __init__(self, a: int, r: int, max_k: int = MAX_K):
+        self.a = a
+        self.r = r
+        self.max_k = max_k
+        self.counts = np.zeros((len(SLOTS), max_k, N_SUITS, N_SUITS), dtype=np.int64)
+        self.totals = np.zeros((len(SLOTS), max_k, N_SUITS), dtype=np.int64)
+        self.days = 0
+        self.games = 0
+        # Journée en cours (indexée par numéro de jeu, case 0 inutilisée)
+        self.day = None
+        size = MAX_GAME_NUMBER + 1
+        self._known = np.zeros(size, dtype=bool)
+        self._masks = np.zeros(size, dtype=np.uint8)
+        self._codes = np.zeros((max_k, size), dtype=np.int8)    # code couleur (1-4) à la position k, 0 = absente
+        self._slots = np.zeros(size, dtype=np.int8)
+        self._counted = np.zeros(size, dtype=bool)
+
+    # --- Journée courante ---
+
+    def _start_day(self, day: str) -> bool:
+        """Passe à une nouvelle journée. False pour une journée antérieure (ignorée)."""
+        if day == self.day:
+            return True
+        if self.day is not None and day < self.day:
+            return False
+        self.day = day
+        self.days += 1
+        for array in (self._known, self._masks, self._codes, self._slots, self._counted):
+            array.fill(0)
+        return True
+
+    def _store(self, game: int, mask: int, first_group: str, slot: str) -> bool:
+        if not 1 <= game <= MAX_GAME_NUMBER or self._known[game]:
+            return False
+        self._known[game] = True
+        self._masks[game] = mask
+        self._slots[game] = SLOT_INDEX.get(slot, len(SLOTS) - 1)
+        for k in range(self.max_k):
+            suit = get_suit_at_position(first_group, k + 1)
+            self._codes[k, game] = SUIT_CODES[suit] if suit else 0
+        self.games += 1
+        return True
+
+    # --- Comptage ---
+
+    def _count(self, sources: np.ndarray) -> int:
+        """Compte les jeux sources dont la fenêtre N+a..N+a+r est complète et pas encore comptée."""
+        offsets = np.arange(self.a, self.a + self.r + 1)
+        sources = sources[(sources >= 1) & (sources + offsets[-1] <= MAX_GAME_NUMBER)]
+        sources = sources[self._known[sources] & ~self._counted[sources]]
+        if sources.size == 0:
+            return 0
+        window = sources[:, None] + offsets[None, :]
+        complete = self._known[window].all(axis=1)
+        sources, window = sources[complete], window[complete]
+        if sources.size == 0:
+            return 0
+
+        presence = _PRESENCE[np.bitwise_or.reduce(self._masks[window], axis=1)]
+        slots = self._slots[sources]
+        for k in range(self.max_k):
+            codes = self._codes[k, sources]
+            present = codes > 0
+            suit_index = codes[present] - 1
+            np.add.at(self.counts[:, k], (slots[present], suit_index), presence[present])
+            np.add.at(self.totals[:, k], (slots[present], suit_index), 1)
+        self._counted[sources] = True
+        return int(sources.size)
+
+    def add_result(self, day: str, game: int, first_group: str, mask: int, slot: str) -> int:
+        """
+        Mise à jour incrémentale avec un nouveau jeu finalisé (ordre d'arrivée quelconque
+        dans la journée). Retourne le nombre d'observations ajoutées.
+        """
+        if not self._start_day(day) or not self._store(game, mask, first_group, slot):
+            return 0
+        # Jeux sources dont la fenêtre contient ce jeu (et ce jeu lui-même comme source)
+        first = game - self.a - self.r
+        sources = np.arange(max(1, first), game + 1)
+        return self._count(sources)
+
+    def add_day(self, day: str, rows) -> int:
+        """Ajout en bloc d'une journée: rows = (jeu, premier groupe, masque, plage)."""
+        if not self._start_day(day):
+            return 0
+        for game, first_group, mask, slot in rows:
+            self._store(game, mask, first_group, slot)
+        return self._count(np.arange(1, MAX_GAME_NUMBER + 1))
+
+    def footprint(self) -> int:
+        """Empreinte des tableaux NumPy (octets)."""
+        return sum(array.nbytes for array in (self.counts, self.totals, self._known, self._masks,
+                                              self._codes, self._slots, self._counted))
+
+    # --- Résultats ---
+
+    def probabilities(self, slot: str, k: int) -> np.ndarray:
+        """P(cible présente dans la fenêtre | couleur source), matrice 4x4 (NaN sans observation)."""
+        counts = self.counts[SLOT_INDEX[slot], k - 1]
+        totals = self.totals[SLOT_INDEX[slot], k - 1][:, None]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(totals > 0, counts / np.maximum(totals, 1), np.nan)
+
+    def rule_hit_rate(self, slot: str, k: int, rules: dict):
+        """Taux de réussite attendu d'une table de règles {source: cible} (None sans observation)."""
+        counts = self.counts[SLOT_INDEX[slot], k - 1]
+        totals = self.totals[SLOT_INDEX[slot], k - 1]
+        total = int(totals.sum())
+        if not total:
+            return None
+        hits = sum(int(counts[i, ALL_SUITS.index(rules.get(suit, suit))]) for i, suit in enumerate(ALL_SUITS))
+        return hits / total
+
+    def suggest_rules(self, slot: str, k: int) -> dict:
+        """Table de règles suggérée: pour chaque couleur source, la cible la plus souvent présente."""
+        counts = self.counts[SLOT_INDEX[slot], k - 1]
+        totals = self.totals[SLOT_INDEX[slot], k - 1]
+        return {suit: ALL_SUITS[int(counts[i].argmax())] for i, suit in enumerate(ALL_SUITS) if totals[i]}
+
+    def report(self, k: int) -> str:
+        """Résumé texte pour la commande d'administration."""
+        lines = [f"📈 **Transitions k={k}, a={self.a}, r={self.r}** ({self.days} jour(s), {self.games} jeux)"]
+        for slot in SLOTS:
+            total = int(self.totals[SLOT_INDEX[slot], k - 1].sum())
+            lines.append(f"\n**{slot}** ({total} observations)")
+            if not total:
+                continue
+            probabilities = self.probabilities(slot, k)
+            suggested = self.suggest_rules(slot, k)
+            for i, suit in enumerate(ALL_SUITS):
+                if suit not in suggested:
+                    continue
+                row = ' '.join(f"{SUIT_DISPLAY[target]}{probabilities[i, j]:.0%}" for j, target in enumerate(ALL_SUITS))
+                lines.append(f"• {SUIT_DISPLAY[suit]} → {row} | suggéré: {SUIT_DISPLAY[suggested[suit]]}")
+            current = self.rule_hit_rate(slot, k, TIME_SLOT_RULES[slot])
+            best = self.rule_hit_rate(slot, k, suggested)
+            lines.append(f"• Réussite: règles actuelles {current:.1%} | suggérées {best:.1%}")
+        return '\n'.join(lines)
+
+
+def build_from_store(store, a: int, r: int, source: int = 1, max_k: int = MAX_K) -> TransitionMatrices:
+    """Construit les matrices depuis la base des résultats, une journée à la fois."""
+    matrices = TransitionMatrices(a, r, max_k)
+    day, rows = None, []
+    for row_day, game, first_group, mask, posted_at in store.iter_results(source):
+        if row_day != day:
+            if rows:
+                matrices.add_day(day, rows)
+            day, rows = row_day, []
+        slot = time_slot_at(datetime.fromisoformat(posted_at).astimezone(WAT_TZ)) if posted_at else SLOTS[-1]
+        rows.append((game, first_group, mask, slot))
+    if rows:
+        matrices.add_day(day, rows)
+    logger.info("Matrices de transition construites: %s jour(s), %s jeux", matrices.days, matrices.games)
+    return matrices
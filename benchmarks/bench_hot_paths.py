@@ -0,0 +1,268 @@
+"""
+Microbenchmarks des chemins exécutés à chaque message (moteur engine.py utilisé
+par main.py, et maihhn.py).
+
+- Analyse: extract_game_number, extract_parentheses_groups, normalize_suits,
+  get_suit_at_position, has_suit_in_group
+- Décision: predict_suit, can_predict_game, get_current_ecart
+- Vérification: check_game (moteur) / check_prediction_result (maihhn) avec 1, 100
+  et 10 000 prédictions actives
+- Persistance: save_config (fichier temporaire)
+
+Résultats en JSON (ns/opération), comparés à la référence benchmarks/baseline.json:
+le script échoue (code 1) si un benchmark régresse au-delà du seuil, et (code 2) si la
+référence est absente, pour que la vérification ne passe jamais sans rien comparer.
+Chaque mesure est la médiane de --runs exécutions, et la comparaison est ramenée à la
+vitesse du moment de la machine par une charge d'étalonnage fixe (calibration_ns): une
+machine partagée plus lente dans son ensemble ne passe pas pour une régression.
+La référence est mesurée sur une machine donnée: à régénérer (--save-baseline) en
+changeant de machine ou de version de Python.
+
+Usage:
+    python benchmarks/bench_hot_paths.py [--output results.json]
+    python benchmarks/bench_hot_paths.py --save-baseline
+    python benchmarks/bench_hot_paths.py --threshold 0.5 [--runs 3]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fixtures import SOURCE_1_MESSAGES, SOURCE_2_MESSAGES, FIRST_GROUPS  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_THRESHOLD = 0.5   # Marge pour le bruit des mesures sub-microseconde sur machine partagée
+DEFAULT_RUNS = 3
+CALIBRATION = 'calibration_ns'
+# Seuils propres aux mesures dominées par le disque (écriture de fichier), plus bruitées
+IO_THRESHOLDS = {'main.save_config': 1.0, 'maihhn.save_config': 1.0}
+PENDING_SIZES = (1, 100, 10000)
+
+
+def timeit_ns(func, min_time=0.2, repeat=5):
+    """Meilleur temps par appel (ns) sur `repeat` séries d'au moins `min_time` secondes."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        if time.perf_counter() - start >= min_time / 10:
+            break
+        number *= 2
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best * 1e9
+
+
+def calibration_work():
+    """Charge fixe de l'interpréteur (dictionnaire, chaînes, tri) servant d'étalon de vitesse."""
+    table = {i: str(i) for i in range(200)}
+    return sorted(table.values(), key=len)
+
+
+def cycle(items):
+    """Appelable renvoyant les éléments tour à tour (évite de mesurer un seul cas)."""
+    state = {'i': 0}
+    n = len(items)
+
+    def next_item():
+        state['i'] = (state['i'] + 1) % n
+        return items[state['i']]
+    return next_item
+
+
+def bench_parse(mod, prefix, results):
+    msg = cycle(SOURCE_1_MESSAGES + SOURCE_2_MESSAGES)
+    group = cycle(FIRST_GROUPS)
+    results[f'{prefix}.extract_game_number'] = timeit_ns(lambda: mod.extract_game_number(msg()))
+    results[f'{prefix}.extract_parentheses_groups'] = timeit_ns(lambda: mod.extract_parentheses_groups(msg()))
+    results[f'{prefix}.normalize_suits'] = timeit_ns(lambda: mod.normalize_suits(group()))
+    results[f'{prefix}.get_suit_at_position'] = timeit_ns(lambda: mod.get_suit_at_position(group(), 2))
+    results[f'{prefix}.has_suit_in_group'] = timeit_ns(lambda: mod.has_suit_in_group(group(), '♦'))
+
+
+def engine_target(engine):
+    """Le moteur exposé sous les noms des fonctions de maihhn.py, pour des mesures comparables."""
+    import parsing
+    from state import Prediction
+    return SimpleNamespace(
+        extract_game_number=parsing.extract_game_number,
+        extract_parentheses_groups=parsing.extract_parentheses_groups,
+        normalize_suits=parsing.normalize_suits,
+        get_suit_at_position=parsing.get_suit_at_position,
+        has_suit_in_group=parsing.has_suit_in_group,
+        predict_suit=engine.predict_suit,
+        can_predict_game=engine.can_predict_game,
+        get_current_ecart=engine.current_ecart,
+        check_game=engine.check_game,
+        state=engine.state,
+        Prediction=Prediction,
+    )
+
+
+def engine_state(mod):
+    """État mutable: EngineState (moteur) ou globals du module (maihhn.py)."""
+    return getattr(mod, 'state', mod)
+
+
+def pending_entry(mod, game):
+    if hasattr(mod, 'Prediction'):
+        return mod.Prediction(game, '♦', 2, created_at=0.0)
+    return {'message_id': 0, 'suit': '♦', 'suit_display': '♦️', 'status': '⏳', 'check_count': 0, 'max_checks': 2}
+
+
+def bench_decision(mod, prefix, results):
+    suit = cycle(['♠', '♥', '♦', '♣'])
+    state = engine_state(mod)
+    state.ecart_list = [2, 3, 4]
+    state.last_predicted_game = 1230
+    results[f'{prefix}.predict_suit'] = timeit_ns(lambda: mod.predict_suit(suit()))
+    results[f'{prefix}.can_predict_game'] = timeit_ns(lambda: mod.can_predict_game(1234))
+    results[f'{prefix}.get_current_ecart'] = timeit_ns(mod.get_current_ecart)
+
+
+def bench_verification(mod, prefix, results):
+    loop = asyncio.new_event_loop()
+    pending = engine_state(mod).pending_predictions
+    for size in PENDING_SIZES:
+        pending.clear()
+        for i in range(size):
+            # Aucune prédiction n'attend le jeu vérifié: parcours complet sans mutation (maihhn.py),
+            # simple consultation de l'index des jeux attendus (moteur)
+            pending[100 + i] = pending_entry(mod, 100 + i)
+        rounds = max(1, 20000 // size)
+
+        if hasattr(mod, 'check_game'):
+            results[f'{prefix}.check_game[{size}]'] = timeit_ns(lambda: mod.check_game(50), repeat=3)
+            continue
+
+        async def run(rounds=rounds):
+            for _ in range(rounds):
+                await mod.check_prediction_result(50, FIRST_GROUPS[0])
+
+        def call():
+            loop.run_until_complete(run())
+        results[f'{prefix}.check_prediction_result[{size}]'] = timeit_ns(call, repeat=3) / rounds
+    pending.clear()
+    loop.close()
+
+
+def bench_save_config(mod, prefix, results, tmpdir):
+    mod.CONFIG_FILE = os.path.join(tmpdir, f'{prefix}_config.json')
+    results[f'{prefix}.save_config'] = timeit_ns(mod.save_config)
+
+
+def run_all():
+    # Le niveau WARNING reproduit la production sans mesurer l'écriture des logs
+    logging.disable(logging.INFO)
+    from engine import PredictionEngine
+    import main
+    import maihhn
+
+    results = {}
+    # Étalonnage repris entre les groupes: la vitesse d'une machine partagée varie pendant l'exécution
+    calibration = [timeit_ns(calibration_work)]
+    for prefix, mod in (('engine', engine_target(PredictionEngine())), ('maihhn', maihhn)):
+        for bench in (bench_parse, bench_decision, bench_verification):
+            bench(mod, prefix, results)
+            calibration.append(timeit_ns(calibration_work))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for prefix, mod in (('main', main), ('maihhn', maihhn)):
+            bench_save_config(mod, prefix, results, tmpdir)
+    results[CALIBRATION] = statistics.median(calibration)
+    return {name: round(value, 1) for name, value in results.items()}
+
+
+def compare(results, baseline, threshold, speed: float = 1.0):
+    """
+    Liste des régressions (nom, référence, mesure, ratio) au-delà du seuil.
+    speed: étalonnage courant / étalonnage de la référence (> 1 = machine plus lente).
+    """
+    regressions = []
+    for name, reference in baseline.get('results', {}).items():
+        current = results.get(name)
+        if current is None or not reference:
+            continue
+        ratio = current / (reference * speed)
+        limit = 1 + baseline.get('thresholds', {}).get(name, threshold)
+        if ratio > limit:
+            regressions.append((name, reference, current, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--output', help="Écrit les résultats JSON dans ce fichier")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Fichier de référence")
+    parser.add_argument('--save-baseline', action='store_true', help="Enregistre les résultats comme référence")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Régression tolérée (0.5 = +50%%)")
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help="Exécutions (médiane par benchmark)")
+    args = parser.parse_args()
+
+    runs = [run_all() for _ in range(max(1, args.runs))]
+    results = {name: round(statistics.median(run[name] for run in runs), 1) for name in runs[0]}
+    report = {
+        'unit': 'ns/op',
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        CALIBRATION: results.pop(CALIBRATION),
+        'results': results,
+    }
+
+    if args.save_baseline:
+        thresholds = dict(IO_THRESHOLDS)
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                thresholds.update(json.load(f).get('thresholds', {}))   # Seuils ajustés à la main conservés
+        report['thresholds'] = thresholds
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    regressions = []
+    if not args.save_baseline:
+        if not os.path.exists(args.baseline):
+            print(json.dumps(report, indent=2, ensure_ascii=False))
+            print(f"ERREUR référence absente: {args.baseline} (générer avec --save-baseline)", file=sys.stderr)
+            return 2
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if (baseline.get('python'), baseline.get('machine')) != (report['python'], report['machine']):
+            print(f"ATTENTION référence mesurée sur Python {baseline.get('python')} / {baseline.get('machine')}",
+                  file=sys.stderr)
+        speed = report[CALIBRATION] / baseline[CALIBRATION] if baseline.get(CALIBRATION) else 1.0
+        report['speed'] = round(speed, 2)
+        regressions = compare(results, baseline, args.threshold, speed)
+        report['regressions'] = [
+            {'name': name, 'baseline': ref, 'current': cur, 'ratio': round(ratio, 2)}
+            for name, ref, cur, ratio in regressions
+        ]
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    print(output)
+
+    for name, ref, cur, ratio in regressions:
+        print(f"RÉGRESSION {name}: {ref} -> {cur} ns/op (x{ratio:.2f})", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Temps d'import des modules du bot, mesuré dans un interpréteur neuf (python -X importtime).
+
+Le moteur (engine.py) doit rester léger: aucune dépendance externe, aucun effet de bord.
+main.py et maihhn.py n'importent Telethon et aiohttp qu'au démarrage (run()).
+Avec --budget-ms, le script échoue (code 1) si l'import du moteur dépasse le budget.
+
+Usage:
+    python benchmarks/bench_import.py [--repeat 5] [--budget-ms 50] [--output imports.json]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ('engine', 'main', 'maihhn')
+
+
+def import_time_us(module: str) -> dict:
+    """Temps d'import cumulé (µs) du module et nombre de modules chargés, d'après -X importtime."""
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True, env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'},
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} a échoué:\n{proc.stderr[-2000:]}")
+    total = None
+    loaded = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        loaded += 1
+        _, cumulative, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        if name == module:
+            total = int(cumulative)
+    return {'cumulative_us': total, 'modules_loaded': loaded}
+
+
+def measure(modules, repeat: int) -> dict:
+    results = {}
+    for module in modules:
+        runs = [import_time_us(module) for _ in range(repeat)]
+        best = min(runs, key=lambda run: run['cumulative_us'])
+        results[module] = {'ms': round(best['cumulative_us'] / 1000, 2), 'modules_loaded': best['modules_loaded']}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--repeat', type=int, default=5, help="Mesures par module (la meilleure est retenue)")
+    parser.add_argument('--budget-ms', type=float, help="Temps d'import maximal du moteur (ms)")
+    parser.add_argument('--output', help="Écrit les résultats JSON dans ce fichier")
+    parser.add_argument('modules', nargs='*', default=MODULES)
+    args = parser.parse_args()
+
+    report = {
+        'unit': 'ms',
+        'python': platform.python_version(),
+        'results': measure(args.modules, args.repeat),
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    print(output)
+
+    engine = report['results'].get('engine')
+    if args.budget_ms is not None and engine is not None and engine['ms'] > args.budget_ms:
+        print(f"IMPORT TROP LENT engine: {engine['ms']} ms > {args.budget_ms} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
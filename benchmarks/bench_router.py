@@ -0,0 +1,94 @@
+"""
+Benchmark du coût de filtrage des gestionnaires par message (avant/après routeur).
+
+Reproduit le travail fait par Telethon pour chaque NewMessage: filtre `chats`
+des gestionnaires sources, puis `pattern.match` de chaque gestionnaire de
+commande (avant) ou le filtre chat privé + test de préfixe + dict (après).
+
+Usage: python benchmarks/bench_router.py [--json]
+"""
+import json
+import re
+import sys
+import time
+
+SOURCE_1 = -1003424179389
+SOURCE_2 = -1002682552255
+ADMIN = 1190237801
+
+# Flux réaliste: surtout des messages des canaux sources, quelques commandes admin
+MESSAGES = [
+    (SOURCE_1, False, "⏰#N1234. 6(K♥️5♣️1♦️) - 2(A♠️J♣️) #T8"),
+    (SOURCE_1, False, "✅#N1234. 6(K♥️5♣️1♦️) - 2(A♠️J♣️) #T8"),
+    (SOURCE_2, False, "🔰#N1235. 9(10♦️9♠️) - 7(Q♥️7♣️) #T16"),
+    (SOURCE_2, False, "✅#N1236. 3(4♠️9♥️) - 8(8♦️K♣️) #T11"),
+    (SOURCE_1, False, "✅#N1237. 1(J♣️A♦️) - 5(5♠️Q♥️) #T6"),
+    (ADMIN, True, "/status"),
+    (ADMIN, True, "/k 2"),
+    (ADMIN, True, "bonjour"),
+]
+
+OLD_PATTERNS = [
+    r'^/k\s*(\d+)$', r'^/a\s*(\d+)$', r'^/r\s*(\d+)$', r'^/eca\s*(.+)$',
+    '/inter', '/stop', '/status', '/reset', '/help', '/deploy',
+]
+OLD_MATCHERS = [re.compile(p).match for p in OLD_PATTERNS]
+
+COMMAND_RE = re.compile(r"/([A-Za-z_]+)(?:@\w+)?\s*(.*)", re.DOTALL)
+COMMANDS = {name: (None, True) for name in
+            ('k', 'a', 'r', 'eca', 'inter', 'stop', 'status', 'reset', 'help', 'deploy')}
+
+
+def dispatch_before(chat_id, is_private, text):
+    hits = 0
+    if chat_id == SOURCE_1:
+        hits += 1
+    if chat_id == SOURCE_2:
+        hits += 1
+    for matcher in OLD_MATCHERS:
+        if matcher(text):
+            hits += 1
+    return hits
+
+
+def dispatch_after(chat_id, is_private, text):
+    hits = 0
+    if chat_id == SOURCE_1:
+        hits += 1
+    if chat_id == SOURCE_2:
+        hits += 1
+    if is_private and text and text[0] == '/':
+        match = COMMAND_RE.match(text)
+        if match and match.group(1).lower() in COMMANDS:
+            hits += 1
+    return hits
+
+
+def measure(func, rounds=20000):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for chat_id, is_private, text in MESSAGES:
+            func(chat_id, is_private, text)
+    elapsed = time.perf_counter() - start
+    return elapsed / (rounds * len(MESSAGES)) * 1e9
+
+
+def main():
+    before = min(measure(dispatch_before) for _ in range(3))
+    after = min(measure(dispatch_after) for _ in range(3))
+    results = {
+        'benchmark': 'handler_dispatch_per_message',
+        'unit': 'ns',
+        'before': round(before, 1),
+        'after': round(after, 1),
+        'speedup': round(before / after, 2),
+    }
+    if '--json' in sys.argv:
+        print(json.dumps(results))
+    else:
+        for key, value in results.items():
+            print(f"{key}: {value}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Débit de publication avec un pool d'expéditeurs (sender_pool.py) sur des clients de substitution.
+
+Chaque client accepte `rate` envois ou éditions par canal et par `period` secondes, puis
+lève FloodWaitError comme Telegram (limites réduites pour que la mesure dure quelques
+secondes). Chaque prédiction est publiée puis éditée avec son statut final. On vérifie que
+chaque édition vient bien de l'expéditeur du message et on compare les tailles de pool.
+
+Usage:
+    python benchmarks/bench_sender_pool.py [--predictions 300] [--sizes 1,2,3] [--rate 20] [--period 0.2]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sender_pool import SenderPool  # noqa: E402
+from local_client import LocalClient, LocalNetwork  # noqa: E402
+
+CHANNEL = -1003430118891
+
+
+async def publish_all(size: int, predictions: int, rate: int, period: float) -> dict:
+    network = LocalNetwork()
+    clients = [LocalClient(f"bot{i}", network, rate=rate, period=period) for i in range(size)]
+    pool = SenderPool([(client.name, client) for client in clients], max_wait=60.0)
+
+    start = time.perf_counter()
+    sent = []
+    for game in range(1, predictions + 1):
+        message = await pool.send_message(CHANNEL, f"🔵{game}🔵:♠️ statut :⏳")
+        sent.append((game, message.id))
+    for game, message_id in sent:
+        await pool.edit_message(CHANNEL, message_id, f"🔵{game}🔵:♠️ statut :✅0️⃣")
+    elapsed = time.perf_counter() - start
+
+    final = [network.messages[(CHANNEL, message_id)] for _, message_id in sent]
+    status = pool.status()
+    return {
+        'senders': size,
+        'seconds': round(elapsed, 2),
+        'calls_per_s': round(2 * predictions / elapsed, 1),
+        'all_edited': all(message.text.endswith('✅0️⃣') for message in final),
+        'per_sender': {s['name']: s['sent'] + s['edited'] for s in status['senders']},
+        'flood_waits': sum(s['flood_waits'] for s in status['senders']),
+        'failovers': status['failovers'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--predictions', type=int, default=300)
+    parser.add_argument('--sizes', default='1,2,3', help="Tailles de pool mesurées")
+    parser.add_argument('--rate', type=int, default=20, help="Appels par canal et par période")
+    parser.add_argument('--period', type=float, default=0.2, help="Période de la limite (s)")
+    args = parser.parse_args()
+
+    results = [asyncio.run(publish_all(int(size), args.predictions, args.rate, args.period))
+               for size in args.sizes.split(',')]
+    print(json.dumps({'predictions': args.predictions, 'rate': args.rate, 'period': args.period,
+                      'results': results}, indent=2, ensure_ascii=False))
+    return 0 if all(result['all_edited'] for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,25 @@
+"""
+Messages réalistes des canaux sources utilisés par les benchmarks.
+Format observé: numéro de jeu `#N`, groupes de cartes entre parenthèses,
+marqueurs ⏰ (en cours), ✅ / 🔰 (finalisé).
+"""
+
+SOURCE_1_MESSAGES = [
+    "✅#N1234. 6(K♥️5♣️1♦️) - 2(A♠️J♣️) #T8",
+    "#N1235. ✅9(10♦️9♠️) - 7(Q♥️7♣️) #T16",
+    "🔰#N1236. 3(4♠️9♥️) - 8(8♦️K♣️) #T11 🔵#R",
+    "✅#N1237. 1(J♣️A♦️) - 5(5♠️Q♥️) #T6",
+    "#N1238. 0(K♠️Q♠️) - ✅8(3♦️5❤️) #T8",
+]
+
+SOURCE_2_MESSAGES = [
+    "#N1234. ✅6(K♥️5♣️1♦️) - 2(A♠️J♣️) #T8",
+    "#N1235. 9(10♦️9♠️) - ✅7(Q♥️7♣️) #T16",
+    "#N1236. 🔰3(4♠️9♥️) - 8(8♦️K♣️) #T11",
+]
+
+IN_PROGRESS_MESSAGES = [
+    "⏰#N1239. ▶️ 5(2♣️3♥️) - 4(A♦️3♠️) #T9",
+]
+
+FIRST_GROUPS = ["K♥️5♣️1♦️", "10♦️9♠️", "4♠️9♥️", "J♣️A♦️", "3♦️5❤️"]
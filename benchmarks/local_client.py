@@ -0,0 +1,108 @@
+"""
+Client Telegram de substitution en mémoire pour le pool d'expéditeurs (sender_pool.py):
+au plus `rate` envois ou éditions par chat et par période, puis FloodWaitError comme
+Telegram; seul l'auteur d'un message peut l'éditer, et un bot ne peut écrire dans un
+canal refusé (denied). Utilisé par bench_sender_pool.py et les tests, sans connexion
+Telegram.
+"""
+import asyncio
+import itertools
+import time
+from collections import deque
+
+
+class FloodWaitError(Exception):
+    """Même nom et attribut `seconds` que l'erreur Telethon."""
+
+    def __init__(self, seconds: float):
+        super().__init__(f"A wait of {seconds} seconds is required")
+        self.seconds = seconds
+
+
+class MessageAuthorRequiredError(Exception):
+    pass
+
+
+class MessageIdInvalidError(Exception):
+    pass
+
+
+class ChatWriteForbiddenError(Exception):
+    pass
+
+
+class UserIsBlockedError(Exception):
+    pass
+
+
+class LocalMessage:
+    __slots__ = ('id', 'chat_id', 'text', 'author')
+
+    def __init__(self, message_id: int, chat_id, text: str, author: str):
+        self.id = message_id
+        self.chat_id = chat_id
+        self.text = text
+        self.author = author
+
+
+class LocalNetwork:
+    """Messages des canaux, partagés par les clients de substitution (identifiants par canal)."""
+
+    def __init__(self):
+        self.messages = {}      # (chat, id) -> LocalMessage
+        self._ids = {}          # chat -> compteur d'identifiants
+
+    def post(self, chat, text: str, author: str) -> LocalMessage:
+        counter = self._ids.setdefault(chat, itertools.count(1))
+        message = LocalMessage(next(counter), chat, text, author)
+        self.messages[(chat, message.id)] = message
+        return message
+
+
+class LocalClient:
+    """
+    Client de substitution: au plus `rate` envois ou éditions par chat et par `period`
+    secondes, puis FloodWaitError comme Telegram. Seul l'auteur peut éditer un message.
+    """
+
+    def __init__(self, name: str, network: LocalNetwork = None, rate: int = 20, period: float = 60.0,
+                 latency: float = 0.0, clock=None, denied=()):
+        self.name = name
+        self.denied = set(denied)   # Canaux où ce bot n'est pas administrateur
+        self.network = network if network is not None else LocalNetwork()
+        self.rate = rate
+        self.period = period
+        self.latency = latency
+        self.clock = clock or time.monotonic
+        self._calls = {}        # chat -> instants des derniers appels
+        self.calls = 0
+
+    def _throttle(self, chat):
+        now = self.clock()
+        calls = self._calls.setdefault(chat, deque())
+        while calls and calls[0] <= now - self.period:
+            calls.popleft()
+        if len(calls) >= self.rate:
+            raise FloodWaitError(round(calls[0] + self.period - now, 3))   # Fractions possibles (period < 1s)
+        calls.append(now)
+        self.calls += 1
+
+    async def send_message(self, entity, message, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if entity in self.denied:
+            raise ChatWriteForbiddenError(entity)
+        self._throttle(entity)
+        return self.network.post(entity, message, self.name)
+
+    async def edit_message(self, entity, message_id: int, text, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        message = self.network.messages.get((entity, message_id))
+        if message is None:
+            raise MessageIdInvalidError(message_id)
+        if message.author != self.name:
+            raise MessageAuthorRequiredError(message_id)
+        self._throttle(entity)
+        message.text = text
+        return message
@@ -0,0 +1,200 @@
+"""
+Simulation accélérée et déterministe de journées de jeux sur le moteur (engine.py).
+
+- Horloge virtuelle (clock.VirtualClock) injectée dans le moteur et le planificateur:
+  reset de 00h59, plages horaires de 13h00 et 19h01, expirations des prédictions
+- 1440 jeux par jour (un par minute à partir du reset de 00h59 WAT), publiés par la
+  source 1 puis la source 2 avec un décalage tiré d'un générateur à graine fixe
+- Messages traités par le chemin de production engine.ingest(source, [(jeu, groupe, date)]),
+  avec la date virtuelle du message source (fraîcheur, cibles dépassées)
+- Coupure optionnelle (--outage N): chaque jour à 12h00, les messages de N minutes sont
+  retenus puis livrés en rafale, comme après une reconnexion (vérification groupée,
+  décisions périmées écartées: compteurs 'shed' du rapport)
+- Publication Telegram remplacée par un simple compteur d'identifiants de messages
+
+Une journée complète s'exécute en une fraction de seconde. Le rapport JSON (hors
+mesures de débit) est identique d'une exécution à l'autre pour une même graine.
+
+Usage:
+    python benchmarks/simulate_day.py [--days 1] [--seed 42] [--a 1] [--r 2] [--outage 0] [--output sim.json]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from clock import VirtualClock  # noqa: E402
+from config import PREDICTION_EXPIRY_MINUTES  # noqa: E402
+from engine import PredictionEngine, WAT_TZ  # noqa: E402
+from scheduler import Scheduler  # noqa: E402
+from state import Prediction, PredictionStatus  # noqa: E402
+
+RANKS = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
+SUITS = ['♠️', '❤️', '♦️', '♣️']
+GAMES_PER_DAY = 1440
+
+
+def random_group(rng: random.Random) -> str:
+    return ''.join(rng.choice(RANKS) + rng.choice(SUITS) for _ in range(rng.choice((2, 2, 3))))
+
+
+def day_events(day_start: datetime, rng: random.Random):
+    """(instant, source 1 ou 2, texte) des messages d'une journée, triés par instant."""
+    events = []
+    for game in range(1, GAMES_PER_DAY + 1):
+        # Jeu 1 vers 00h59 (juste après le reset), jeu 1440 avant le reset du lendemain
+        finished = day_start + timedelta(minutes=game - 1, seconds=rng.randint(5, 40))
+        player, banker = random_group(rng), random_group(rng)
+        text = f"#N{game}. ✅{rng.randint(0, 9)}({player}) - {rng.randint(0, 9)}({banker}) #T{rng.randint(2, 20)}"
+        events.append((finished - timedelta(seconds=30), 1, f"⏰#N{game}. ▶️ {player}"))
+        events.append((finished, 1, text))
+        events.append((finished + timedelta(seconds=rng.randint(1, 15)), 2, text))
+    events.sort(key=lambda event: event[0])
+    return events
+
+
+async def simulate(args):
+    first_day = datetime.fromisoformat(args.start).replace(hour=0, minute=59, tzinfo=WAT_TZ)
+    clock = VirtualClock(first_day - timedelta(seconds=30))
+    engine = PredictionEngine(clock=clock)
+    state = engine.state
+    for name, field in (('k', 'k_position'), ('a', 'a_offset'), ('r', 'r_offset')):
+        value = getattr(args, name)
+        if value is not None:
+            setattr(state, field, value)
+    state.intelligent_mode = args.intelligent
+
+    scheduler = Scheduler(WAT_TZ, clock=clock)
+    scheduler.add_daily('reset_quotidien', 0, 59, state.reset_cycle)
+    scheduler.add_daily('plage_morning', 0, 0, lambda: engine.set_time_slot('morning'))
+    scheduler.add_daily('plage_afternoon', 13, 0, lambda: engine.set_time_slot('afternoon'))
+    scheduler.add_daily('plage_evening', 19, 1, lambda: engine.set_time_slot('evening'))
+
+    outcomes = {status: 0 for status in PredictionStatus if status != PredictionStatus.PENDING}
+    published = 0
+
+    def close(finalized):
+        for pred in finalized:
+            outcomes[pred.status] += 1
+
+    def expire(game_number):
+        pred = engine.expire(game_number)
+        if pred is not None:
+            close([pred])
+
+    rng = random.Random(args.seed)
+    slot_changes = []
+    last_slot = engine.time_slot
+    processed = 0
+    started = time.perf_counter()
+
+    def deliver(source, batch):
+        """Lot de messages (texte, date) d'une source, comme drain_source en production."""
+        nonlocal published
+        results = []
+        for text, posted_at in batch:
+            parsed = engine.parse(source, text)
+            if parsed is not None:
+                results.append((*parsed, posted_at))
+        finalized, decision = engine.ingest(source, results)
+        close(finalized)
+        if decision is None:
+            return
+        published += 1
+        pred = Prediction(decision.target_game, decision.predicted_suit, state.r_offset + 1,
+                          message_id=published, created_at=clock.time())
+        pred.expiry_timer = scheduler.call_later(PREDICTION_EXPIRY_MINUTES * 60, expire, pred.game)
+        close(engine.add_prediction(pred))
+
+    for day in range(args.days):
+        day_start = first_day + timedelta(days=day)
+        outage_start = day_start.replace(hour=12, minute=0)
+        outage_end = outage_start + timedelta(minutes=args.outage)
+        held = {1: [], 2: []}   # Messages retenus pendant la coupure, par source
+        for moment, source, text in day_events(day_start, rng):
+            clock.set(moment)
+            scheduler.tick()
+            await asyncio.sleep(0)   # Laisse s'exécuter les tâches planifiées
+            if engine.time_slot != last_slot:
+                last_slot = engine.time_slot
+                slot_changes.append(f"{moment:%Y-%m-%d %H:%M:%S} {last_slot}")
+            processed += 1
+
+            if outage_start <= moment < outage_end:
+                held[source].append((text, clock.time()))
+                continue
+            for held_source, batch in held.items():
+                if batch:
+                    deliver(held_source, batch)
+                    batch.clear()
+            deliver(source, [(text, clock.time())])
+    # Fin de journée: expiration des dernières prédictions
+    clock.advance(PREDICTION_EXPIRY_MINUTES * 60 + 1)
+    scheduler.tick()
+    elapsed = time.perf_counter() - started
+
+    closed = sum(outcomes.values())
+    won = outcomes[PredictionStatus.WON]
+    simulated_seconds = clock.monotonic()
+    return {
+        'seed': args.seed,
+        'days': args.days,
+        'parameters': {'k': state.k_position, 'a': state.a_offset, 'r': state.r_offset,
+                       'intelligent': state.intelligent_mode},
+        'messages': processed,
+        'predictions': {
+            'published': published,
+            'won': won,
+            'lost': outcomes[PredictionStatus.LOST],
+            'expired': outcomes[PredictionStatus.EXPIRED],
+            'pending': len(state.pending_predictions),
+            'win_rate': round(won / closed, 4) if closed else None,
+        },
+        'shed': dict(engine.shed),
+        'slot_changes': slot_changes,
+        'daily_resets': scheduler.stats.get('reset_quotidien', {}).get('runs', 0),
+        'timing': {
+            'wall_s': round(elapsed, 3),
+            'simulated_s': round(simulated_seconds),
+            'speedup': round(simulated_seconds / elapsed) if elapsed else None,
+            'messages_per_s': round(processed / elapsed) if elapsed else None,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--days', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--start', default='2026-01-01', help="Date WAT de la première journée (AAAA-MM-JJ)")
+    parser.add_argument('--k', type=int, help="Position de la carte (défaut: configuration du bot)")
+    parser.add_argument('--a', type=int, help="Offset de prédiction")
+    parser.add_argument('--r', type=int, help="Nombre d'essais de vérification")
+    parser.add_argument('--intelligent', action='store_true', help="Mode intelligent")
+    parser.add_argument('--outage', type=int, default=0, help="Coupure quotidienne à 12h00 (minutes), livrée en rafale")
+    parser.add_argument('--verbose', action='store_true', help="Affiche les logs du moteur")
+    parser.add_argument('--output', help="Écrit le rapport JSON dans ce fichier")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.disable(logging.WARNING)
+    report = asyncio.run(simulate(args))
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
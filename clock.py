@@ -0,0 +1,57 @@
+"""
+Horloges injectables du moteur.
+- SystemClock: heure réelle (production)
+- VirtualClock: heure simulée, avancée explicitement (simulation accélérée, benchmarks déterministes)
+Le moteur lit l'heure uniquement via clock.now(tz), clock.time() et clock.monotonic().
+"""
+import time
+from datetime import datetime, timedelta, timezone
+
+
+class SystemClock:
+    """Horloge réelle."""
+
+    def now(self, tz=None) -> datetime:
+        return datetime.now(tz)
+
+    def time(self) -> float:
+        return time.time()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+
+class VirtualClock:
+    """
+    Horloge simulée: le temps n'avance que par advance() ou set().
+    L'horloge monotone suit les avances (jamais en arrière), l'heure murale peut sauter.
+    """
+
+    def __init__(self, start: datetime):
+        if start.tzinfo is None:
+            raise ValueError("VirtualClock attend une date avec fuseau horaire")
+        self._wall = start
+        self._mono = 0.0
+
+    def now(self, tz=None) -> datetime:
+        return self._wall.astimezone(tz) if tz is not None else self._wall.astimezone(timezone.utc).replace(tzinfo=None)
+
+    def time(self) -> float:
+        return self._wall.timestamp()
+
+    def monotonic(self) -> float:
+        return self._mono
+
+    def advance(self, seconds: float):
+        if seconds < 0:
+            raise ValueError("L'horloge virtuelle ne recule pas (utiliser set() pour un saut)")
+        self._wall += timedelta(seconds=seconds)
+        self._mono += seconds
+
+    def set(self, moment: datetime):
+        """Avance jusqu'à `moment` (ou fait sauter l'heure murale s'il est dans le passé)."""
+        delta = (moment - self._wall).total_seconds()
+        if delta >= 0:
+            self.advance(delta)
+        else:
+            self._wall = moment
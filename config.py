@@ -28,6 +28,9 @@ BOT_TOKEN = os.getenv('BOT_TOKEN') or ''
 
 PORT = int(os.getenv('PORT') or '10000')
 
+# Niveau de journalisation initial (modifiable à chaud avec /loglevel)
+LOG_LEVEL = os.getenv('LOG_LEVEL') or 'INFO'
+
 # Règles de prédiction selon les plages horaires béninoises (WAT = UTC+1)
 # Plage 1: 00h00 - 12h59 (minuit à midi)
 PREDICTION_RULES_MORNING = {
@@ -82,3 +85,89 @@ DEFAULT_A = 0           # Offset de prédiction par défaut
 DEFAULT_R = 1           # Nombre d'essais de vérification par défaut
 DEFAULT_ECART = 3       # Écart par défaut entre les prédictions (si #1 prédit, prochain #4)
 MAX_GAME_NUMBER = 1440  # Numéro de jeu maximum avant reset du cycle
+
+# Délai après lequel une prédiction dont les jeux de vérification ne sont jamais arrivés est clôturée ❌
+PREDICTION_EXPIRY_MINUTES = int(os.getenv('PREDICTION_EXPIRY_MINUTES') or '60')
+
+# Réplicas actif/veille: chemin de la base SQLite partagée du bail de publication.
+# Vide = instance unique (publie toujours).
+REPLICA_LEASE_PATH = os.getenv('REPLICA_LEASE_PATH') or ''
+LEASE_TTL_SECONDS = float(os.getenv('LEASE_TTL_SECONDS') or '3')
+
+# Base SQLite des résultats finalisés (import des exports, historique)
+RESULTS_DB_PATH = os.getenv('RESULTS_DB_PATH') or 'results.db'
+
+# Jeton d'accès aux routes HTTP d'administration (/debug/profile...). Vide = routes désactivées.
+ADMIN_HTTP_TOKEN = os.getenv('ADMIN_HTTP_TOKEN') or ''
+
+# Seuils des sondes /health et /ready
+HEALTH_MAX_LOOP_LAG = float(os.getenv('HEALTH_MAX_LOOP_LAG') or '1')        # Retard max de la boucle asyncio (s)
+HEALTH_MAX_FEED_AGE = float(os.getenv('HEALTH_MAX_FEED_AGE') or '600')      # Silence max d'un canal source (s)
+HEALTH_MAX_OUTBOUND = int(os.getenv('HEALTH_MAX_OUTBOUND') or '20')         # Envois Telegram en cours max
+HEALTH_MAX_SOURCE_BACKLOG = int(os.getenv('HEALTH_MAX_SOURCE_BACKLOG') or '50')    # Messages sources en attente max (par canal)
+HEALTH_MAX_FANOUT_PENDING = int(os.getenv('HEALTH_MAX_FANOUT_PENDING') or '5000')  # Notifications privées en attente max
+
+# Canaux sources utilisés pour vérifier les prédictions, par priorité décroissante (1 = source 1, 2 = source 2).
+# Le premier résultat publié d'un jeu vérifie les prédictions qui l'attendent, et une prédiction clôturée ne
+# l'est jamais à nouveau. Si une source plus prioritaire publie ensuite un résultat différent, il remplace le
+# premier pour les vérifications suivantes seulement, et le désaccord est signalé dans les logs.
+VERIFICATION_SOURCES = [int(x) for x in (os.getenv('VERIFICATION_SOURCES') or '2,1').split(',') if x.strip()]
+
+# Nombre de messages récents du canal de prédiction relus au démarrage pour reprendre les prédictions ⏳
+RECONCILE_HISTORY_LIMIT = int(os.getenv('RECONCILE_HISTORY_LIMIT') or '100')
+
+# Abonnés aux notifications privées (/subscribe): base SQLite et limites d'envoi de Telegram
+SUBSCRIBERS_DB_PATH = os.getenv('SUBSCRIBERS_DB_PATH') or 'subscribers.db'
+FANOUT_GLOBAL_RATE = int(os.getenv('FANOUT_GLOBAL_RATE') or '25')                     # Messages/s, tous chats confondus
+FANOUT_PER_CHAT_INTERVAL = float(os.getenv('FANOUT_PER_CHAT_INTERVAL') or '1')        # Délai min entre 2 messages d'un chat (s)
+
+# Fraîcheur: budget du p95 du retard source -> canal de prédiction (s) et taille de la fenêtre glissante
+LAG_BUDGET_SECONDS = float(os.getenv('LAG_BUDGET_SECONDS') or '20')
+LAG_WINDOW = int(os.getenv('LAG_WINDOW') or '200')
+
+# Âge max (s) d'un message source pour décider d'une prédiction: au-delà (rafale après reconnexion),
+# le résultat sert encore à la vérification mais la prédiction est écartée
+BACKLOG_MAX_AGE_SECONDS = float(os.getenv('BACKLOG_MAX_AGE_SECONDS') or '60')
+
+# Profils de stratégie supplémentaires (canal, k, a, r, écarts, mode), alimentés par la même ingestion.
+# Fichier JSON créé et mis à jour par la commande /profiles; absent = profil principal seul.
+PROFILES_PATH = os.getenv('PROFILES_PATH') or 'profiles.json'
+
+# Pool d'expéditeurs: jetons de bots supplémentaires (séparés par des virgules) qui se partagent
+# les envois et éditions dans les canaux de prédiction. Vide = client principal seul.
+SENDER_BOT_TOKENS = [t.strip() for t in (os.getenv('SENDER_BOT_TOKENS') or '').split(',') if t.strip()]
+SENDER_MAX_WAIT = float(os.getenv('SENDER_MAX_WAIT') or '30')     # Attente max (s) si tous les expéditeurs sont en FloodWait
+
+# Gouverneur mémoire: budget (Mo) des caches et historiques suivis, réduits au-delà. 0 = mesure seule.
+MEMORY_BUDGET_MB = float(os.getenv('MEMORY_BUDGET_MB') or '0')
+MEMORY_CHECK_INTERVAL = float(os.getenv('MEMORY_CHECK_INTERVAL') or '30')   # Période de vérification (s)
+
+# Fichiers du paquet de déploiement (/deploy, /download): main.py et maihhn.py partagent cette liste
+DEPLOY_FILES = (
+    'main.py',
+    'config.py',
+    'game_cycle.py',
+    'scheduler.py',
+    'logging_setup.py',
+    'replication.py',
+    'state.py',
+    'memory_report.py',
+    'parsing.py',
+    'result_store.py',
+    'import_export.py',
+    'profiler.py',
+    'health.py',
+    'clock.py',
+    'engine.py',
+    'subscribers.py',
+    'freshness.py',
+    'prediction_export.py',
+    'analytics.py',
+    'history_index.py',
+    'profiles.py',
+    'sender_pool.py',
+    'memory_governor.py',
+    'requirements.txt',
+    'render.yaml',
+    'README_DEPLOY.md',
+)
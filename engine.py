@@ -0,0 +1,369 @@
+"""
+Moteur de prédiction: analyse, décision et vérification, sans I/O ni état global.
+
+Le moteur reçoit les messages des canaux sources et retourne ses décisions; l'appelant
+(main.py en production, la simulation, les benchmarks, les analyses) se charge de la
+publication Telegram et des minuteries. Import léger: aucune dépendance externe.
+
+Déroulement pour un message source:
+    parsed = engine.parse(source, text)                     # None: en cours, doublon, illisible
+    finalized, decision = engine.ingest(source, [(*parsed, posted_at)])
+                                                            # prédictions clôturées, Decision ou None
+    finalized += engine.add_prediction(Prediction(...))     # vérification immédiate si déjà connu
+
+Rafale (messages accumulés après une reconnexion): le même ingest(source, résultats) applique
+toutes les vérifications d'un coup et ne laisse que le jeu le plus récent décider d'une prédiction.
+Profils (profiles.py): un moteur par profil, alimenté par ingest() avec les résultats déjà
+analysés par le moteur principal.
+"""
+import logging
+from datetime import timedelta, timezone
+
+from config import (
+    PREDICTION_RULES_MORNING, PREDICTION_RULES_AFTERNOON, PREDICTION_RULES_EVENING,
+    ALL_SUITS, SUIT_DISPLAY, DEFAULT_ECART, VERIFICATION_SOURCES, BACKLOG_MAX_AGE_SECONDS,
+)
+from clock import SystemClock
+from game_cycle import SUIT_BITS, cycle_add, cycle_distance, suits_mask
+from parsing import normalize_suits, get_suit_at_position, parse_finalized_result
+from state import EngineState, Prediction, PredictionStatus
+
+logger = logging.getLogger(__name__)
+
+# Timezone WAT (West Africa Time, UTC+1) - même fuseau que le Bénin
+WAT_TZ = timezone(timedelta(hours=1))
+
+TIME_SLOT_RULES = {
+    'morning': PREDICTION_RULES_MORNING,
+    'afternoon': PREDICTION_RULES_AFTERNOON,
+    'evening': PREDICTION_RULES_EVENING,
+}
+
+# Taille maximale de l'anti-doublon avant vidage
+MAX_PROCESSED_MESSAGES = 500
+
+
+def time_slot_at(moment) -> str:
+    """
+    Plage horaire d'un instant WAT.
+    Retourne: 'morning' (00h-12h), 'afternoon' (13h-19h00), 'evening' (19h01-23h59)
+    """
+    hour, minute = moment.hour, moment.minute
+    if hour <= 12:
+        return 'morning'
+    if hour < 19 or (hour == 19 and minute == 0):
+        return 'afternoon'
+    return 'evening'
+
+
+def source_priorities(sources) -> dict:
+    """Priorité de chaque canal source, du plus au moins prioritaire (0 = non utilisé)."""
+    return {source: len(sources) - i for i, source in enumerate(sources)}
+
+
+class Decision:
+    """Prédiction décidée à partir d'un résultat de la source 1."""
+
+    __slots__ = ('game_number', 'source_suit', 'predicted_suit', 'target_game', 'time_slot')
+
+    def __init__(self, game_number: int, source_suit: str, predicted_suit: str, target_game: int, time_slot: str):
+        self.game_number = game_number
+        self.source_suit = source_suit
+        self.predicted_suit = predicted_suit
+        self.target_game = target_game
+        self.time_slot = time_slot
+
+    def __repr__(self):
+        return f"Decision(#{self.game_number} {self.source_suit} -> {self.predicted_suit} pour #{self.target_game})"
+
+
+class PredictionEngine:
+    """Règles de prédiction et vérification des prédictions actives sur un EngineState."""
+
+    def __init__(self, state: EngineState = None, clock=None, tz=WAT_TZ, verification_sources=None,
+                 max_age: float = BACKLOG_MAX_AGE_SECONDS):
+        self.state = state if state is not None else EngineState()
+        self.clock = clock or SystemClock()
+        self.tz = tz
+        self.source_priority = source_priorities(
+            VERIFICATION_SOURCES if verification_sources is None else verification_sources
+        )
+        self.max_age = max_age   # Âge max (s) d'un message source pour décider d'une prédiction
+        self.time_slot = self.current_time_slot()
+        # Messages écartés sans aller-retour Telegram (rafales après reconnexion)
+        self.shed = {'superseded': 0, 'stale_messages': 0, 'stale_targets': 0, 'backlog_batches': 0}
+
+    # --- Plages horaires et règles ---
+
+    def current_time_slot(self) -> str:
+        """Plage horaire à l'heure de l'horloge (l'active est self.time_slot)."""
+        return time_slot_at(self.clock.now(self.tz))
+
+    def set_time_slot(self, time_slot: str) -> bool:
+        """Bascule les règles de prédiction sur une nouvelle plage horaire. True si elle a changé."""
+        if time_slot == self.time_slot:
+            return False
+        logger.info("🕐 Changement de plage horaire: %s -> %s", self.time_slot, time_slot)
+        self.time_slot = time_slot
+        return True
+
+    def prediction_rules(self) -> dict:
+        return TIME_SLOT_RULES.get(self.time_slot, PREDICTION_RULES_EVENING)
+
+    def predict_suit(self, source_suit: str) -> str:
+        """
+        Applique les règles de la plage horaire active.
+        Prend la couleur source à la position k et retourne la couleur prédite.
+        """
+        rules = self.prediction_rules()
+        normalized = normalize_suits(source_suit)
+        for suit in ALL_SUITS:
+            if suit in normalized:
+                return rules.get(suit, suit)
+        return source_suit
+
+    # --- Écarts entre prédictions ---
+
+    def current_ecart(self) -> int:
+        """Écart actuel selon la liste des écarts ou l'écart par défaut."""
+        state = self.state
+        if not state.ecart_list:
+            return DEFAULT_ECART
+        if state.ecart_index >= len(state.ecart_list):
+            state.ecart_index = 0
+        return state.ecart_list[state.ecart_index]
+
+    def advance_ecart(self):
+        """Avance à l'écart suivant dans la liste."""
+        if self.state.ecart_list:
+            self.state.ecart_index = (self.state.ecart_index + 1) % len(self.state.ecart_list)
+
+    def can_predict_game(self, game_number: int) -> bool:
+        """
+        Vérifie si on peut prédire pour ce numéro de jeu.
+        Évite les prédictions pour des numéros consécutifs (écart minimum).
+        """
+        if self.state.last_predicted_game == 0:
+            return True
+        # Distance dans le cycle: le jeu 2 suit le jeu 1439 après le passage à 1
+        return cycle_distance(self.state.last_predicted_game, game_number) >= self.current_ecart()
+
+    # --- Messages sources ---
+
+    def parse(self, source: int, message_text: str):
+        """(numéro de jeu, premier groupe) d'un résultat finalisé jamais vu, None sinon."""
+        parsed = parse_finalized_result(message_text)
+        if parsed is None:
+            return None
+        game_number = parsed[0]
+        self.observe(source, game_number)
+
+        state = self.state
+        message_hash = f"src{source}_{game_number}_{message_text[:50]}"
+        if message_hash in state.processed_messages:
+            return None
+        if len(state.processed_messages) >= MAX_PROCESSED_MESSAGES:
+            state.processed_messages.clear()
+        state.processed_messages.add(message_hash)
+        return parsed
+
+    def observe(self, source: int, game_number: int):
+        """Jeu le plus récent vu (un message en retard ne fait pas reculer le jeu actuel)."""
+        state = self.state
+        if not state.current_game_number or cycle_distance(state.current_game_number, game_number) > 0:
+            state.current_game_number = game_number
+        latest = state.latest_game.get(source)
+        if latest is None or cycle_distance(latest, game_number) > 0:
+            state.latest_game[source] = game_number
+
+    def record_results(self, source: int, results) -> list:
+        """
+        Vérification groupée: enregistre tous les résultats (jeu, premier groupe) puis fait
+        avancer les seules prédictions qui attendent un des nouveaux jeux (index state.waiting).
+        Le premier résultat publié d'un jeu vérifie: un résultat différent d'une source plus
+        prioritaire, reçu ensuite, remplace le masque pour les vérifications suivantes sans
+        rouvrir les prédictions déjà clôturées (désaccord signalé).
+        Retourne les prédictions clôturées.
+        """
+        priority = self.source_priority.get(source, 0)
+        if not priority:
+            return []
+
+        cycle = self.state.game_cycle
+        new_games = []
+        for game_number, first_group in results:
+            mask = suits_mask(first_group)
+            previous = cycle.result_mask(game_number)
+            if not cycle.record_result(game_number, mask, priority):
+                continue
+            if previous is None:
+                new_games.append(game_number)
+            elif previous != mask:
+                logger.warning("⚠️ Jeu #%s: la source %s (%s) contredit le résultat déjà utilisé pour la vérification",
+                               game_number, source, first_group)
+        finalized = []
+        for game_number in new_games:
+            finalized.extend(self.check_game(game_number))
+        return finalized
+
+    def is_stale(self, target_game: int, posted_at: float = None) -> bool:
+        """
+        Vrai si une prédiction pour target_game arriverait trop tard: message source plus
+        vieux que max_age, ou source 1 déjà finalisée au-delà de la cible.
+        """
+        if posted_at is not None and self.clock.time() - posted_at > self.max_age:
+            self.shed['stale_messages'] += 1
+            return True
+        latest = self.state.latest_game.get(1)
+        if latest is not None and cycle_distance(latest, target_game) < 0:
+            self.shed['stale_targets'] += 1
+            return True
+        return False
+
+    def ingest(self, source: int, results):
+        """
+        Traite des résultats analysés (jeu, premier groupe, date du message source) reçus
+        ensemble. Vérification groupée; pour la source 1, seul le jeu le plus récent peut
+        décider d'une prédiction, les autres sont écartés. Les résultats peuvent venir de
+        parse() d'un autre moteur (profils alimentés par une seule analyse).
+        Retourne (prédictions clôturées, Decision ou None).
+        """
+        if not results:
+            return [], None
+        for game, _, _ in results:
+            self.observe(source, game)
+        if len(results) > 1:
+            self.shed['backlog_batches'] += 1
+            logger.warning("📥 Rafale de %s messages source %s: vérification groupée", len(results), source,
+                           extra={'category': 'source'})
+        finalized = self.record_results(source, [(game, group) for game, group, _ in results])
+        if source != 1:
+            return finalized, None
+
+        newest = results[0]
+        for result in results[1:]:
+            if cycle_distance(newest[0], result[0]) >= 0:
+                newest = result
+        self.shed['superseded'] += len(results) - 1
+        return finalized, self.decide(*newest)
+
+    def decide(self, game_number: int, first_group: str, posted_at: float = None):
+        """Prédiction à publier pour un résultat de la source 1, ou None (posted_at: date du message source)."""
+        state = self.state
+        source_suit = get_suit_at_position(first_group, state.k_position)
+        if source_suit is None:
+            logger.info("Impossible de trouver une carte à la position %s dans %s", state.k_position, first_group,
+                        extra={'category': 'source'})
+            return None
+
+        predicted_suit = source_suit if state.intelligent_mode else self.predict_suit(source_suit)
+        target_game = cycle_add(game_number, state.a_offset)
+
+        if self.is_stale(target_game, posted_at):
+            logger.info("Jeu #%s déjà passé ou message trop ancien: prédiction écartée", target_game,
+                        extra={'category': 'source'})
+            return None
+        if not self.can_predict_game(target_game):
+            logger.info("Jeu #%s trop proche du dernier prédit (#%s), écart requis: %s",
+                        target_game, state.last_predicted_game, self.current_ecart(), extra={'category': 'source'})
+            return None
+        if target_game in state.pending_predictions:
+            logger.info("Prédiction #%s déjà active", target_game, extra={'category': 'source'})
+            return None
+
+        logger.info("Jeu #%s - Position k=%s: %s -> Prédiction: %s pour #%s (%s)",
+                    game_number, state.k_position, SUIT_DISPLAY.get(source_suit, source_suit),
+                    SUIT_DISPLAY.get(predicted_suit, predicted_suit), target_game,
+                    'intelligent' if state.intelligent_mode else self.time_slot, extra={'category': 'prediction'})
+        return Decision(game_number, source_suit, predicted_suit, target_game, self.time_slot)
+
+    # --- Prédictions actives ---
+
+    def _wait_for(self, pred: Prediction):
+        """Indexe la prédiction sous le jeu qu'elle attend (N+check_count)."""
+        self.state.waiting.setdefault(cycle_add(pred.game, pred.check_count), set()).add(pred.game)
+
+    def _unwait(self, pred: Prediction):
+        expected = cycle_add(pred.game, pred.check_count)
+        games = self.state.waiting.get(expected)
+        if games is not None:
+            games.discard(pred.game)
+            if not games:
+                del self.state.waiting[expected]
+
+    def track(self, pred: Prediction):
+        """Ajoute une prédiction aux prédictions actives (sans la compter comme nouvelle)."""
+        previous = self.state.pending_predictions.get(pred.game)
+        if previous is not None:
+            self._unwait(previous)
+        self.state.pending_predictions[pred.game] = pred
+        self._wait_for(pred)
+
+    def add_prediction(self, pred: Prediction) -> list:
+        """
+        Enregistre une nouvelle prédiction publiée, avance l'écart et la vérifie aussitôt
+        sur les jeux déjà connus (ex: a=0, cible = jeu qui vient d'être vu).
+        Retourne les prédictions clôturées.
+        """
+        self.track(pred)
+        self.state.last_predicted_game = pred.game
+        self.advance_ecart()
+        return self.verify(pred.game)
+
+    def finalize(self, pred_game: int, status: PredictionStatus):
+        """Clôture une prédiction active (retirée des prédictions actives). Retourne la prédiction ou None."""
+        pred = self.state.pending_predictions.pop(pred_game, None)
+        if pred is None:
+            return None
+        self._unwait(pred)
+        pred.status = status
+        pred.cancel_expiry()
+        return pred
+
+    def expire(self, pred_game: int):
+        """Clôture en ❌ une prédiction dont les jeux de vérification ne sont jamais arrivés."""
+        return self.finalize(pred_game, PredictionStatus.EXPIRED)
+
+    def verify(self, pred_game: int) -> list:
+        """
+        Fait avancer une prédiction tant que le résultat du jeu attendu (N+check_count)
+        est déjà dans le cache des résultats, quelle que soit la source qui l'a fourni.
+        """
+        state = self.state
+        while pred_game in state.pending_predictions:
+            pred = state.pending_predictions[pred_game]
+            check_count = pred.check_count
+            expected_game = cycle_add(pred_game, check_count)
+            result_mask = state.game_cycle.result_mask(expected_game)
+            if result_mask is None:
+                logger.debug("Prédiction #%s: attend jeu #%s (N+%s)", pred_game, expected_game, check_count)
+                return []
+            self._unwait(pred)
+
+            if result_mask & SUIT_BITS[pred.suit]:
+                self.finalize(pred_game, PredictionStatus.WON)
+                logger.info("✅ Prédiction #%s réussie à N+%s - Statut: %s", pred_game, check_count, pred.status_text,
+                            extra={'category': 'prediction'})
+                return [pred]
+
+            pred.check_count = check_count + 1
+            if pred.check_count >= pred.max_checks:
+                self.finalize(pred_game, PredictionStatus.LOST)
+                logger.info("❌ Prédiction #%s échouée après %s vérifications", pred_game, pred.max_checks,
+                            extra={'category': 'prediction'})
+                return [pred]
+            self._wait_for(pred)
+            logger.info("⏳ Prédiction #%s: vérification %s/%s, attente N+%s",
+                        pred_game, pred.check_count, pred.max_checks, pred.check_count,
+                        extra={'category': 'verification'})
+        return []
+
+    def check_game(self, game_number: int) -> list:
+        """Vérifie les prédictions actives qui attendent ce jeu (index state.waiting). Retourne les prédictions clôturées."""
+        waiting = self.state.waiting.get(game_number)
+        if not waiting:
+            return []
+        finalized = []
+        for pred_game in list(waiting):
+            finalized.extend(self.verify(pred_game))
+        return finalized
@@ -0,0 +1,74 @@
+"""
+Fraîcheur des publications: retard de bout en bout entre la date d'un message source
+(event.message.date) et la confirmation par Telegram de l'envoi ou de la mise à jour
+de la prédiction correspondante dans le canal de prédiction.
+- 'publish': message source 1 -> prédiction envoyée (send_message confirmé)
+- 'result':  message source de vérification -> statut final édité (edit_message confirmé)
+Percentiles calculés sur une fenêtre glissante des derniers envois; une alerte est levée
+quand le p95 dépasse le budget, puis levée une seule fois jusqu'au retour sous le budget.
+"""
+import logging
+import math
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+KINDS = ('publish', 'result')
+
+
+def percentile(sorted_values, q: float) -> float:
+    """Percentile par rang le plus proche d'une liste triée non vide."""
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class LagTracker:
+    """Retards récents par type d'envoi, percentiles et alerte sur le p95."""
+
+    def __init__(self, budget: float = 30.0, window: int = 200, min_samples: int = 20):
+        self.budget = budget
+        self.min_samples = min_samples
+        self._samples = {kind: deque(maxlen=window) for kind in KINDS}
+        self._totals = dict.fromkeys(KINDS, 0)
+        self._alerting = dict.fromkeys(KINDS, False)
+
+    def record(self, kind: str, lag: float):
+        """
+        Enregistre un retard (s). Retourne 'alert' si le p95 vient de dépasser le budget,
+        'recovered' s'il vient de repasser dessous, None sinon.
+        """
+        samples = self._samples[kind]
+        samples.append(max(0.0, lag))   # Horloges légèrement décalées: jamais de retard négatif
+        self._totals[kind] += 1
+        if len(samples) < self.min_samples:
+            return None
+
+        p95 = percentile(sorted(samples), 95)
+        over = p95 > self.budget
+        if over == self._alerting[kind]:
+            return None
+        self._alerting[kind] = over
+        if over:
+            logger.warning("🐌 Retard %s: p95 %.1fs au-dessus du budget de %.0fs", kind, p95, self.budget)
+            return 'alert'
+        logger.info("Retard %s: p95 %.1fs revenu sous le budget de %.0fs", kind, p95, self.budget)
+        return 'recovered'
+
+    def stats(self, kind: str):
+        """p50/p95/p99/max (s) de la fenêtre courante, None sans mesure."""
+        samples = self._samples[kind]
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return {
+            'p50': round(percentile(ordered, 50), 1),
+            'p95': round(percentile(ordered, 95), 1),
+            'p99': round(percentile(ordered, 99), 1),
+            'max': round(ordered[-1], 1),
+            'window': len(ordered),
+            'total': self._totals[kind],
+            'alert': self._alerting[kind],
+        }
+
+    def report(self) -> dict:
+        return {kind: self.stats(kind) for kind in KINDS}
@@ -0,0 +1,123 @@
+"""
+État du cycle de jeux (1 à MAX_GAME_NUMBER) sous forme de tampon circulaire.
+Chaque numéro de jeu possède un emplacement fixe: résultat (masque de couleurs,
+avec la priorité de la source qui l'a fourni). Mémoire constante, accès O(1).
+Les prédictions qui attendent un jeu sont indexées par le moteur (EngineState.waiting).
+"""
+from array import array
+from datetime import datetime, timedelta
+from config import MAX_GAME_NUMBER, ALL_SUITS
+
+# Codes compacts des couleurs (bit par couleur dans un masque)
+SUIT_BITS = {suit: 1 << i for i, suit in enumerate(ALL_SUITS)}
+SUIT_CODES = {suit: i + 1 for i, suit in enumerate(ALL_SUITS)}  # 0 = aucune
+CODE_SUITS = {code: suit for suit, code in SUIT_CODES.items()}
+
+_SUIT_VARIANTS = (
+    ('❤️', '♥'), ('❤', '♥'), ('♥️', '♥'),
+    ('♠️', '♠'), ('♦️', '♦'), ('♣️', '♣'),
+)
+
+_HALF_CYCLE = MAX_GAME_NUMBER // 2
+
+# Le cycle de jeux recommence au reset quotidien de 00h59 WAT
+DAY_ROLLOVER = timedelta(minutes=59)
+
+
+def suits_mask(group_str: str) -> int:
+    """Masque de bits des couleurs présentes dans une chaîne."""
+    for variant, suit in _SUIT_VARIANTS:
+        group_str = group_str.replace(variant, suit)
+    mask = 0
+    for suit, bit in SUIT_BITS.items():
+        if suit in group_str:
+            mask |= bit
+    return mask
+
+
+def cycle_add(game_number: int, offset: int) -> int:
+    """Ajoute un offset à un numéro de jeu en repassant à 1 après MAX_GAME_NUMBER."""
+    return (game_number - 1 + offset) % MAX_GAME_NUMBER + 1
+
+
+def cycle_distance(from_game: int, to_game: int) -> int:
+    """
+    Distance signée la plus courte de from_game vers to_game dans le cycle.
+    Exemple: cycle_distance(1439, 2) == 3, cycle_distance(2, 1439) == -3
+    """
+    return (to_game - from_game + _HALF_CYCLE) % MAX_GAME_NUMBER - _HALF_CYCLE
+
+
+def game_day(moment: datetime) -> str:
+    """Journée de jeu (AAAA-MM-JJ) d'un instant WAT: avant 00h59, c'est encore la veille."""
+    return (moment - DAY_ROLLOVER).date().isoformat()
+
+
+class GameCycle:
+    """
+    Tampon circulaire indexé par numéro de jeu.
+    Chaque emplacement est horodaté par un index absolu (tour * cycle + jeu),
+    ce qui invalide automatiquement les données du tour précédent.
+    """
+
+    __slots__ = ('_results', '_priorities', '_stamps', '_lap', '_last_game')
+
+    def __init__(self):
+        size = MAX_GAME_NUMBER + 1
+        self._results = array('B', bytes(size))       # masque des couleurs du 1er groupe
+        self._priorities = array('B', bytes(size))    # priorité de la source du résultat
+        self._stamps = array('q', [-1]) * size        # index absolu du résultat enregistré
+        self._lap = 0
+        self._last_game = 0
+
+    @staticmethod
+    def _slot(game_number: int) -> int:
+        return (game_number - 1) % MAX_GAME_NUMBER + 1
+
+    def _absolute(self, game_number: int) -> int:
+        """Index absolu du jeu le plus proche du dernier jeu observé."""
+        if self._last_game == 0:
+            return self._lap * MAX_GAME_NUMBER + self._slot(game_number)
+        current = self._lap * MAX_GAME_NUMBER + self._last_game
+        return current + cycle_distance(self._last_game, self._slot(game_number))
+
+    def observe(self, game_number: int):
+        """Avance le curseur du cycle (détecte le passage de MAX_GAME_NUMBER à 1)."""
+        slot = self._slot(game_number)
+        if self._last_game and slot < self._last_game and cycle_distance(self._last_game, slot) > 0:
+            self._lap += 1
+        if not self._last_game or cycle_distance(self._last_game, slot) > 0:
+            self._last_game = slot
+
+    @property
+    def last_game(self) -> int:
+        return self._last_game
+
+    def record_result(self, game_number: int, mask: int, priority: int = 1) -> bool:
+        """
+        Enregistre le masque des couleurs d'un jeu finalisé.
+        Un résultat déjà connu n'est remplacé que par une source de priorité égale ou supérieure.
+        Retourne True si le masque a été enregistré.
+        """
+        self.observe(game_number)
+        slot = self._slot(game_number)
+        stamp = self._absolute(slot)
+        if self._stamps[slot] == stamp and self._priorities[slot] > priority:
+            return False
+        self._results[slot] = mask
+        self._priorities[slot] = priority
+        self._stamps[slot] = stamp
+        return True
+
+    def result_mask(self, game_number: int):
+        """Masque du jeu pour le tour courant, ou None s'il n'est pas connu."""
+        slot = self._slot(game_number)
+        if self._stamps[slot] != self._absolute(slot):
+            return None
+        return self._results[slot]
+
+    def reset(self):
+        """Vide le cycle (reset quotidien)."""
+        self._stamps = array('q', [-1]) * (MAX_GAME_NUMBER + 1)
+        self._lap = 0
+        self._last_game = 0
@@ -0,0 +1,143 @@
+"""
+Surveillance de santé du bot pour les sondes /health (vivacité) et /ready (disponibilité).
+- Retard de la boucle asyncio mesuré par une tâche de fond (dérive d'un sleep périodique)
+- Âge du dernier message reçu de chaque canal source
+- Nombre d'envois Telegram en cours (file sortante)
+- Vérifications supplémentaires enregistrées par le bot (connexion Telethon, planificateur)
+Le rapport est mis en cache quelques secondes: des sondes fréquentes ne coûtent rien.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class HealthMonitor:
+    """Agrège les vérifications de santé et met en cache leur résultat."""
+
+    def __init__(self, max_loop_lag: float = 1.0, max_feed_age: float = 600.0, max_outbound: int = 20,
+                 interval: float = 0.5, cache_ttl: float = 2.0, lag_window: float = 10.0):
+        self.max_loop_lag = max_loop_lag
+        self.max_feed_age = max_feed_age
+        self.max_outbound = max_outbound
+        self.interval = interval
+        self.cache_ttl = cache_ttl
+        self.loop_lag = 0.0          # Dernier retard mesuré (s)
+        self._recent_lags = deque(maxlen=max(1, int(lag_window / interval)))  # Fenêtre glissante des retards
+        self.outbound_pending = 0
+        self._started = time.monotonic()
+        self._last_tick = None
+        self._feeds = {}             # nom du canal -> instant monotone du dernier message
+        self._checks = {}            # nom -> (fonction -> (ok, détail), critique pour /health)
+        self._cache = {}             # 'live'/'ready' -> (instant, (ok, rapport))
+        self._task = None
+
+    # --- Mesures ---
+
+    def watch_feed(self, name: str):
+        """Déclare un canal source à surveiller (son âge part du démarrage du bot)."""
+        self._feeds.setdefault(name, None)
+
+    def feed_seen(self, name: str):
+        """Enregistre la réception d'un message d'un canal source."""
+        self._feeds[name] = time.monotonic()
+
+    def feed_ages(self) -> dict:
+        now = time.monotonic()
+        return {name: now - (seen if seen is not None else self._started) for name, seen in self._feeds.items()}
+
+    @contextmanager
+    def outbound(self):
+        """Compte un envoi Telegram en cours pendant la durée du bloc."""
+        self.outbound_pending += 1
+        try:
+            yield
+        finally:
+            self.outbound_pending -= 1
+
+    def add_check(self, name: str, check, critical: bool = True):
+        """Ajoute une vérification: check() -> (ok, détail). Critique = prise en compte par /health."""
+        self._checks[name] = (check, critical)
+
+    # --- Tâche de mesure du retard de boucle ---
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._last_tick = time.monotonic()
+            self._task = asyncio.get_running_loop().create_task(self._ticker(), name='health_ticker')
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _ticker(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self.loop_lag = max(0.0, now - expected)
+            self._recent_lags.append(self.loop_lag)
+            self._last_tick = now
+            if self.loop_lag > self.max_loop_lag:
+                logger.warning("🐢 Boucle asyncio bloquée %.2fs", self.loop_lag)
+
+    def _current_lag(self) -> float:
+        """Retard courant: si le ticker n'a pas tourné depuis longtemps, la boucle est bloquée (ou arrêtée)."""
+        if self._task is None or self._task.done():
+            return float('inf')
+        return max(max(self._recent_lags, default=0.0), time.monotonic() - self._last_tick - self.interval)
+
+    # --- Rapports ---
+
+    def _evaluate(self, readiness: bool):
+        checks = {}
+        lag = self._current_lag()
+        checks['loop_lag'] = {
+            'ok': lag <= self.max_loop_lag,
+            'lag_s': round(lag, 3) if lag != float('inf') else None,   # None = ticker arrêté
+            'max_s': self.max_loop_lag,
+        }
+
+        for name, (check, critical) in self._checks.items():
+            if not critical and not readiness:
+                continue
+            try:
+                ok, detail = check()
+            except Exception as e:
+                ok, detail = False, f"erreur: {e}"
+            checks[name] = {'ok': bool(ok), 'detail': detail}
+
+        if readiness:
+            ages = self.feed_ages()
+            checks['feeds'] = {
+                'ok': all(age <= self.max_feed_age for age in ages.values()),
+                'age_s': {name: round(age, 1) for name, age in ages.items()},
+                'max_s': self.max_feed_age,
+            }
+            checks['outbound'] = {
+                'ok': self.outbound_pending <= self.max_outbound,
+                'pending': self.outbound_pending,
+                'max': self.max_outbound,
+            }
+
+        ok = all(c['ok'] for c in checks.values())
+        return ok, {'status': 'ok' if ok else 'fail', 'checks': checks}
+
+    def report(self, readiness: bool = False):
+        """(ok, rapport) pour /health (readiness=False) ou /ready, en cache cache_ttl secondes."""
+        key = 'ready' if readiness else 'live'
+        now = time.monotonic()
+        cached = self._cache.get(key)
+        if cached is not None and now - cached[0] < self.cache_ttl:
+            return cached[1]
+        result = self._evaluate(readiness)
+        self._cache[key] = (now, result)
+        return result
@@ -0,0 +1,314 @@
+"""
+Index de l'historique des résultats pour les requêtes de séries et de séquences (/query, /api/query).
+
+Chaque jeu a une position absolue: (journée - première journée) * MAX_GAME_NUMBER + (jeu - 1),
+de sorte que N+d est toujours la position + d, y compris après le passage de 1440 à 1.
+- Tableaux d'octets par position: masque des couleurs du premier groupe (bit 7 = jeu
+  connu), couleur à la position k (1 à 3)
+- Bitsets (entiers Python) par couleur et par (position k, couleur), construits en une
+  passe (translate + int(..., 2)) puis mis à jour bit à bit: une requête de séquence
+  se réduit à quelques ET/décalages et un bit_count()
+- Index de séries (run-length) par couleur, présente ('hit') ou absente ('miss'):
+  séries regroupées par longueur, la dernière série prolongée en O(1) à chaque jeu
+Un jeu manquant dans l'historique interrompt les séries et n'est jamais compté.
+"""
+import re
+import sys
+from datetime import date
+
+from config import ALL_SUITS, MAX_GAME_NUMBER
+from game_cycle import SUIT_BITS, SUIT_CODES
+from parsing import normalize_suits
+
+MAX_K = 3
+KINDS = ('hit', 'miss')
+KNOWN = 0x80      # Bit « jeu connu » dans le tableau des masques
+_INT_BYTES = sys.getsizeof(2 ** 20) + 8     # Début de série: entier + pointeur de liste
+
+_RUN_RE = {'hit': re.compile(rb'1+'), 'miss': re.compile(rb'0+')}
+
+
+def _bit_table(predicate) -> bytes:
+    """Table de traduction octet -> b'1' / b'0' selon predicate(octet)."""
+    return bytes(ord('1') if predicate(value) else ord('0') for value in range(256))
+
+
+class RunIndex:
+    """Séries d'une couleur (présente ou absente): débuts regroupés par longueur."""
+
+    __slots__ = ('buckets', 'tail')
+
+    def __init__(self):
+        self.buckets = {}     # longueur -> débuts croissants
+        self.tail = None      # [début, longueur] de la série qui touche la dernière position
+
+    def add(self, start: int, length: int):
+        self.buckets.setdefault(length, []).append(start)
+
+    def extend(self, position: int):
+        """Prolonge la dernière série avec la position suivante, ou en commence une."""
+        tail = self.tail
+        if tail is not None and tail[0] + tail[1] == position:
+            starts = self.buckets[tail[1]]
+            starts.pop()        # La dernière série a le plus grand début de son groupe
+            if not starts:
+                del self.buckets[tail[1]]
+            tail[1] += 1
+        else:
+            self.tail = tail = [position, 1]
+        self.add(tail[0], tail[1])
+
+    def close(self):
+        self.tail = None
+
+    def at_least(self, length: int):
+        """(nombre de séries >= length, début de la plus récente, sa longueur, plus longue série)."""
+        count, last_start, last_length = 0, -1, 0
+        for run_length, starts in self.buckets.items():
+            if run_length < length:
+                continue
+            count += len(starts)
+            if starts[-1] > last_start:
+                last_start, last_length = starts[-1], run_length
+        longest = max(self.buckets, default=0)
+        return count, (last_start if count else None), last_length, longest
+
+
+class HistoryIndex:
+    """Index des jeux d'un canal source, par position absolue."""
+
+    def __init__(self):
+        self.base = None                  # Ordinal de la première journée
+        self.size = 0                     # Position suivant la dernière connue
+        self.games = 0
+        self._masks = bytearray()
+        self._codes = [bytearray() for _ in range(MAX_K)]
+        self._bitsets = {}                # clé -> entier (cache, mis à jour à l'ajout)
+        self._runs = None                 # (couleur, type) -> RunIndex, reconstruit si None
+
+    # --- Positions ---
+
+    def position(self, day: str, game: int):
+        ordinal = date.fromisoformat(day).toordinal()
+        if self.base is None:
+            self.base = ordinal
+        if ordinal < self.base or not 1 <= game <= MAX_GAME_NUMBER:
+            return None
+        return (ordinal - self.base) * MAX_GAME_NUMBER + game - 1
+
+    def game_at(self, position: int):
+        """(journée, numéro de jeu) d'une position absolue."""
+        day_index, game_index = divmod(position, MAX_GAME_NUMBER)
+        return date.fromordinal(self.base + day_index).isoformat(), game_index + 1
+
+    # --- Alimentation ---
+
+    def add(self, day: str, game: int, first_group: str, mask: int) -> bool:
+        """Ajoute un jeu finalisé. False s'il est déjà connu ou hors de l'historique indexé."""
+        position = self.position(day, game)
+        if position is None or (position < self.size and self._masks[position] & KNOWN):
+            return False
+        if position >= self.size:
+            grow = position + 1 - self.size
+            for array in (self._masks, *self._codes):
+                array.extend(bytes(grow))
+        in_order = position >= self.size
+        previous_end = self.size
+
+        self._masks[position] = mask | KNOWN
+        suits = [char for char in normalize_suits(first_group) if char in SUIT_CODES]
+        codes = []
+        for k in range(MAX_K):
+            code = SUIT_CODES[suits[k]] if k < len(suits) else 0
+            self._codes[k][position] = code
+            codes.append(code)
+        self.size = max(self.size, position + 1)
+        self.games += 1
+
+        self._update_bitsets(position, mask, codes)
+        if self._runs is not None:
+            if in_order:
+                self._extend_runs(position, mask, gap=position != previous_end)
+            else:
+                self._runs = None     # Jeu arrivé en retard: séries reconstruites à la prochaine requête
+        return True
+
+    def _update_bitsets(self, position: int, mask: int, codes: list):
+        bit = 1 << position
+        for key in list(self._bitsets):
+            kind, value = key[0], key[1:]
+            if (kind == 'known'
+                    or (kind == 'suit' and mask & SUIT_BITS[value[0]])
+                    or (kind == 'pos' and codes[value[0] - 1] == SUIT_CODES[value[1]])):
+                self._bitsets[key] |= bit
+
+    def _extend_runs(self, position: int, mask: int, gap: bool):
+        for suit in ALL_SUITS:
+            hit, miss = self._runs[(suit, 'hit')], self._runs[(suit, 'miss')]
+            if gap:
+                hit.close()
+                miss.close()
+            present, absent = (hit, miss) if mask & SUIT_BITS[suit] else (miss, hit)
+            present.extend(position)
+            absent.close()
+
+    # --- Bitsets ---
+
+    def _bitset(self, key: tuple) -> int:
+        bitset = self._bitsets.get(key)
+        if bitset is None:
+            kind, value = key[0], key[1:]
+            if kind == 'known':
+                source, table = self._masks, _bit_table(lambda v: v & KNOWN)
+            elif kind == 'suit':
+                source, table = self._masks, _bit_table(lambda v, b=SUIT_BITS[value[0]]: v & b)
+            else:
+                source, table = self._codes[value[0] - 1], _bit_table(lambda v, c=SUIT_CODES[value[1]]: v == c)
+            flags = source.translate(table)
+            bitset = int(flags[::-1], 2) if flags else 0
+            self._bitsets[key] = bitset
+        return bitset
+
+    def known(self) -> int:
+        return self._bitset(('known',))
+
+    def suit_bits(self, suit: str) -> int:
+        return self._bitset(('suit', suit))
+
+    def position_bits(self, k: int, suit: str) -> int:
+        return self._bitset(('pos', k, suit))
+
+    # --- Séries ---
+
+    def _build_runs(self):
+        runs = {}
+        for suit in ALL_SUITS:
+            bit = SUIT_BITS[suit]
+            # '1' présente, '0' absente, '-' jeu inconnu (interrompt les séries)
+            table = bytes(ord('-') if not v & KNOWN else ord('1') if v & bit else ord('0') for v in range(256))
+            flags = self._masks.translate(table)
+            for kind in KINDS:
+                index = RunIndex()
+                for match in _RUN_RE[kind].finditer(flags):
+                    index.add(match.start(), match.end() - match.start())
+                    if match.end() == self.size:
+                        index.tail = [match.start(), match.end() - match.start()]
+                runs[(suit, kind)] = index
+        self._runs = runs
+
+    def runs(self, suit: str, kind: str) -> RunIndex:
+        if self._runs is None:
+            self._build_runs()
+        return self._runs[(suit, kind)]
+
+    # --- Requêtes ---
+
+    def streak(self, suit: str, kind: str, length: int) -> dict:
+        """Séries d'au moins `length` jeux où la couleur est présente ('hit') ou absente ('miss')."""
+        count, last_start, last_length, longest = self.runs(suit, kind).at_least(length)
+        result = {'suit': suit, 'kind': kind, 'min_length': length, 'count': count, 'longest': longest,
+                  'last': None}
+        if last_start is not None:
+            day, game = self.game_at(last_start)
+            result['last'] = {'day': day, 'game': game, 'length': last_length,
+                              'ongoing': last_start + last_length == self.size}
+        return result
+
+    def current(self) -> dict:
+        """Série en cours de chaque couleur: (+n) présente depuis n jeux, (-n) absente depuis n jeux."""
+        current = {}
+        for suit in ALL_SUITS:
+            for kind, sign in (('hit', 1), ('miss', -1)):
+                tail = self.runs(suit, kind).tail
+                if tail is not None:
+                    current[suit] = sign * tail[1]
+        return current
+
+    def sequence(self, pattern, target: str, offset: int) -> dict:
+        """
+        Jeux N dont le premier groupe porte pattern[i] en position i+1, suivis de `target`
+        dans le premier groupe du jeu N+offset. Compare à la fréquence globale de `target`.
+        """
+        known = self.known()
+        condition = known
+        for k, suit in enumerate(pattern, start=1):
+            condition &= self.position_bits(k, suit)
+        later_known = known >> offset
+        target_bits = self.suit_bits(target)
+        matches = condition & later_known
+        hits = matches & (target_bits >> offset)
+        total, hit_count = matches.bit_count(), hits.bit_count()
+        known_count = known.bit_count()
+        return {
+            'pattern': ''.join(pattern), 'target': target, 'offset': offset,
+            'occurrences': total, 'hits': hit_count,
+            'rate': round(hit_count / total, 4) if total else None,
+            'baseline': round(target_bits.bit_count() / known_count, 4) if known_count else None,
+        }
+
+    # --- Mémoire ---
+
+    def _cache_footprint(self) -> int:
+        size = sum(sys.getsizeof(bitset) for bitset in self._bitsets.values())
+        if self._runs is not None:
+            for index in self._runs.values():
+                size += sum(sys.getsizeof(starts) + len(starts) * _INT_BYTES for starts in index.buckets.values())
+        return size
+
+    def footprint(self) -> int:
+        """Empreinte estimée (octets): tableaux par position, bitsets et séries en cache."""
+        arrays = sum(sys.getsizeof(array) for array in (self._masks, *self._codes))
+        return arrays + self._cache_footprint()
+
+    def release_caches(self) -> int:
+        """Libère les bitsets et les séries (reconstruits à la prochaine requête). Retourne les octets libérés."""
+        freed = self._cache_footprint()
+        self._bitsets = {}
+        self._runs = None
+        return freed
+
+    def status(self) -> dict:
+        first = self.game_at(0)[0] if self.base is not None else None
+        last = self.game_at(self.size - 1)[0] if self.size else None
+        return {'games': self.games, 'first_day': first, 'last_day': last}
+
+
+def build_from_store(store, source: int = 1) -> HistoryIndex:
+    """Index de tout l'historique d'un canal source (résultats triés par journée puis jeu)."""
+    index = HistoryIndex()
+    for day, game, first_group, mask, _ in store.iter_results(source):
+        index.add(day, game, first_group, mask)
+    return index
+
+
+def parse_suits(text: str) -> list:
+    """Couleurs d'une chaîne, dans l'ordre d'écriture (♠️♥ -> ['♠', '♥'])."""
+    return [char for char in normalize_suits(text or '') if char in SUIT_CODES]
+
+
+def run_query(index: HistoryIndex, params: dict) -> dict:
+    """
+    Exécute une requête décrite par des paramètres texte (commande /query ou route /api/query):
+    - type=streak, suit, kind=miss|hit, min=5
+    - type=sequence, pattern (couleurs en positions 1, 2...), target, offset=0
+    - type=current
+    ValueError si les paramètres sont invalides.
+    """
+    query = params.get('type', 'current')
+    if query == 'current':
+        return {'type': query, 'current': index.current(), **index.status()}
+    if query == 'streak':
+        suits = parse_suits(params.get('suit'))
+        kind = params.get('kind', 'miss')
+        length = int(params.get('min', 5))
+        if len(suits) != 1 or kind not in KINDS or length < 1:
+            raise ValueError("streak: suit=<couleur>, kind=miss|hit, min>=1")
+        return {'type': query, **index.streak(suits[0], kind, length)}
+    if query == 'sequence':
+        pattern = parse_suits(params.get('pattern'))
+        target = parse_suits(params.get('target'))
+        offset = int(params.get('offset', 0))
+        if not 1 <= len(pattern) <= MAX_K or len(target) != 1 or offset < 0:
+            raise ValueError(f"sequence: pattern=1 à {MAX_K} couleurs, target=<couleur>, offset>=0")
+        return {'type': query, **index.sequence(pattern, target[0], offset)}
+    raise ValueError("type: streak, sequence ou current")
@@ -0,0 +1,163 @@
+"""
+Import en flux des exports Telegram Desktop (result.json) d'un canal source.
+
+Le fichier est lu par blocs et chaque message est décodé individuellement:
+la mémoire reste constante quelle que soit la taille de l'export. Chaque
+message passe par la même analyse que le bot en direct (parse_finalized_result)
+et les jeux finalisés sont insérés par lots dans la base des résultats.
+
+Usage:
+    python import_export.py result.json --source 1 [--db results.db] [--batch 2000]
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from config import RESULTS_DB_PATH
+from game_cycle import game_day, suits_mask
+from logging_setup import setup_logging
+from parsing import parse_finalized_result
+from result_store import ResultStore
+
+logger = logging.getLogger(__name__)
+
+WAT_TZ = timezone(timedelta(hours=1))
+
+CHUNK_SIZE = 1 << 16
+PROGRESS_EVERY = 50000
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\r\n'
+
+
+def iter_export_messages(fp, chunk_size: int = CHUNK_SIZE):
+    """
+    Générateur des objets du tableau "messages" d'un export de canal,
+    sans charger le fichier entier.
+    """
+    buf = ''
+    pos = 0
+    eof = False
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            eof = True
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    # Recherche de la clé "messages" puis du début du tableau
+    while True:
+        index = buf.find('"messages"', pos)
+        if index >= 0:
+            bracket = buf.find('[', index)
+            if bracket >= 0:
+                pos = bracket + 1
+                break
+            pos = index
+        else:
+            pos = max(pos, len(buf) - len('"messages"'))
+        if eof:
+            raise ValueError("Clé \"messages\" introuvable: export de canal attendu")
+        fill()
+
+    while True:
+        while pos < len(buf) and buf[pos] in _WHITESPACE + ',':
+            pos += 1
+        if pos >= len(buf):
+            if eof:
+                raise ValueError("Export tronqué: fin du tableau \"messages\" absente")
+            fill()
+            continue
+        if buf[pos] == ']':
+            return
+        try:
+            message, end = _decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            fill()
+            continue
+        pos = end
+        yield message
+        if pos > chunk_size:
+            buf = buf[pos:]
+            pos = 0
+
+
+def message_text(message: dict) -> str:
+    """Texte brut d'un message exporté (chaîne ou liste de fragments formatés)."""
+    text = message.get('text', '')
+    if isinstance(text, str):
+        return text
+    return ''.join(part if isinstance(part, str) else part.get('text', '') for part in text)
+
+
+def export_date(message: dict, tz) -> datetime:
+    """Date du message (l'export est en heure locale de la machine qui l'a produit)."""
+    return datetime.fromisoformat(message['date']).replace(tzinfo=tz).astimezone(WAT_TZ)
+
+
+def import_export(path: str, store: ResultStore, source: int, batch_size: int = 2000, tz=WAT_TZ) -> dict:
+    """Importe un export; retourne les compteurs (messages, jeux, insérés, durée)."""
+    stats = {'messages': 0, 'games': 0, 'inserted': 0}
+    batch = []
+    start = time.perf_counter()
+
+    def flush():
+        stats['inserted'] += store.insert_results(batch)
+        batch.clear()
+
+    with open(path, 'r', encoding='utf-8') as fp:
+        for message in iter_export_messages(fp):
+            stats['messages'] += 1
+            if message.get('type') == 'message':
+                parsed = parse_finalized_result(message_text(message))
+                if parsed is not None:
+                    game_number, first_group = parsed
+                    posted_at = export_date(message, tz)
+                    batch.append((game_day(posted_at), game_number, source, first_group,
+                                  suits_mask(first_group), posted_at.isoformat()))
+                    stats['games'] += 1
+                    if len(batch) >= batch_size:
+                        flush()
+
+            if stats['messages'] % PROGRESS_EVERY == 0:
+                elapsed = time.perf_counter() - start
+                logger.info("Import: %s messages, %s jeux (%.0f jeux/s)",
+                            stats['messages'], stats['games'], stats['games'] / elapsed if elapsed else 0)
+    if batch:
+        flush()
+
+    stats['seconds'] = round(time.perf_counter() - start, 3)
+    stats['games_per_second'] = round(stats['games'] / stats['seconds']) if stats['seconds'] else stats['games']
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import en flux d'un export Telegram Desktop (result.json)")
+    parser.add_argument('path', help="Fichier result.json de l'export du canal")
+    parser.add_argument('--source', type=int, choices=(1, 2), required=True, help="Canal source de l'export")
+    parser.add_argument('--db', default=RESULTS_DB_PATH, help="Base des résultats (SQLite)")
+    parser.add_argument('--batch', type=int, default=2000, help="Taille des lots d'insertion")
+    parser.add_argument('--utc-offset', type=float, default=1.0,
+                        help="Décalage UTC (heures) des dates de l'export (défaut: 1 = WAT)")
+    args = parser.parse_args()
+
+    setup_logging()
+    store = ResultStore(args.db)
+    try:
+        stats = import_export(args.path, store, args.source, args.batch, timezone(timedelta(hours=args.utc_offset)))
+    finally:
+        store.close()
+    logger.info("Import terminé: %s", stats)
+    print(json.dumps(stats))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
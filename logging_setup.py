@@ -0,0 +1,137 @@
+"""
+Journalisation asynchrone: les gestionnaires du bot ne font que déposer les
+enregistrements dans une file (QueueHandler); le formatage JSON et l'écriture
+sur stdout se font dans le thread du QueueListener, hors de la boucle asyncio.
+
+Les lignes émises à chaque message portent une catégorie (extra={'category': ...})
+limitée en débit: au-delà de N lignes par fenêtre, elles sont comptées puis
+résumées dans la ligne suivante autorisée.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+# Catégorie -> (lignes autorisées, fenêtre en secondes)
+DEFAULT_RATE_LIMITS = {
+    'source': (30, 60.0),        # Réception des messages des canaux sources
+    'verification': (60, 60.0),  # Vérification des prédictions jeu par jeu
+}
+
+_RESERVED_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Formate chaque enregistrement en une ligne JSON."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S') + f'.{int(record.msecs):03d}',
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class CategoryRateLimitFilter(logging.Filter):
+    """
+    Limite le débit des enregistrements par catégorie (fenêtre fixe).
+    Les enregistrements sans catégorie et de niveau WARNING ou plus passent toujours.
+    """
+
+    def __init__(self, limits: dict):
+        super().__init__()
+        self.limits = dict(limits)
+        self._windows = {}   # catégorie -> [début de fenêtre, émis, supprimés]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        category = getattr(record, 'category', None)
+        if category is None or record.levelno >= logging.WARNING:
+            return True
+        limit = self.limits.get(category)
+        if limit is None:
+            return True
+        max_lines, window = limit
+        now = time.monotonic()
+        with self._lock:
+            state = self._windows.get(category)
+            if state is None or now - state[0] >= window:
+                suppressed = state[2] if state else 0
+                state = self._windows[category] = [now, 0, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+            if state[1] >= max_lines:
+                state[2] += 1
+                return False
+            state[1] += 1
+            return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {cat: {'emitted': s[1], 'suppressed': s[2]} for cat, s in self._windows.items()}
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler qui ne formate pas dans le thread appelant (file en mémoire du même processus)."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+rate_limit_filter = CategoryRateLimitFilter(DEFAULT_RATE_LIMITS)
+
+
+def setup_logging(level: str = None):
+    """Installe la file de journalisation sur le logger racine (idempotent)."""
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    level = (level or os.getenv('LOG_LEVEL') or 'INFO').upper()
+    log_queue = queue.SimpleQueue()
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter())
+
+    queue_handler = _DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(rate_limit_filter)
+
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging():
+    """Vide la file et arrête le thread d'écriture."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def set_log_level(level_name: str) -> str:
+    """Change le niveau du logger racine à chaud. Lève ValueError si le niveau est inconnu."""
+    level_name = level_name.upper()
+    if level_name not in ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'):
+        raise ValueError(level_name)
+    logging.getLogger().setLevel(level_name)
+    return level_name
@@ -2,47 +2,28 @@ import os
 import asyncio
 import re
 import logging
-import sys
 import json
-import zipfile
+import sys
 import io
-from datetime import datetime, timedelta, timezone, time
-from telethon import TelegramClient, events
-from telethon.sessions import StringSession
-from aiohttp import web
+from datetime import timedelta, timezone, time
 from config import (
     API_ID, API_HASH, BOT_TOKEN, ADMIN_ID,
     SOURCE_CHANNEL_1_ID, SOURCE_CHANNEL_2_ID, PREDICTION_CHANNEL_ID, PORT,
     PREDICTION_RULES_MORNING, PREDICTION_RULES_AFTERNOON, PREDICTION_RULES_EVENING,
     VERIFICATION_EMOJIS, ALL_SUITS, SUIT_DISPLAY,
-    DEFAULT_K, DEFAULT_A, DEFAULT_R, DEFAULT_ECART, MAX_GAME_NUMBER
+    DEFAULT_K, DEFAULT_A, DEFAULT_R, DEFAULT_ECART, MAX_GAME_NUMBER, LOG_LEVEL, DEPLOY_FILES
 )
+from logging_setup import setup_logging
+from game_cycle import cycle_add, cycle_distance
+from clock import SystemClock
 
-# Configuration du logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[logging.StreamHandler(sys.stdout)]
-)
 logger = logging.getLogger(__name__)
 
-# Vérifications de sécurité
-if not API_ID or API_ID == 0:
-    logger.error("API_ID manquant")
-    exit(1)
-if not API_HASH:
-    logger.error("API_HASH manquant")
-    exit(1)
-if not BOT_TOKEN:
-    logger.error("BOT_TOKEN manquant")
-    exit(1)
-
-logger.info(f"Config: SRC1={SOURCE_CHANNEL_1_ID}, SRC2={SOURCE_CHANNEL_2_ID}, PRED={PREDICTION_CHANNEL_ID}")
-
-session_string = os.getenv('TELEGRAM_SESSION', '')
-client = TelegramClient(StringSession(session_string), API_ID, API_HASH)
+# Client Telegram, créé au démarrage par create_client()
+client = None
 
 WAT_TZ = timezone(timedelta(hours=1))
+clock = SystemClock()
 
 # Variables globales
 pending_predictions = {}
@@ -75,7 +56,7 @@ def save_config():
     }
     try:
         with open(CONFIG_FILE, 'w') as f: json.dump(config, f)
-    except Exception as e: logger.error(f"Erreur save config: {e}")
+    except Exception as e: logger.error("Erreur save config: %s", e)
 
 def load_config():
     global k_position, a_offset, r_offset, ecart_list, ecart_index, last_predicted_game, intelligent_mode, admin_notifications
@@ -90,7 +71,7 @@ def load_config():
             last_predicted_game = config.get('last_predicted_game', 0)
             intelligent_mode = config.get('intelligent_mode', False)
             admin_notifications = config.get('admin_notifications', True)
-    except Exception as e: logger.error(f"Erreur load config: {e}")
+    except Exception as e: logger.error("Erreur load config: %s", e)
 
 # --- Fonctions Utilitaires ---
 def extract_game_number(message: str):
@@ -116,10 +97,10 @@ def has_suit_in_group(group_str: str, target_suit: str) -> bool:
     return target_suit in normalized
 
 def get_current_time_slot():
-    h = datetime.now(WAT_TZ).hour
+    h = clock.now(WAT_TZ).hour
     if 0 <= h <= 12: return 'morning'
     if 13 <= h < 19: return 'afternoon'
-    if h == 19 and datetime.now(WAT_TZ).minute == 0: return 'afternoon'
+    if h == 19 and clock.now(WAT_TZ).minute == 0: return 'afternoon'
     return 'evening'
 
 def predict_suit(source_suit: str) -> str:
@@ -147,7 +128,7 @@ def is_message_finalized(message: str) -> bool:
 
 def can_predict_game(game_number: int) -> bool:
     if last_predicted_game == 0: return True
-    return game_number >= last_predicted_game + get_current_ecart()
+    return cycle_distance(last_predicted_game, game_number) >= get_current_ecart()
 # --- Fonctions de Gestion des Messages ---
 
 async def send_prediction_to_channel(target_game: int, predicted_suit: str):
@@ -161,8 +142,8 @@ async def send_prediction_to_channel(target_game: int, predicted_suit: str):
             try:
                 sent = await client.send_message(PREDICTION_CHANNEL_ID, prediction_msg)
                 msg_id = sent.id
-                logger.info(f"✅ Prédiction #{target_game} envoyée")
-            except Exception as e: logger.error(f"❌ Erreur envoi: {e}")
+                logger.info("✅ Prédiction #%s envoyée", target_game, extra={'category': 'prediction'})
+            except Exception as e: logger.error("❌ Erreur envoi: %s", e)
         
         pending_predictions[target_game] = {
             'message_id': msg_id, 'suit': predicted_suit, 'suit_display': suit_display,
@@ -171,7 +152,7 @@ async def send_prediction_to_channel(target_game: int, predicted_suit: str):
         last_predicted_game = target_game
         advance_ecart()
         save_config()
-    except Exception as e: logger.error(f"Erreur send_prediction: {e}")
+    except Exception as e: logger.error("Erreur send_prediction: %s", e)
 
 async def update_prediction_status(game_number: int, new_status: str):
     if game_number not in pending_predictions: return
@@ -183,13 +164,13 @@ async def update_prediction_status(game_number: int, new_status: str):
         
         if new_status.startswith('✅') or new_status == '❌':
             del pending_predictions[game_number]
-    except Exception as e: logger.error(f"Erreur update: {e}")
+    except Exception as e: logger.error("Erreur update: %s", e)
 
 async def check_prediction_result(game_number: int, first_group: str):
     for pred_game in list(pending_predictions.keys()):
         if pred_game not in pending_predictions: continue
         pred = pending_predictions[pred_game]
-        expected_game = pred_game + pred['check_count']
+        expected_game = cycle_add(pred_game, pred['check_count'])
         
         if game_number == expected_game:
             if has_suit_in_group(first_group, pred['suit']):
@@ -222,7 +203,7 @@ async def process_source_1_message(message_text: str):
     if not suit: return
     
     pred_suit = suit if intelligent_mode else predict_suit(suit)
-    target = gn + a_offset
+    target = cycle_add(gn, a_offset)
     
     if can_predict_game(target) and target not in pending_predictions:
         await send_prediction_to_channel(target, pred_suit)
@@ -240,7 +221,6 @@ async def process_source_2_message(message_text: str):
     if groups:
         await check_prediction_result(gn, groups[0])
 
-@client.on(events.NewMessage())
 async def handle_all_messages(event):
     """
     CORRECTION MAJEURE: Utilise abs() pour comparer les IDs.
@@ -253,18 +233,17 @@ async def handle_all_messages(event):
         abs_id = abs(chat_id)
         
         if abs_id == abs(SOURCE_CHANNEL_1_ID):
-            logger.info(f"[SOURCE 1] Reçu: {text[:30]}")
+            logger.info("[SOURCE 1] Reçu: %s", text[:30], extra={'category': 'source'})
             if text: await process_source_1_message(text)
             
         elif abs_id == abs(SOURCE_CHANNEL_2_ID):
-            logger.info(f"[SOURCE 2] Reçu: {text[:30]}")
+            logger.info("[SOURCE 2] Reçu: %s", text[:30], extra={'category': 'source'})
             if text: await process_source_2_message(text)
             
     except Exception as e:
-        logger.error(f"Erreur handler: {e}")
+        logger.error("Erreur handler: %s", e)
 
 # Handler RAW pour plus de robustesse
-@client.on(events.Raw())
 async def handle_raw_updates(event):
     try:
         from telethon.tl.types import UpdateNewChannelMessage
@@ -282,7 +261,6 @@ async def handle_raw_updates(event):
     except Exception: pass
     # --- Commandes Admin ---
 
-@client.on(events.NewMessage(pattern=r'^/k\s*(\d+)$'))
 async def cmd_k(event):
     if event.sender_id != ADMIN_ID: return
     global k_position
@@ -290,7 +268,6 @@ async def cmd_k(event):
     save_config()
     await event.respond(f"✅ k={k_position}")
 
-@client.on(events.NewMessage(pattern=r'^/a\s*(\d+)$'))
 async def cmd_a(event):
     if event.sender_id != ADMIN_ID: return
     global a_offset
@@ -298,7 +275,6 @@ async def cmd_a(event):
     save_config()
     await event.respond(f"✅ a={a_offset}")
 
-@client.on(events.NewMessage(pattern=r'^/r\s*(\d+)$'))
 async def cmd_r(event):
     if event.sender_id != ADMIN_ID: return
     global r_offset
@@ -306,7 +282,6 @@ async def cmd_r(event):
     save_config()
     await event.respond(f"✅ r={r_offset}")
 
-@client.on(events.NewMessage(pattern=r'^/eca\s*(.+)$'))
 async def cmd_eca(event):
     if event.sender_id != ADMIN_ID: return
     global ecart_list, ecart_index
@@ -317,7 +292,6 @@ async def cmd_eca(event):
     save_config()
     await event.respond(f"✅ ecarts={ecart_list}")
 
-@client.on(events.NewMessage(pattern='/inter'))
 async def cmd_inter(event):
     if event.sender_id != ADMIN_ID: return
     global intelligent_mode
@@ -325,7 +299,6 @@ async def cmd_inter(event):
     save_config()
     await event.respond(f"✅ Mode Intelligent: {intelligent_mode}")
 
-@client.on(events.NewMessage(pattern='/status'))
 async def cmd_status(event):
     if event.sender_id != ADMIN_ID: return
     msg = f"""📊 **État**
@@ -337,7 +310,6 @@ Preds actives: {len(pending_predictions)}
 """
     await event.respond(msg)
 
-@client.on(events.NewMessage(pattern='/deploy'))
 async def cmd_deploy(event):
     if event.sender_id != ADMIN_ID: return
     await event.respond(f"Lien: http://localhost:{PORT}/download")
@@ -345,13 +317,16 @@ async def cmd_deploy(event):
 # --- Serveur Web & Main ---
 
 async def download_zip(request):
+    import zipfile
+    from aiohttp import web
     buf = io.BytesIO()
     with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as zf:
-        for f in ['main.py', 'config.py', 'requirements.txt', 'render.yaml']:
+        for f in DEPLOY_FILES:
             if os.path.exists(f): zf.writestr(f, open(f).read())
     return web.Response(body=buf.getvalue(), content_type='application/zip')
 
 async def start_web():
+    from aiohttp import web
     app = web.Application()
     app.router.add_get('/', lambda r: web.Response(text="Bot Online"))
     app.router.add_get('/download', download_zip)
@@ -361,14 +336,41 @@ async def start_web():
 
 async def schedule_reset():
     while True:
-        now = datetime.now(WAT_TZ)
-        target = now.replace(hour=0, minute=59, second=0)
+        now = clock.now(WAT_TZ)
+        target = now.replace(hour=0, minute=59, second=0, microsecond=0)
         if now >= target: target += timedelta(days=1)
         await asyncio.sleep((target - now).total_seconds())
         pending_predictions.clear()
         processed_messages.clear()
         logger.info("♻️ Reset quotidien")
 
+def check_credentials() -> bool:
+    """Vérifications de sécurité des identifiants obligatoires."""
+    ok = True
+    for name, value in (('API_ID', API_ID), ('API_HASH', API_HASH), ('BOT_TOKEN', BOT_TOKEN)):
+        if not value:
+            logger.error("%s manquant", name)
+            ok = False
+    return ok
+
+def create_client():
+    """Crée le client Telegram et enregistre les gestionnaires."""
+    global client
+    from telethon import TelegramClient, events
+    from telethon.sessions import StringSession
+    session_string = os.getenv('TELEGRAM_SESSION', '')
+    client = TelegramClient(StringSession(session_string), API_ID, API_HASH)
+    client.add_event_handler(handle_all_messages, events.NewMessage())
+    client.add_event_handler(handle_raw_updates, events.Raw())
+    client.add_event_handler(cmd_k, events.NewMessage(pattern=r'^/k\s*(\d+)$'))
+    client.add_event_handler(cmd_a, events.NewMessage(pattern=r'^/a\s*(\d+)$'))
+    client.add_event_handler(cmd_r, events.NewMessage(pattern=r'^/r\s*(\d+)$'))
+    client.add_event_handler(cmd_eca, events.NewMessage(pattern=r'^/eca\s*(.+)$'))
+    client.add_event_handler(cmd_inter, events.NewMessage(pattern='/inter'))
+    client.add_event_handler(cmd_status, events.NewMessage(pattern='/status'))
+    client.add_event_handler(cmd_deploy, events.NewMessage(pattern='/deploy'))
+    return client
+
 async def main():
     load_config()
     await start_web()
@@ -396,8 +398,17 @@ async def main():
     logger.info("Bot Démarré et Prêt.")
     await client.run_until_disconnected()
 
-if __name__ == '__main__':
+def run():
+    """Point d'entrée: journalisation (file asynchrone, lignes JSON), identifiants, client, boucle."""
+    setup_logging(LOG_LEVEL)
+    if not check_credentials():
+        sys.exit(1)
+    logger.info("Config: SRC1=%s, SRC2=%s, PRED=%s", SOURCE_CHANNEL_1_ID, SOURCE_CHANNEL_2_ID, PREDICTION_CHANNEL_ID)
+    create_client()
     try:
         asyncio.run(main())
     except Exception as e:
-        logger.error(f"Crash: {e}")
+        logger.error("Crash: %s", e)
+
+if __name__ == '__main__':
+    run()
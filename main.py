@@ -1,62 +1,99 @@
+"""
+Bot Telegram de prédiction: câblage Telethon/aiohttp autour du moteur (engine.py).
+L'import est sans effet de bord (ni connexion, ni vérification des variables,
+ni import de Telethon/aiohttp): tout démarre dans run(), le point d'entrée.
+"""
 import os
+import sys
 import asyncio
 import re
 import logging
-import sys
 import json
-import zipfile
 import io
-from datetime import datetime, timedelta, timezone, time
-from telethon import TelegramClient, events
-from telethon.sessions import StringSession
-from aiohttp import web
+import tempfile
+from collections import deque
+from datetime import datetime
 from config import (
     API_ID, API_HASH, BOT_TOKEN, ADMIN_ID,
     SOURCE_CHANNEL_1_ID, SOURCE_CHANNEL_2_ID, PREDICTION_CHANNEL_ID, PORT,
-    PREDICTION_RULES_MORNING, PREDICTION_RULES_AFTERNOON, PREDICTION_RULES_EVENING,
-    VERIFICATION_EMOJIS, ALL_SUITS, SUIT_DISPLAY,
-    DEFAULT_K, DEFAULT_A, DEFAULT_R, DEFAULT_ECART, MAX_GAME_NUMBER
+    VERIFICATION_EMOJIS, SUIT_DISPLAY, DEFAULT_ECART,
+    PREDICTION_EXPIRY_MINUTES, LOG_LEVEL, REPLICA_LEASE_PATH, LEASE_TTL_SECONDS, ADMIN_HTTP_TOKEN,
+    HEALTH_MAX_LOOP_LAG, HEALTH_MAX_FEED_AGE, HEALTH_MAX_OUTBOUND, HEALTH_MAX_SOURCE_BACKLOG, HEALTH_MAX_FANOUT_PENDING,
+    RECONCILE_HISTORY_LIMIT, SUBSCRIBERS_DB_PATH, FANOUT_GLOBAL_RATE, FANOUT_PER_CHAT_INTERVAL,
+    LAG_BUDGET_SECONDS, LAG_WINDOW, RESULTS_DB_PATH, PROFILES_PATH,
+    SENDER_BOT_TOKENS, SENDER_MAX_WAIT, MEMORY_BUDGET_MB, MEMORY_CHECK_INTERVAL, DEPLOY_FILES
 )
+from logging_setup import setup_logging, set_log_level, rate_limit_filter
+from scheduler import Scheduler
+from clock import SystemClock
+from parsing import parse_prediction_message
+from game_cycle import game_day, suits_mask, cycle_distance
+from state import Prediction, PredictionStatus
+from engine import PredictionEngine, WAT_TZ, time_slot_at
+import memory_report
+import history_index
+from profiler import Profiler, MAX_SECONDS as PROFILE_MAX_SECONDS
+from health import HealthMonitor
+from subscribers import SubscriberStore, FanOut
+from freshness import LagTracker
+from result_store import ResultStore
+from prediction_export import FORMATS as EXPORT_FORMATS, parse_day, stream_predictions
+from profiles import ProfileSet, parse_params, PARAMS_USAGE
+from sender_pool import SenderPool
+from memory_governor import MemoryGovernor
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[logging.StreamHandler(sys.stdout)]
-)
 logger = logging.getLogger(__name__)
 
-if not API_ID or API_ID == 0:
-    logger.error("API_ID manquant")
-    exit(1)
-if not API_HASH:
-    logger.error("API_HASH manquant")
-    exit(1)
-if not BOT_TOKEN:
-    logger.error("BOT_TOKEN manquant")
-    exit(1)
-
-logger.info(f"Configuration: SOURCE_1={SOURCE_CHANNEL_1_ID}, SOURCE_2={SOURCE_CHANNEL_2_ID}, PREDICTION={PREDICTION_CHANNEL_ID}")
-
-session_string = os.getenv('TELEGRAM_SESSION', '')
-client = TelegramClient(StringSession(session_string), API_ID, API_HASH)
-
-# Timezone WAT (West Africa Time, UTC+1) - même fuseau que le Bénin
-WAT_TZ = timezone(timedelta(hours=1))
-
-# Variables globales d'état
-pending_predictions = {}
-processed_messages = set()
-current_game_number = 0
-last_predicted_game = 0
-
-# Paramètres configurables
-k_position = DEFAULT_K          # Position de la carte à utiliser (1, 2, 3...)
-a_offset = DEFAULT_A            # Offset pour la prédiction (N+a)
-r_offset = DEFAULT_R            # Nombre d'essais de vérification (0 à 10)
-ecart_list = []                 # Liste des écarts personnalisés
-ecart_index = 0                 # Index actuel dans la liste des écarts
-intelligent_mode = False        # Mode intelligent (règle inter): prédit la carte exacte à position k
-admin_notifications = True      # Envoyer les notifications au chat privé admin
+# Client Telegram, créé par create_client() au démarrage
+client = None
+
+# Pool d'expéditeurs (client principal + SENDER_BOT_TOKENS) pour les canaux de prédiction,
+# ouvert au démarrage si des jetons supplémentaires sont configurés
+sender_pool = None
+
+# Horloge du moteur (remplacée par une VirtualClock en simulation)
+clock = SystemClock()
+
+# Planificateur supervisé (reset quotidien, plages horaires, expiration des prédictions)
+scheduler = Scheduler(WAT_TZ, clock=clock)
+
+# Bail de publication partagé entre réplicas (None = instance unique), ouvert au démarrage
+lease = None
+
+# Moteur de prédiction et son état: paramètres configurables, cycle de jeux et prédictions actives
+engine = PredictionEngine(clock=clock)
+state = engine.state
+
+# Profils de stratégie supplémentaires (un canal et un moteur chacun), chargés au démarrage
+profiles = ProfileSet(PROFILES_PATH, clock=clock)
+
+# Sondes /health et /ready (retard de boucle, fraîcheur des sources, envois en cours)
+health = HealthMonitor(max_loop_lag=HEALTH_MAX_LOOP_LAG, max_feed_age=HEALTH_MAX_FEED_AGE,
+                       max_outbound=HEALTH_MAX_OUTBOUND)
+
+# Retard de bout en bout message source -> prédiction publiée/mise à jour (percentiles, alerte p95)
+freshness = LagTracker(budget=LAG_BUDGET_SECONDS, window=LAG_WINDOW)
+
+# Base des résultats et de l'historique des prédictions (exports), ouverte au démarrage
+result_store = None
+
+# Matrices de transition (analytics.py, NumPy): construites à la première commande /analytics,
+# puis mises à jour à chaque résultat de la source 1
+transition_matrices = None
+
+# Index des séries et séquences (history_index.py): construit à la première requête /query,
+# puis alimenté par chaque résultat de la source 1
+history = None
+
+# Abonnés aux notifications privées et leur file de diffusion, ouverts au démarrage
+subscribers = None
+fanout = None
+
+# Gouverneur mémoire: empreinte de chaque cache, réduits au-delà du budget (MEMORY_BUDGET_MB)
+memory = MemoryGovernor(budget=int(MEMORY_BUDGET_MB * 1024 * 1024), interval=MEMORY_CHECK_INTERVAL)
+
+# Profileur à la demande (/profile, /debug/profile): inactif tant qu'il n'est pas appelé
+profiler = Profiler()
 
 # Flags d'état des canaux
 source_channel_1_ok = False
@@ -67,516 +104,487 @@ transfer_enabled = True
 # Fichier de configuration persistante
 CONFIG_FILE = 'bot_config.json'
 
+def check_credentials() -> bool:
+    """Vérifie les identifiants Telegram obligatoires."""
+    ok = True
+    if not API_ID or API_ID == 0:
+        logger.error("API_ID manquant")
+        ok = False
+    if not API_HASH:
+        logger.error("API_HASH manquant")
+        ok = False
+    if not BOT_TOKEN:
+        logger.error("BOT_TOKEN manquant")
+        ok = False
+    return ok
+
+def create_client():
+    """Crée le client Telegram et enregistre les gestionnaires."""
+    global client
+    from telethon import TelegramClient, events
+    from telethon.sessions import StringSession
+    
+    session_string = os.getenv('TELEGRAM_SESSION', '')
+    client = TelegramClient(StringSession(session_string), API_ID, API_HASH)
+    client.add_event_handler(handle_source_1, events.NewMessage(chats=[SOURCE_CHANNEL_1_ID]))
+    client.add_event_handler(handle_source_2, events.NewMessage(chats=[SOURCE_CHANNEL_2_ID]))
+    client.add_event_handler(handle_command, events.NewMessage(incoming=True, func=lambda e: e.is_private))
+    return client
+
 def save_config():
     """Sauvegarde la configuration dans un fichier JSON."""
-    config = {
-        'k_position': k_position,
-        'a_offset': a_offset,
-        'r_offset': r_offset,
-        'ecart_list': ecart_list,
-        'ecart_index': ecart_index,
-        'last_predicted_game': last_predicted_game,
-        'intelligent_mode': intelligent_mode,
-        'admin_notifications': admin_notifications
-    }
+    config = state.to_config()
     try:
         with open(CONFIG_FILE, 'w') as f:
             json.dump(config, f)
-        logger.info("Configuration sauvegardée")
+        logger.debug("Configuration sauvegardée")
     except Exception as e:
-        logger.error(f"Erreur sauvegarde config: {e}")
+        logger.error("Erreur sauvegarde config: %s", e)
 
 def load_config():
     """Charge la configuration depuis un fichier JSON."""
-    global k_position, a_offset, r_offset, ecart_list, ecart_index, last_predicted_game, intelligent_mode, admin_notifications
     try:
         if os.path.exists(CONFIG_FILE):
             with open(CONFIG_FILE, 'r') as f:
                 config = json.load(f)
-            k_position = config.get('k_position', DEFAULT_K)
-            a_offset = config.get('a_offset', DEFAULT_A)
-            r_offset = config.get('r_offset', DEFAULT_R)
-            ecart_list = config.get('ecart_list', [])
-            ecart_index = config.get('ecart_index', 0)
-            last_predicted_game = config.get('last_predicted_game', 0)
-            intelligent_mode = config.get('intelligent_mode', False)
-            admin_notifications = config.get('admin_notifications', True)
-            mode_str = "intelligent" if intelligent_mode else "statique"
-            logger.info(f"Configuration chargée: k={k_position}, a={a_offset}, r={r_offset}, ecarts={ecart_list}, mode={mode_str}, notifications={'on' if admin_notifications else 'off'}")
+            state.apply_config(config)
+            mode_str = "intelligent" if state.intelligent_mode else "statique"
+            logger.info("Configuration chargée: k=%s, a=%s, r=%s, ecarts=%s, mode=%s, notifications=%s",
+                        state.k_position, state.a_offset, state.r_offset, state.ecart_list, mode_str,
+                        'on' if state.admin_notifications else 'off')
     except Exception as e:
-        logger.error(f"Erreur chargement config: {e}")
-
-def extract_game_number(message: str):
-    """Extrait le numéro de jeu du message."""
-    match = re.search(r"#N\s*(\d+)\.?", message, re.IGNORECASE)
-    if match:
-        return int(match.group(1))
-    return None
-
-def extract_parentheses_groups(message: str):
-    """Extrait le contenu entre parenthèses."""
-    return re.findall(r"\(([^)]*)\)", message)
-
-def normalize_suits(group_str: str) -> str:
-    """Remplace les différentes variantes de symboles par un format unique."""
-    normalized = group_str.replace('❤️', '♥').replace('❤', '♥').replace('♥️', '♥')
-    normalized = normalized.replace('♠️', '♠').replace('♦️', '♦').replace('♣️', '♣')
-    return normalized
-
-def get_suits_in_group(group_str: str):
-    """Liste toutes les couleurs présentes dans une chaîne."""
-    normalized = normalize_suits(group_str)
-    return [s for s in ALL_SUITS if s in normalized]
-
-def get_suit_at_position(group_str: str, position: int) -> str:
-    """
-    Extrait la couleur à la position k dans le premier groupe.
-    Position commence à 1.
-    Exemple: "10♦️5♥️J♣️" avec position=1 retourne ♦, position=2 retourne ♥, position=3 retourne ♣
-    """
-    normalized = normalize_suits(group_str)
-    suits_found = []
-    for char in normalized:
-        if char in ALL_SUITS:
-            suits_found.append(char)
-    
-    if position <= 0 or position > len(suits_found):
-        return None
-    
-    return suits_found[position - 1]
+        logger.error("Erreur chargement config: %s", e)
 
-def has_suit_in_group(group_str: str, target_suit: str) -> bool:
-    """Vérifie si la couleur cible est présente dans le groupe."""
-    normalized = normalize_suits(group_str)
-    target_normalized = normalize_suits(target_suit)
-    for suit in ALL_SUITS:
-        if suit in target_normalized and suit in normalized:
-            return True
-    return False
+def publisher():
+    """Client des envois et éditions dans les canaux de prédiction: le pool, ou le client principal."""
+    return sender_pool if sender_pool is not None else client
 
-def get_current_time_slot():
-    """
-    Détermine la plage horaire actuelle selon l'heure béninoise (WAT).
-    Retourne: 'morning' (00h-12h), 'afternoon' (13h-19h), 'evening' (19h01-23h59)
-    """
-    now = datetime.now(WAT_TZ)
-    hour = now.hour
-    minute = now.minute
-    
-    if hour >= 0 and hour <= 12:
-        return 'morning'
-    elif hour >= 13 and hour <= 19 and minute == 0:
-        return 'afternoon'
-    elif hour >= 13 and hour < 19:
-        return 'afternoon'
-    elif hour == 19 and minute >= 1:
-        return 'evening'
-    elif hour > 19:
-        return 'evening'
-    else:
-        return 'afternoon'
-
-def get_prediction_rules():
-    """Retourne les règles de prédiction selon la plage horaire actuelle."""
-    time_slot = get_current_time_slot()
-    if time_slot == 'morning':
-        return PREDICTION_RULES_MORNING
-    elif time_slot == 'afternoon':
-        return PREDICTION_RULES_AFTERNOON
+def is_publisher() -> bool:
+    """Vrai si ce processus doit publier (instance unique ou détenteur du bail)."""
+    return lease is None or lease.holds_lease
+
+def notify_subscribers(text: str):
+    """Met en file une notification pour les abonnés (sans attendre les envois)."""
+    if fanout is not None and is_publisher():
+        fanout.notify(text)
+
+def record_lag(kind: str, source_posted_at: float):
+    """Mesure le retard depuis la date du message source et alerte l'admin si le p95 franchit le budget."""
+    if source_posted_at is None:
+        return
+    change = freshness.record(kind, clock.time() - source_posted_at)
+    if change is None or not ADMIN_ID or client is None:
+        return
+    p95 = freshness.stats(kind)['p95']
+    if change == 'alert':
+        text = f"🐌 **Retard de publication ({kind})**\n\np95 = {p95:.1f}s, au-dessus du budget de {LAG_BUDGET_SECONDS:.0f}s"
     else:
-        return PREDICTION_RULES_EVENING
+        text = f"✅ Retard de publication ({kind}) revenu sous le budget: p95 = {p95:.1f}s"
+    scheduler.run_now(client.send_message, ADMIN_ID, text, name='alerte_retard')
 
-def predict_suit(source_suit: str) -> str:
+def profile_key(profile) -> str:
+    """Clé d'un profil dans les réservations de publication et l'historique ('' = profil principal)."""
+    return profile.name if profile is not None else ''
+
+def persist_prediction(pred: Prediction, profile=None):
     """
-    Applique les règles de prédiction selon l'heure béninoise.
-    Prend la couleur source à la position k et retourne la couleur prédite.
+    Enregistre (ou met à jour à la clôture) une prédiction publiée dans l'historique.
+    Écriture par la tâche d'écriture de la base, hors de la boucle asyncio.
     """
-    rules = get_prediction_rules()
-    normalized = normalize_suits(source_suit)
-    for suit in ALL_SUITS:
-        if suit in normalized:
-            return rules.get(suit, suit)
-    return source_suit
-
-def get_current_ecart():
-    """Retourne l'écart actuel selon la liste des écarts ou l'écart par défaut."""
-    global ecart_index
-    if not ecart_list:
-        return DEFAULT_ECART
-    
-    if ecart_index >= len(ecart_list):
-        ecart_index = 0
-    
-    return ecart_list[ecart_index]
-
-def advance_ecart():
-    """Avance à l'écart suivant dans la liste."""
-    global ecart_index
-    if ecart_list:
-        ecart_index = (ecart_index + 1) % len(ecart_list)
-        save_config()
-
-def is_message_finalized(message: str) -> bool:
-    """Vérifie si le message est un résultat final (non en cours)."""
-    if '⏰' in message:
-        return False
-    return '✅' in message or '🔰' in message
-
-def can_predict_game(game_number: int) -> bool:
+    if result_store is None or not pred.day or not is_publisher():
+        return
+    result_store.submit_prediction((
+        pred.day, pred.game, pred.suit, pred.status.name.lower(), pred.status_text,
+        pred.check_count, pred.max_checks, pred.message_id,
+        datetime.fromtimestamp(pred.created_at, WAT_TZ).isoformat(timespec='seconds'),
+        clock.now(WAT_TZ).isoformat(timespec='seconds') if pred.is_final else None,
+        profile_key(profile),
+    ))
+
+def prediction_text(game: int, suit_display: str, status_text: str) -> str:
+    """Message de prédiction publié puis édité dans un canal de prédiction."""
+    return f"🔵{game}🔵:{suit_display} statut :{status_text}"
+
+def track_prediction(pred: Prediction, expiry_delay: float = PREDICTION_EXPIRY_MINUTES * 60):
+    """Planifie l'expiration d'une prédiction et l'ajoute aux prédictions actives."""
+    pred.expiry_timer = scheduler.call_later(expiry_delay, expire_prediction, pred.game, name='expiration_prediction')
+    engine.track(pred)
+
+def prediction_channel(profile):
+    """(canal, accès vérifié, état du moteur) d'un profil (None = profil principal)."""
+    if profile is None:
+        return PREDICTION_CHANNEL_ID, prediction_channel_ok, state
+    return profile.channel_id, profile.channel_ok, profile.state
+
+async def publish_prediction(profile, target_game: int, text: str, day: str, source_posted_at: float = None) -> int:
     """
-    Vérifie si on peut prédire pour ce numéro de jeu.
-    Évite les prédictions pour des numéros consécutifs (écart minimum).
+    Publie le message ⏳ d'un jeu cible dans le canal d'un profil (None = profil principal).
+    Avec des réplicas, la publication est d'abord réservée par (profil, journée, jeu): en veille,
+    ou si un autre réplica l'a déjà publiée, on reprend son msg_id sans republier.
+    Retourne le msg_id (0 si non publié).
     """
-    global last_predicted_game
-    ecart = get_current_ecart()
-    
-    if last_predicted_game == 0:
-        return True
-    
-    if game_number >= last_predicted_game + ecart:
-        return True
+    key = profile_key(profile)
+    label = f"[{key}] " if key else ""
+    if lease is not None and not (lease.holds_lease and lease.claim_publication(day, target_game, key)):
+        msg_id = lease.published_message_id(day, target_game, key)
+        logger.info("%sPrédiction #%s suivie sans publication (réplica %s)", label, target_game,
+                    'actif' if lease.holds_lease else 'en veille', extra={'category': 'prediction'})
+        return msg_id
     
-    return False
-
-async def send_prediction_to_channel(target_game: int, predicted_suit: str):
-    """Envoie la prédiction au canal de prédiction."""
-    global last_predicted_game
+    channel_id, channel_ok, channel_state = prediction_channel(profile)
+    if not (channel_id and channel_ok):
+        logger.warning("⚠️ %sCanal de prédiction non accessible", label)
+        return 0
+    try:
+        with health.outbound():
+            pred_msg = await publisher().send_message(channel_id, text)
+    except Exception as e:
+        logger.error("❌ %sErreur envoi prédiction #%s: %s", label, target_game, e)
+        return 0
+    record_lag('publish', source_posted_at)
+    channel_state.last_prediction_message_id = max(channel_state.last_prediction_message_id, pred_msg.id)
+    if lease is not None:
+        lease.record_message_id(day, target_game, pred_msg.id, key)
+    logger.info("✅ %sPrédiction #%s envoyée au canal (msg_id: %s)", label, target_game, pred_msg.id,
+                extra={'category': 'prediction'})
+    return pred_msg.id
+
+def resolve_message_id(pred: Prediction, profile=None):
+    """Prédiction publiée par un autre réplica avant la bascule: msg_id repris des réservations."""
+    if not pred.message_id and lease is not None and pred.day:
+        pred.message_id = lease.published_message_id(pred.day, pred.game, profile_key(profile))
+
+async def send_prediction_to_channel(target_game: int, predicted_suit: str, source_posted_at: float = None):
+    """Envoie la prédiction au canal de prédiction (source_posted_at: date du message source, pour le retard)."""
     try:
         suit_display = SUIT_DISPLAY.get(predicted_suit, predicted_suit)
-        prediction_msg = f"🔵{target_game}🔵:{suit_display} statut :⏳"
-        
-        msg_id = 0
-        
-        if PREDICTION_CHANNEL_ID and PREDICTION_CHANNEL_ID != 0 and prediction_channel_ok:
-            try:
-                pred_msg = await client.send_message(PREDICTION_CHANNEL_ID, prediction_msg)
-                msg_id = pred_msg.id
-                logger.info(f"✅ Prédiction #{target_game} envoyée au canal (msg_id: {msg_id})")
-            except Exception as e:
-                logger.error(f"❌ Erreur envoi prédiction #{target_game}: {e}")
-        else:
-            logger.warning(f"⚠️ Canal de prédiction non accessible")
-        
-        pending_predictions[target_game] = {
-            'message_id': msg_id,
-            'suit': predicted_suit,
-            'suit_display': suit_display,
-            'status': '⏳',
-            'check_count': 0,
-            'max_checks': r_offset + 1,
-            'created_at': datetime.now().isoformat()
-        }
-        
-        last_predicted_game = target_game
-        advance_ecart()
+        prediction_msg = prediction_text(target_game, suit_display, '⏳')
+        day = game_day(clock.now(WAT_TZ))
+        msg_id = await publish_prediction(None, target_game, prediction_msg, day, source_posted_at)
+        
+        pred = Prediction(target_game, predicted_suit, state.r_offset + 1, message_id=msg_id, day=day,
+                          created_at=clock.time())
+        track_prediction(pred)
+        logger.info("Prédiction active: Jeu #%s - %s", target_game, suit_display, extra={'category': 'prediction'})
+        notify_subscribers(prediction_msg)
+        persist_prediction(pred)
+        
+        # Jeux de vérification déjà connus (ex: a=0, cible = jeu qui vient d'être vu)
+        finalized = engine.add_prediction(pred)
         save_config()
-        
-        logger.info(f"Prédiction active: Jeu #{target_game} - {suit_display}")
+        await publish_results(finalized, source_posted_at)
         return msg_id
         
-    except Exception as e:
-        logger.error(f"Erreur envoi prédiction: {e}")
+    except Exception:
+        logger.exception("Erreur envoi prédiction")
         return None
 
-async def update_prediction_status(game_number: int, new_status: str):
-    """Met à jour le message de prédiction dans le canal."""
+async def publish_status(pred: Prediction, source_posted_at: float = None):
+    """Met à jour le message de prédiction dans le canal avec le statut de la prédiction."""
     try:
-        if game_number not in pending_predictions:
-            return False
-        
-        pred = pending_predictions[game_number]
-        message_id = pred['message_id']
-        suit_display = pred['suit_display']
-        
-        updated_msg = f"🔵{game_number}🔵:{suit_display} statut :{new_status}"
+        resolve_message_id(pred)
+        status_text = pred.status_text
+        updated_msg = prediction_text(pred.game, pred.suit_display, status_text)
         
-        if PREDICTION_CHANNEL_ID and PREDICTION_CHANNEL_ID != 0 and message_id > 0 and prediction_channel_ok:
+        if PREDICTION_CHANNEL_ID and PREDICTION_CHANNEL_ID != 0 and pred.message_id > 0 and prediction_channel_ok and is_publisher():
             try:
-                await client.edit_message(PREDICTION_CHANNEL_ID, message_id, updated_msg)
-                logger.info(f"✅ Prédiction #{game_number} mise à jour: {new_status}")
+                with health.outbound():
+                    await publisher().edit_message(PREDICTION_CHANNEL_ID, pred.message_id, updated_msg)
+                if pred.is_final:
+                    record_lag('result', source_posted_at)
+                logger.info("✅ Prédiction #%s mise à jour: %s", pred.game, status_text,
+                            extra={'category': 'prediction'})
             except Exception as e:
-                logger.error(f"❌ Erreur mise à jour: {e}")
-        
-        pred['status'] = new_status
-        
-        if new_status.startswith('✅') or new_status == '❌':
-            del pending_predictions[game_number]
-            logger.info(f"Prédiction #{game_number} terminée")
+                logger.error("❌ Erreur mise à jour: %s", e)
         
+        if pred.is_final:
+            logger.info("Prédiction #%s terminée", pred.game, extra={'category': 'prediction'})
+            notify_subscribers(updated_msg)
+            persist_prediction(pred)
         return True
         
-    except Exception as e:
-        logger.error(f"Erreur mise à jour prédiction: {e}")
+    except Exception:
+        logger.exception("Erreur mise à jour prédiction")
         return False
 
-async def check_prediction_result(game_number: int, first_group: str):
-    """
-    Vérifie les résultats des prédictions actives.
-    Utilise le système d'offset r pour vérifier sur plusieurs jeux consécutifs.
-    """
-    predictions_to_check = list(pending_predictions.keys())
-    
-    if not predictions_to_check:
-        logger.debug(f"Aucune prédiction en attente pour le jeu #{game_number}")
+async def publish_results(finalized: list, source_posted_at: float = None):
+    """Publie le statut final des prédictions clôturées par le moteur."""
+    for pred in finalized:
+        await publish_status(pred, source_posted_at)
+
+async def expire_prediction(game_number: int):
+    """Clôture en ❌ une prédiction dont les jeux de vérification ne sont jamais arrivés."""
+    pred = engine.expire(game_number)
+    if pred is None:
         return
+    logger.warning("⌛ Prédiction #%s expirée après %s min sans vérification", game_number, PREDICTION_EXPIRY_MINUTES)
+    await publish_status(pred)
+
+def track_profile_prediction(profile, pred: Prediction, expiry_delay: float = PREDICTION_EXPIRY_MINUTES * 60):
+    """Planifie l'expiration d'une prédiction d'un profil et l'ajoute à ses prédictions actives."""
+    pred.expiry_timer = scheduler.call_later(
+        expiry_delay, expire_profile_prediction, profile, pred.game, name='expiration_prediction'
+    )
+    profile.engine.track(pred)
+
+async def send_profile_prediction(profile, decision, source_posted_at: float = None):
+    """Publie la prédiction d'un profil dans son canal et l'ajoute à ses prédictions actives."""
+    target_game = decision.target_game
+    suit_display = SUIT_DISPLAY.get(decision.predicted_suit, decision.predicted_suit)
+    day = game_day(clock.now(WAT_TZ))
+    msg_id = await publish_prediction(profile, target_game, prediction_text(target_game, suit_display, '⏳'), day,
+                                      source_posted_at)
     
-    logger.info(f"Vérification du jeu #{game_number} - Prédictions actives: {predictions_to_check}")
-    
-    for pred_game in predictions_to_check:
-        if pred_game not in pending_predictions:
-            continue
-            
-        pred = pending_predictions[pred_game]
-        target_suit = pred['suit']
-        suit_display = pred.get('suit_display', target_suit)
-        check_count = pred.get('check_count', 0)
-        max_checks = pred.get('max_checks', r_offset + 1)
-        
-        expected_game = pred_game + check_count
-        
-        logger.debug(f"Prédiction #{pred_game}: attend jeu #{expected_game} (N+{check_count}), reçu #{game_number}")
-        
-        if game_number == expected_game:
-            logger.info(f"Match trouvé! Vérification de {suit_display} dans '{first_group}'")
-            if has_suit_in_group(first_group, target_suit):
-                success_emoji = VERIFICATION_EMOJIS.get(check_count, f"✅{check_count}️⃣")
-                await update_prediction_status(pred_game, success_emoji)
-                logger.info(f"✅ Prédiction #{pred_game} réussie à N+{check_count} - Statut: {success_emoji}")
-            else:
-                pred['check_count'] = check_count + 1
-                
-                if pred['check_count'] >= max_checks:
-                    await update_prediction_status(pred_game, '❌')
-                    logger.info(f"❌ Prédiction #{pred_game} échouée après {max_checks} vérifications")
-                else:
-                    logger.info(f"⏳ Prédiction #{pred_game}: vérification {check_count + 1}/{max_checks}, attente N+{check_count + 1}")
-
-async def process_source_1_message(message_text: str, chat_id: int):
+    pred = Prediction(target_game, decision.predicted_suit, profile.state.r_offset + 1, message_id=msg_id,
+                      day=day, created_at=clock.time())
+    track_profile_prediction(profile, pred)
+    persist_prediction(pred, profile)
+    finalized = profile.engine.add_prediction(pred)
+    profiles.save()
+    await publish_profile_results(profile, finalized, source_posted_at)
+
+async def publish_profile_status(profile, pred: Prediction, source_posted_at: float = None):
+    """Met à jour le message de prédiction d'un profil avec son statut."""
+    resolve_message_id(pred, profile)
+    if pred.message_id > 0 and profile.channel_ok and is_publisher():
+        try:
+            with health.outbound():
+                await publisher().edit_message(profile.channel_id, pred.message_id,
+                                               prediction_text(pred.game, pred.suit_display, pred.status_text))
+            if pred.is_final:
+                record_lag('result', source_posted_at)
+            logger.info("✅ [%s] Prédiction #%s mise à jour: %s", profile.name, pred.game, pred.status_text,
+                        extra={'category': 'prediction'})
+        except Exception as e:
+            logger.error("❌ [%s] Erreur mise à jour: %s", profile.name, e)
+    if pred.is_final:
+        persist_prediction(pred, profile)
+
+async def publish_profile_results(profile, finalized: list, source_posted_at: float = None):
+    for pred in finalized:
+        await publish_profile_status(profile, pred, source_posted_at)
+
+async def expire_profile_prediction(profile, game_number: int):
+    pred = profile.engine.expire(game_number)
+    if pred is None:
+        return
+    logger.warning("⌛ [%s] Prédiction #%s expirée après %s min sans vérification", profile.name, game_number,
+                   PREDICTION_EXPIRY_MINUTES)
+    await publish_profile_status(profile, pred)
+
+async def run_profile(profile, source: int, results: list):
+    try:
+        finalized, decision = profile.engine.ingest(source, results)
+        posted_at = results[-1][2] if results else None
+        await publish_profile_results(profile, finalized, posted_at)
+        if decision is not None:
+            await send_profile_prediction(profile, decision, posted_at)
+    except Exception:
+        logger.exception("Erreur traitement profil %s", profile.name)
+
+async def run_profiles(source: int, results: list):
+    """Alimente chaque profil avec les résultats déjà analysés; les profils publient en parallèle."""
+    if len(profiles):
+        await asyncio.gather(*(run_profile(profile, source, results) for profile in profiles))
+
+def parse_source_batch(source: int, batch: list) -> list:
+    """(jeu, premier groupe, date du message) des résultats finalisés et inédits d'un lot de messages."""
+    results = []
+    for message_text, posted_at in batch:
+        parsed = engine.parse(source, message_text)
+        if parsed is not None:
+            results.append((parsed[0], parsed[1], posted_at))
+    if results:
+        store_results(source, results)
+    return results
+
+def store_results(source: int, results: list):
+    """
+    Enregistre les résultats reçus dans la base (tâche d'écriture, hors de la boucle)
+    et met à jour les matrices de transition.
+    """
+    rows = []
+    for game_number, first_group, posted_at in results:
+        moment = datetime.fromtimestamp(posted_at, WAT_TZ) if posted_at else clock.now(WAT_TZ)
+        day, mask = game_day(moment), suits_mask(first_group)
+        rows.append((day, game_number, source, first_group, mask, moment.isoformat()))
+        if transition_matrices is not None and source == 1:
+            transition_matrices.add_result(day, game_number, first_group, mask, time_slot_at(moment))
+        if history is not None and source == 1:
+            history.add(day, game_number, first_group, mask)
+    if result_store is not None:
+        result_store.submit_results(rows)
+
+async def process_source_1_messages(batch: list):
     """
     Traite les messages du canal source 1 (pour les prédictions).
-    Extrait la carte à la position k et génère la prédiction.
+    Extrait la carte à la position k et génère la prédiction. En rafale, seul le jeu
+    le plus récent décide; les cibles déjà passées sont écartées sans appel Telegram.
     """
-    global current_game_number
-    
     try:
-        if not is_message_finalized(message_text):
-            return
-        
-        game_number = extract_game_number(message_text)
-        if game_number is None:
-            return
-        
-        current_game_number = game_number
-        
-        message_hash = f"src1_{game_number}_{message_text[:50]}"
-        if message_hash in processed_messages:
-            return
-        processed_messages.add(message_hash)
-        
-        if len(processed_messages) > 500:
-            processed_messages.clear()
-        
-        groups = extract_parentheses_groups(message_text)
-        if len(groups) < 1:
-            return
-        
-        first_group = groups[0]
-        
-        source_suit = get_suit_at_position(first_group, k_position)
-        if source_suit is None:
-            logger.warning(f"Impossible de trouver une carte à la position {k_position} dans {first_group}")
+        results = parse_source_batch(1, batch)
+        if not results:
             return
         
-        if intelligent_mode:
-            predicted_suit = source_suit
-        else:
-            predicted_suit = predict_suit(source_suit)
-        
-        target_game = game_number + a_offset
+        finalized, decision = engine.ingest(1, results)
+        await publish_results(finalized, results[-1][2])
+        if decision is not None:
+            await publish_decision(decision, results)
+        await run_profiles(1, results)
         
-        if not can_predict_game(target_game):
-            logger.info(f"Jeu #{target_game} trop proche du dernier prédit (#{last_predicted_game}), écart requis: {get_current_ecart()}")
-            return
-        
-        if target_game in pending_predictions:
-            logger.info(f"Prédiction #{target_game} déjà active")
-            return
-        
-        time_slot = get_current_time_slot()
-        source_display = SUIT_DISPLAY.get(source_suit, source_suit)
-        predicted_display = SUIT_DISPLAY.get(predicted_suit, predicted_suit)
-        mode_str = "🧠 Intelligent" if intelligent_mode else f"📐 Statique ({time_slot})"
-        
-        logger.info(f"Jeu #{game_number} - Position k={k_position}: {source_display} -> Prédiction: {predicted_display} pour #{target_game} (mode: {mode_str})")
-        
-        await send_prediction_to_channel(target_game, predicted_suit)
+    except Exception:
+        logger.exception("Erreur traitement source 1")
+
+async def publish_decision(decision, results: list):
+    """Publie la prédiction du profil principal et prévient l'admin."""
+    try:
+        game_number = decision.game_number
+        posted_at = next(posted for game, _, posted in results if game == game_number)
+        await send_prediction_to_channel(decision.target_game, decision.predicted_suit, posted_at)
         
-        if ADMIN_ID and ADMIN_ID != 0 and admin_notifications:
+        if ADMIN_ID and ADMIN_ID != 0 and state.admin_notifications and is_publisher():
             try:
-                now = datetime.now(WAT_TZ)
+                now = clock.now(WAT_TZ)
+                mode_str = "🧠 Intelligent" if state.intelligent_mode else f"📐 Statique ({decision.time_slot})"
                 admin_msg = f"""🎯 **Nouvelle prédiction automatique**
 
 📊 Source: Jeu #{game_number}
-🎴 Carte position k={k_position}: {source_display}
-🔮 Prédiction: {predicted_display}
-📲 Cible: Jeu #{target_game}
+🎴 Carte position k={state.k_position}: {SUIT_DISPLAY.get(decision.source_suit, decision.source_suit)}
+🔮 Prédiction: {SUIT_DISPLAY.get(decision.predicted_suit, decision.predicted_suit)}
+📲 Cible: Jeu #{decision.target_game}
 🕐 Heure: {now.strftime('%H:%M')} WAT
-📏 Écart: {get_current_ecart()}
+📏 Écart: {engine.current_ecart()}
 🎲 Mode: {mode_str}"""
                 await client.send_message(ADMIN_ID, admin_msg)
             except Exception as e:
-                logger.error(f"Erreur notification admin: {e}")
+                logger.error("Erreur notification admin: %s", e)
         
-    except Exception as e:
-        logger.error(f"Erreur traitement source 1: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
+    except Exception:
+        logger.exception("Erreur publication prédiction")
 
-async def process_source_2_message(message_text: str, chat_id: int):
+async def process_source_2_messages(batch: list):
     """
     Traite les messages du canal source 2 (pour la vérification).
-    Vérifie si les prédictions actives sont correctes.
+    Vérifie si les prédictions actives sont correctes (en un seul passage pour une rafale).
     """
-    global current_game_number
-    
     try:
-        if not is_message_finalized(message_text):
-            return
-        
-        game_number = extract_game_number(message_text)
-        if game_number is None:
-            return
-        
-        current_game_number = game_number
-        
-        message_hash = f"src2_{game_number}_{message_text[:50]}"
-        if message_hash in processed_messages:
-            return
-        processed_messages.add(message_hash)
-        
-        groups = extract_parentheses_groups(message_text)
-        if len(groups) < 1:
+        results = parse_source_batch(2, batch)
+        if not results:
             return
         
-        first_group = groups[0]
-        
-        logger.info(f"Vérification Jeu #{game_number} - Groupe1: {first_group}")
+        for game_number, first_group, _ in results:
+            logger.info("Vérification Jeu #%s - Groupe1: %s", game_number, first_group, extra={'category': 'source'})
         
-        await check_prediction_result(game_number, first_group)
+        finalized, _ = engine.ingest(2, results)
+        await publish_results(finalized, results[-1][2])
+        await run_profiles(2, results)
         
-    except Exception as e:
-        logger.error(f"Erreur traitement source 2: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
+    except Exception:
+        logger.exception("Erreur traitement source 2")
+
+# Messages sources en attente, par canal. Un seul traitement à la fois par canal: ce qui
+# arrive pendant un envoi Telegram (ou en rafale après une reconnexion) est traité en un lot.
+source_backlog = {1: deque(), 2: deque()}
+_source_drainers = {}
+_SOURCE_PROCESSORS = {1: process_source_1_messages, 2: process_source_2_messages}
+
+def enqueue_source_message(source: int, message_text: str, posted_at: float = None):
+    source_backlog[source].append((message_text, posted_at))
+    task = _source_drainers.get(source)
+    if task is None or task.done():
+        _source_drainers[source] = asyncio.create_task(drain_source(source), name=f'source_{source}')
+
+async def drain_source(source: int):
+    """Vide la file d'un canal source, lot par lot."""
+    backlog = source_backlog[source]
+    while backlog:
+        batch = list(backlog)
+        backlog.clear()
+        await _SOURCE_PROCESSORS[source](batch)
+
+def message_timestamp(message):
+    """Date de publication d'un message Telegram (timestamp), None si absente."""
+    return message.date.timestamp() if message.date else None
 
-@client.on(events.NewMessage(chats=[SOURCE_CHANNEL_1_ID]))
 async def handle_source_1(event):
     """Gestionnaire pour les messages du canal source 1 (prédictions)."""
+    health.feed_seen('source_1')
     if event.message and event.message.text:
-        await process_source_1_message(event.message.text, event.chat_id)
+        enqueue_source_message(1, event.message.text, message_timestamp(event.message))
 
-@client.on(events.NewMessage(chats=[SOURCE_CHANNEL_2_ID]))
 async def handle_source_2(event):
     """Gestionnaire pour les messages du canal source 2 (vérifications)."""
+    health.feed_seen('source_2')
     if event.message and event.message.text:
-        await process_source_2_message(event.message.text, event.chat_id)
+        enqueue_source_message(2, event.message.text, message_timestamp(event.message))
 
-@client.on(events.NewMessage(pattern=r'^/k\s*(\d+)$'))
-async def cmd_k(event):
+async def cmd_k(event, args: str):
     """Commande /k - Définit la position de la carte à utiliser."""
-    if event.is_group or event.is_channel:
-        return
-    if event.sender_id != ADMIN_ID and ADMIN_ID != 0:
-        await event.respond("Commande réservée à l'administrateur")
-        return
-    
-    global k_position
     try:
-        new_k = int(event.pattern_match.group(1))
+        new_k = int(args)
         if new_k < 1:
             await event.respond("❌ La position k doit être >= 1")
             return
         
-        k_position = new_k
+        state.k_position = new_k
         save_config()
-        await event.respond(f"✅ Position k définie à **{k_position}**\n\nLe bot utilisera maintenant la carte à la position {k_position} du premier groupe pour générer les prédictions.")
-        logger.info(f"Position k mise à jour: {k_position}")
+        await event.respond(f"✅ Position k définie à **{state.k_position}**\n\nLe bot utilisera maintenant la carte à la position {state.k_position} du premier groupe pour générer les prédictions.")
+        logger.info("Position k mise à jour: %s", state.k_position)
     except ValueError:
         await event.respond("❌ Veuillez entrer un nombre entier valide")
 
-@client.on(events.NewMessage(pattern=r'^/a\s*(\d+)$'))
-async def cmd_a(event):
+async def cmd_a(event, args: str):
     """Commande /a - Définit l'offset de prédiction (N+a)."""
-    if event.is_group or event.is_channel:
-        return
-    if event.sender_id != ADMIN_ID and ADMIN_ID != 0:
-        await event.respond("Commande réservée à l'administrateur")
-        return
-    
-    global a_offset
     try:
-        new_a = int(event.pattern_match.group(1))
+        new_a = int(args)
         if new_a < 0:
             await event.respond("❌ L'offset a doit être >= 0")
             return
         
-        a_offset = new_a
+        state.a_offset = new_a
         save_config()
-        await event.respond(f"✅ Offset a défini à **{a_offset}**\n\nLe bot prédira maintenant pour le jeu N+{a_offset} (si a=1, prédit N+1)")
-        logger.info(f"Offset a mis à jour: {a_offset}")
+        await event.respond(f"✅ Offset a défini à **{state.a_offset}**\n\nLe bot prédira maintenant pour le jeu N+{state.a_offset} (si a=1, prédit N+1)")
+        logger.info("Offset a mis à jour: %s", state.a_offset)
     except ValueError:
         await event.respond("❌ Veuillez entrer un nombre entier valide")
 
-@client.on(events.NewMessage(pattern=r'^/r\s*(\d+)$'))
-async def cmd_r(event):
+async def cmd_r(event, args: str):
     """Commande /r - Définit le nombre d'essais de vérification (0 à 10)."""
-    if event.is_group or event.is_channel:
-        return
-    if event.sender_id != ADMIN_ID and ADMIN_ID != 0:
-        await event.respond("Commande réservée à l'administrateur")
-        return
-    
-    global r_offset
     try:
-        new_r = int(event.pattern_match.group(1))
+        new_r = int(args)
         if new_r < 0 or new_r > 10:
             await event.respond("❌ L'offset r doit être entre 0 et 10")
             return
         
-        r_offset = new_r
+        state.r_offset = new_r
         save_config()
         
-        emojis_list = [VERIFICATION_EMOJIS[i] for i in range(r_offset + 1)]
+        emojis_list = [VERIFICATION_EMOJIS[i] for i in range(state.r_offset + 1)]
         emojis_str = " ".join(emojis_list)
         
-        await event.respond(f"""✅ Offset r défini à **{r_offset}**
+        await event.respond(f"""✅ Offset r défini à **{state.r_offset}**
 
-**Vérification sur {r_offset + 1} jeu(x):** N+0 à N+{r_offset}
+**Vérification sur {state.r_offset + 1} jeu(x):** N+0 à N+{state.r_offset}
 
 **Emojis de succès:**
 {emojis_str}
 
 Si aucun essai ne réussit → ❌""")
-        logger.info(f"Offset r mis à jour: {r_offset}")
+        logger.info("Offset r mis à jour: %s", state.r_offset)
     except ValueError:
         await event.respond("❌ Veuillez entrer un nombre entier valide")
 
-@client.on(events.NewMessage(pattern=r'^/eca\s*(.+)$'))
-async def cmd_eca(event):
+async def cmd_eca(event, args: str):
     """Commande /eca - Définit les écarts entre les prédictions (ex: /eca 3,2,5)."""
-    if event.is_group or event.is_channel:
-        return
-    if event.sender_id != ADMIN_ID and ADMIN_ID != 0:
-        await event.respond("Commande réservée à l'administrateur")
-        return
-    
-    global ecart_list, ecart_index
     try:
-        values_str = event.pattern_match.group(1).strip()
+        values_str = args
+        if not values_str:
+            await event.respond("❌ Format invalide. Utilisez: /eca 3,2,5")
+            return
         
         if values_str.lower() == 'reset' or values_str == '0':
-            ecart_list = []
-            ecart_index = 0
+            state.ecart_list = []
+            state.ecart_index = 0
             save_config()
             await event.respond(f"✅ Écarts réinitialisés. Écart par défaut: **{DEFAULT_ECART}**")
             return
@@ -587,43 +595,35 @@ async def cmd_eca(event):
             await event.respond("❌ Tous les écarts doivent être >= 1")
             return
         
-        ecart_list = values
-        ecart_index = 0
+        state.ecart_list = values
+        state.ecart_index = 0
         save_config()
         
-        ecart_display = " → ".join([str(e) for e in ecart_list])
+        ecart_display = " → ".join([str(e) for e in state.ecart_list])
         await event.respond(f"""✅ Écarts personnalisés définis:
 
 **Séquence:** {ecart_display}
 
 Le bot utilisera ces écarts dans l'ordre, puis recommencera au début.
-- Écart entre prédiction 1 et 2: {ecart_list[0] if len(ecart_list) > 0 else DEFAULT_ECART}
-- Écart entre prédiction 2 et 3: {ecart_list[1] if len(ecart_list) > 1 else ecart_list[0] if ecart_list else DEFAULT_ECART}
+- Écart entre prédiction 1 et 2: {state.ecart_list[0] if len(state.ecart_list) > 0 else DEFAULT_ECART}
+- Écart entre prédiction 2 et 3: {state.ecart_list[1] if len(state.ecart_list) > 1 else state.ecart_list[0] if state.ecart_list else DEFAULT_ECART}
 etc.""")
-        logger.info(f"Écarts mis à jour: {ecart_list}")
+        logger.info("Écarts mis à jour: %s", state.ecart_list)
     except ValueError:
         await event.respond("❌ Format invalide. Utilisez: /eca 3,2,5")
 
-@client.on(events.NewMessage(pattern='/inter'))
-async def cmd_inter(event):
+async def cmd_inter(event, args: str):
     """Commande /inter - Active/désactive le mode intelligent."""
-    if event.is_group or event.is_channel:
-        return
-    if event.sender_id != ADMIN_ID and ADMIN_ID != 0:
-        await event.respond("Commande réservée à l'administrateur")
-        return
-    
-    global intelligent_mode
-    intelligent_mode = not intelligent_mode
+    state.intelligent_mode = not state.intelligent_mode
     save_config()
     
-    if intelligent_mode:
+    if state.intelligent_mode:
         await event.respond(f"""🧠 **Mode INTELLIGENT activé**
 
 **Règle intelligente:**
-• La carte à la position k={k_position} est prédite directement
+• La carte à la position k={state.k_position} est prédite directement
 • Pas de transformation selon les plages horaires
-• Exemple: Si ♦️ est à la position {k_position}, le bot prédit ♦️ pour N+{a_offset}
+• Exemple: Si ♦️ est à la position {state.k_position}, le bot prédit ♦️ pour N+{state.a_offset}
 
 Les règles statiques (plages horaires) sont désactivées.
 
@@ -632,29 +632,21 @@ Pour revenir au mode statique: /inter""")
         await event.respond(f"""📐 **Mode STATIQUE activé**
 
 **Règle statique:**
-• La carte à la position k={k_position} est transformée selon l'heure
+• La carte à la position k={state.k_position} est transformée selon l'heure
 • 00h-12h: ♣️↔♦️, ♠️↔❤️
 • 13h-19h: ♣️↔♠️, ♦️↔❤️
 • 19h01-23h59: ♠️↔♦️, ❤️↔♣️
 
 Pour activer le mode intelligent: /inter""")
     
-    logger.info(f"Mode {'intelligent' if intelligent_mode else 'statique'} activé")
+    logger.info("Mode %s activé", 'intelligent' if state.intelligent_mode else 'statique')
 
-@client.on(events.NewMessage(pattern='/stop'))
-async def cmd_stop(event):
+async def cmd_stop(event, args: str):
     """Commande /stop - Active/désactive les notifications privées."""
-    if event.is_group or event.is_channel:
-        return
-    if event.sender_id != ADMIN_ID and ADMIN_ID != 0:
-        await event.respond("Commande réservée à l'administrateur")
-        return
-    
-    global admin_notifications
-    admin_notifications = not admin_notifications
+    state.admin_notifications = not state.admin_notifications
     save_config()
     
-    if admin_notifications:
+    if state.admin_notifications:
         await event.respond("""✅ **Notifications ACTIVÉES**
 
 Vous recevrez les messages de prédiction automatique dans ce chat.
@@ -668,77 +660,105 @@ Les prédictions continueront d'être envoyées au canal de prédiction.
 
 Pour réactiver: /stop""")
     
-    logger.info(f"Notifications admin {'activées' if admin_notifications else 'désactivées'}")
+    logger.info("Notifications admin %s", 'activées' if state.admin_notifications else 'désactivées')
 
-@client.on(events.NewMessage(pattern='/status'))
-async def cmd_status(event):
+async def cmd_status(event, args: str):
     """Affiche l'état actuel du bot et des prédictions."""
-    if event.is_group or event.is_channel:
-        return
-    if event.sender_id != ADMIN_ID and ADMIN_ID != 0:
-        await event.respond("Commande réservée à l'administrateur")
-        return
-    
-    now_wat = datetime.now(WAT_TZ)
-    time_slot = get_current_time_slot()
+    now_wat = clock.now(WAT_TZ)
+    time_slot = engine.time_slot
     
-    mode_str = "🧠 Intelligent" if intelligent_mode else f"📐 Statique"
+    mode_str = "🧠 Intelligent" if state.intelligent_mode else f"📐 Statique"
     status_msg = f"""📊 **État du bot**
 
 🕐 Heure WAT: {now_wat.strftime('%H:%M:%S')}
 📍 Plage horaire: {time_slot}
-🎮 Jeu actuel: #{current_game_number}
-📲 Dernier prédit: #{last_predicted_game}
+🎮 Jeu actuel: #{state.current_game_number}
+📲 Dernier prédit: #{state.last_predicted_game}
 
 **⚙️ Paramètres:**
-• Position k: {k_position}
-• Offset a: {a_offset}
-• Offset r: {r_offset} (vérifie N+0 à N+{r_offset})
-• Écarts: {ecart_list if ecart_list else f"[défaut: {DEFAULT_ECART}]"}
-• Index écart: {ecart_index}
+• Position k: {state.k_position}
+• Offset a: {state.a_offset}
+• Offset r: {state.r_offset} (vérifie N+0 à N+{state.r_offset})
+• Écarts: {state.ecart_list if state.ecart_list else f"[défaut: {DEFAULT_ECART}]"}
+• Index écart: {state.ecart_index}
 • Mode: {mode_str}
-• Notifications: {'✅ Activées' if admin_notifications else '🔇 Désactivées'}
+• Notifications: {'✅ Activées' if state.admin_notifications else '🔇 Désactivées'}
 
 **📡 Canaux:**
 • Source 1 (prédictions): {SOURCE_CHANNEL_1_ID} {'✅' if source_channel_1_ok else '❌'}
 • Source 2 (vérifications): {SOURCE_CHANNEL_2_ID} {'✅' if source_channel_2_ok else '❌'}
 • Prédiction: {PREDICTION_CHANNEL_ID} {'✅' if prediction_channel_ok else '❌'}
 """
-    
-    if pending_predictions:
-        status_msg += f"\n**🔮 Prédictions actives ({len(pending_predictions)}):**\n"
-        for game_num, pred in sorted(pending_predictions.items()):
-            checks = pred.get('check_count', 0)
-            max_checks = pred.get('max_checks', r_offset + 1)
-            status_msg += f"• #{game_num}: {pred['suit_display']} - {pred['status']} (vérifié {checks}/{max_checks})\n"
+    if len(profiles):
+        status_msg += f"\n**🎛️ Profils ({len(profiles)}):**\n"
+        for profile in profiles:
+            status_msg += (f"• {profile.name} → {profile.channel_id} {'✅' if profile.channel_ok else '❌'}: "
+                           f"{profile.describe()} | {len(profile.state.pending_predictions)} active(s)\n")
+    if lease is not None:
+        role = lease.status()
+        status_msg += f"""
+**👥 Réplica:** {role['holder_id']}
+• Rôle: {'👑 Actif (publie)' if role['leader'] else '💤 Veille'}
+• Prises de bail: {role['failovers']}
+"""
+    if state.pending_predictions:
+        status_msg += f"\n**🔮 Prédictions actives ({len(state.pending_predictions)}):**\n"
+        for game_num, pred in sorted(state.pending_predictions.items()):
+            status_msg += f"• #{game_num}: {pred.suit_display} - {pred.status_text} (vérifié {pred.check_count}/{pred.max_checks})\n"
     else:
         status_msg += "\n**🔮 Aucune prédiction active**\n"
     
+    sched = scheduler.health()
+    tick_age = sched['last_tick_age']
+    status_msg += f"""
+**⏱️ Planificateur:** {'✅ actif' if sched['running'] else '❌ arrêté'}
+• Dernier tick: {f"il y a {tick_age:.0f}s" if tick_age is not None else "jamais"}
+• Relances: {sched['restarts']} | Sauts d'horloge: {sched['clock_jumps']}
+• Minuteries actives: {sched['active_timers']}
+• Prochain reset: {sched['daily_jobs'].get('reset_quotidien', '-')}
+"""
+    failed = {name: job for name, job in sched['jobs'].items() if job['failures']}
+    for name, job in failed.items():
+        status_msg += f"• ⚠️ {name}: {job['failures']} échec(s), dernier: {job['last_error']}\n"
+    
+    shed = engine.shed
+    if shed['backlog_batches'] or shed['stale_messages'] or shed['stale_targets']:
+        status_msg += f"""
+**📥 Rafales:** {shed['backlog_batches']} lot(s) traités en bloc
+• Écartés: {shed['superseded']} jeu(x) dépassé(s) | {shed['stale_messages']} message(s) trop ancien(s) | {shed['stale_targets']} cible(s) déjà jouée(s)
+"""
+    
+    lags = freshness.report()
+    if any(lags.values()):
+        status_msg += f"\n**🚀 Retard source → canal (budget p95: {LAG_BUDGET_SECONDS:.0f}s):**\n"
+        for kind, label in (('publish', 'Prédictions'), ('result', 'Résultats')):
+            lag = lags[kind]
+            if lag is None:
+                continue
+            status_msg += (f"• {label}: p50 {lag['p50']}s | p95 {lag['p95']}s | p99 {lag['p99']}s | max {lag['max']}s"
+                           f" ({lag['window']} derniers){' ⚠️' if lag['alert'] else ''}\n")
+    
+    if sender_pool is not None:
+        pool = sender_pool.status()
+        status_msg += f"\n**📤 Expéditeurs ({len(pool['senders'])}):** bascules FloodWait: {pool['failovers']}\n"
+        for sender in pool['senders']:
+            paused = f" ⏳ pause {sender['paused']:.0f}s" if sender['paused'] else ""
+            status_msg += (f"• {sender['name']}: {sender['sent']} envoi(s), {sender['edited']} édition(s), "
+                           f"{sender['flood_waits']} FloodWait, {sender['failed']} échec(s){paused}\n")
+    
+    if fanout is not None:
+        diff = fanout.status()
+        status_msg += f"""
+**📬 Abonnés:** {diff['subscribers']}
+• Livrés: {diff['delivered']} ({diff['per_second']}/s) | En attente: {diff['pending']}
+• Échecs: {diff['failed']} | Retirés (bloqué): {diff['removed']} | FloodWait: {diff['flood_waits']}
+"""
+    
     await event.respond(status_msg)
 
-@client.on(events.NewMessage(pattern='/reset'))
-async def cmd_reset(event):
+async def cmd_reset(event, args: str):
     """Réinitialise toutes les données du bot."""
-    if event.is_group or event.is_channel:
-        return
-    if event.sender_id != ADMIN_ID and ADMIN_ID != 0:
-        await event.respond("Commande réservée à l'administrateur")
-        return
-    
-    global pending_predictions, processed_messages, current_game_number, last_predicted_game
-    global k_position, a_offset, r_offset, ecart_list, ecart_index, intelligent_mode, admin_notifications
-    
-    pending_predictions.clear()
-    processed_messages.clear()
-    current_game_number = 0
-    last_predicted_game = 0
-    k_position = DEFAULT_K
-    a_offset = DEFAULT_A
-    r_offset = DEFAULT_R
-    ecart_list = []
-    ecart_index = 0
-    intelligent_mode = False
-    admin_notifications = True
+    state.reset_all()
     
     save_config()
     
@@ -755,13 +775,299 @@ Tous les paramètres sont revenus aux valeurs par défaut:
 Les prédictions actives ont été effacées.""")
     logger.warning("Reset complet effectué")
 
-@client.on(events.NewMessage(pattern='/help'))
-async def cmd_help(event):
-    """Affiche l'aide."""
-    if event.is_group or event.is_channel:
+async def cmd_loglevel(event, args: str):
+    """Commande /loglevel - Change le niveau de journalisation à chaud."""
+    if not args:
+        current = logging.getLevelName(logging.getLogger().level)
+        stats = rate_limit_filter.stats()
+        lines = [f"• {cat}: {s['emitted']} émises, {s['suppressed']} supprimées (fenêtre courante)" for cat, s in stats.items()]
+        await event.respond(f"📝 Niveau de log actuel: **{current}**\n\n" + ("\n".join(lines) or "Aucune ligne limitée") +
+                            "\n\nUsage: /loglevel DEBUG|INFO|WARNING|ERROR")
+        return
+    try:
+        level = set_log_level(args)
+    except ValueError:
+        await event.respond("❌ Niveau invalide. Utilisez: DEBUG, INFO, WARNING, ERROR ou CRITICAL")
+        return
+    await event.respond(f"✅ Niveau de log défini à **{level}**")
+    logger.warning("Niveau de log changé: %s", level)
+
+async def cmd_mem(event, args: str):
+    """Commande /mem - Empreinte mémoire par structure (tracemalloc: /mem start|stop)."""
+    if args == 'start':
+        memory_report.start_tracing()
+        await event.respond("✅ Suivi tracemalloc activé. Utilisez /mem pour le rapport, /mem stop pour l'arrêter.")
+        return
+    if args == 'stop':
+        memory_report.stop_tracing()
+        await event.respond("🔇 Suivi tracemalloc désactivé")
+        return
+    
+    sizes = memory_report.structure_report(state)
+    lines = [f"• {name}: {memory_report.format_size(size)}" for name, size in sizes.items()]
+    msg = "🧠 **Mémoire par structure**\n\n" + "\n".join(lines)
+    
+    pending = len(state.pending_predictions)
+    if pending:
+        per_pred = sizes['pending_predictions'] / pending
+        msg += f"\n\n🔮 {pending} prédiction(s) active(s): ~{per_pred:.0f} o/prédiction"
+    
+    usage = memory.report()
+    budget = memory_report.format_size(usage['budget']) if usage['budget'] else "aucun"
+    rss = f" | RSS {memory_report.format_size(usage['rss'])}" if usage['rss'] else ""
+    msg += (f"\n\n**📊 Caches suivis:** {memory_report.format_size(usage['total'])} / budget {budget}"
+            f"{' ⚠️ dépassé' if usage['over_budget'] else ''}{rss}\n")
+    components = []
+    for name, component in usage['components'].items():
+        reduced = f" ({component['shrinks']} réduction(s))" if component['shrinks'] else ""
+        components.append(f"• {name}: {memory_report.format_size(component['bytes'])}{reduced}")
+    msg += "\n".join(components)
+    
+    top = memory_report.tracemalloc_top()
+    if top is None:
+        msg += "\n\n_tracemalloc inactif (/mem start pour l'activer)_"
+    else:
+        stats, current, peak = top
+        msg += f"\n\n**📈 tracemalloc:** courant {memory_report.format_size(current)}, pic {memory_report.format_size(peak)}\n"
+        for stat in stats:
+            frame = stat.traceback[0]
+            msg += f"• {os.path.basename(frame.filename)}:{frame.lineno} - {memory_report.format_size(stat.size)} ({stat.count} blocs)\n"
+    
+    await event.respond(msg)
+
+async def cmd_profile(event, args: str):
+    """Commande /profile <secondes> - Profile le processus et envoie pstats + flamegraph à l'admin."""
+    try:
+        seconds = int(args) if args else 30
+    except ValueError:
+        seconds = 0
+    if not 1 <= seconds <= PROFILE_MAX_SECONDS:
+        await event.respond(f"❌ Usage: /profile <secondes> (1 à {PROFILE_MAX_SECONDS})")
+        return
+    if profiler.running:
+        await event.respond("⏳ Un profilage est déjà en cours")
         return
     
-    mode_str = "🧠 Intelligent" if intelligent_mode else "📐 Statique"
+    await event.respond(f"🔬 Profilage pendant {seconds}s...")
+    result = await profiler.profile(seconds)
+    
+    pstats_file = io.BytesIO(result.pstats_text.encode('utf-8'))
+    pstats_file.name = 'profile_pstats.txt'
+    collapsed_file = io.BytesIO(result.collapsed.encode('utf-8'))
+    collapsed_file.name = 'profile_collapsed.txt'
+    await client.send_file(ADMIN_ID or event.chat_id, [pstats_file, collapsed_file],
+                           caption=f"🔬 Profil de {result.seconds:.0f}s ({result.samples} échantillons). "
+                                   f"Piles repliées: flamegraph.pl / speedscope")
+
+async def cmd_subscribe(event, args: str):
+    """Commande /subscribe - Reçoit les prédictions et leurs résultats en privé."""
+    if subscribers is None:
+        await event.respond("❌ Abonnements indisponibles")
+        return
+    if subscribers.add(event.chat_id):
+        logger.info("Nouvel abonné: %s (%s au total)", event.chat_id, len(subscribers))
+        await event.respond("✅ **Abonnement activé**\n\nVous recevrez les prédictions et leurs résultats dans ce chat.\n\nPour arrêter: /unsubscribe")
+    else:
+        await event.respond("ℹ️ Vous êtes déjà abonné. Pour arrêter: /unsubscribe")
+
+async def cmd_unsubscribe(event, args: str):
+    """Commande /unsubscribe - Arrête les notifications privées de l'abonné."""
+    if subscribers is None:
+        await event.respond("❌ Abonnements indisponibles")
+        return
+    if subscribers.remove(event.chat_id):
+        logger.info("Désabonnement: %s (%s restants)", event.chat_id, len(subscribers))
+        await event.respond("🔇 **Abonnement arrêté**\n\nPour vous réabonner: /subscribe")
+    else:
+        await event.respond("ℹ️ Vous n'êtes pas abonné. Pour vous abonner: /subscribe")
+
+async def cmd_export(event, args: str):
+    """Commande /export [du] [au] [csv|ndjson] - Envoie l'historique des prédictions en fichier."""
+    if result_store is None:
+        await event.respond("❌ Historique indisponible")
+        return
+    fmt = 'csv'
+    days = []
+    try:
+        for token in args.split():
+            if token.lower() in EXPORT_FORMATS:
+                fmt = token.lower()
+            else:
+                days.append(parse_day(token))
+        if len(days) > 2:
+            raise ValueError(args)
+    except ValueError:
+        await event.respond("❌ Usage: /export [AAAA-MM-JJ] [AAAA-MM-JJ] [csv|ndjson]")
+        return
+    day_from = days[0] if days else None
+    day_to = days[1] if len(days) > 1 else None
+    
+    with tempfile.NamedTemporaryFile('wb', prefix='predictions_', suffix=f".{EXPORT_FORMATS[fmt][1]}",
+                                     delete=False) as f:
+        path = f.name
+        async def write(data: bytes):
+            f.write(data)
+        count = await stream_predictions(result_store, write, fmt, day_from, day_to)
+    try:
+        period = f"{day_from or 'début'} → {day_to or 'aujourd’hui'}"
+        await client.send_file(ADMIN_ID or event.chat_id, path,
+                               caption=f"📤 {count} prédiction(s) ({period}, {fmt})")
+    finally:
+        os.remove(path)
+
+async def cmd_analytics(event, args: str):
+    """Commande /analytics [k] [rebuild] - Matrices de transition et règles suggérées (historique des résultats)."""
+    global transition_matrices
+    try:
+        import analytics
+    except ImportError:
+        await event.respond("❌ NumPy n'est pas installé (pip install -r requirements.txt)")
+        return
+    if result_store is None:
+        await event.respond("❌ Base des résultats indisponible")
+        return
+    
+    tokens = args.lower().split()
+    k = state.k_position
+    for token in tokens:
+        if token.isdigit():
+            k = int(token)
+    if not 1 <= k <= analytics.MAX_K:
+        await event.respond(f"❌ Usage: /analytics [k de 1 à {analytics.MAX_K}] [rebuild]")
+        return
+    
+    matrices = transition_matrices
+    if (matrices is None or 'rebuild' in tokens
+            or (matrices.a, matrices.r) != (state.a_offset, state.r_offset)):
+        if memory.over_budget():
+            await event.respond("🧠 Budget mémoire dépassé: calcul des matrices reporté")
+            return
+        await event.respond(f"⏳ Calcul des matrices (a={state.a_offset}, r={state.r_offset}) sur l'historique...")
+        transition_matrices = None    # Pas de mise à jour incrémentale pendant la construction
+        matrices = await asyncio.to_thread(analytics.build_from_store, result_store, state.a_offset, state.r_offset)
+        transition_matrices = matrices
+    
+    await event.respond(matrices.report(k))
+
+async def load_history():
+    """
+    Index de l'historique de la source 1, construit une fois dans un thread.
+    None sans base des résultats, ou si le budget mémoire est dépassé (index déversé).
+    """
+    global history
+    if history is None and result_store is not None and not memory.over_budget():
+        history = await asyncio.to_thread(history_index.build_from_store, result_store, 1)
+        logger.info("Index de l'historique construit: %s jeux", history.games)
+    return history
+
+def display_suits(suits) -> str:
+    return ''.join(SUIT_DISPLAY.get(suit, suit) for suit in suits)
+
+def format_query(result: dict) -> str:
+    """Réponse texte d'une requête sur l'historique."""
+    display = display_suits
+    if result['type'] == 'current':
+        series = ' | '.join(f"{display(suit)} {'présente' if n > 0 else 'absente'} ×{abs(n)}"
+                            for suit, n in result['current'].items())
+        return (f"🔎 **Séries en cours** ({result['games']} jeux, {result['first_day']} → {result['last_day']})\n\n"
+                f"{series or 'Aucune donnée'}")
+    if result['type'] == 'streak':
+        label = 'absente' if result['kind'] == 'miss' else 'présente'
+        msg = (f"🔎 {display(result['suit'])} {label} au moins {result['min_length']} jeux d'affilée: "
+               f"**{result['count']}** fois\n• Record: {result['longest']} jeux")
+        last = result['last']
+        if last:
+            msg += (f"\n• Dernière fois: {last['day']} à partir du jeu #{last['game']} ({last['length']} jeux)"
+                    f"{' - en cours' if last['ongoing'] else ''}")
+        return msg
+    rate = f"{result['rate']:.1%}" if result['rate'] is not None else '-'
+    baseline = f"{result['baseline']:.1%}" if result['baseline'] is not None else '-'
+    return (f"🔎 {display(result['pattern'])} (positions 1-{len(result['pattern'])}) → {display(result['target'])} "
+            f"à N+{result['offset']}\n• {result['occurrences']} occurrences, {result['hits']} réussies: **{rate}**"
+            f"\n• Fréquence globale de {display(result['target'])}: {baseline}")
+
+QUERY_USAGE = """❌ Usage:
+• `/query` - Séries en cours
+• `/query streak ♦ miss 5` - Séries d'absence (miss) ou de présence (hit) d'au moins 5 jeux
+• `/query seq ♠♥ ♣ 2` - ♠ en position 1 et ♥ en position 2, suivis de ♣ à N+2"""
+
+async def cmd_query(event, args: str):
+    """Commande /query - Séries et séquences sur l'historique des résultats."""
+    tokens = args.split()
+    params = {'type': 'current'}
+    if tokens and tokens[0].lower() == 'streak':
+        params = dict(zip(('type', 'suit', 'kind', 'min'), ['streak'] + tokens[1:]))
+    elif tokens and tokens[0].lower() in ('seq', 'sequence'):
+        params = dict(zip(('type', 'pattern', 'target', 'offset'), ['sequence'] + [t.lstrip('+') for t in tokens[1:]]))
+    elif tokens:
+        await event.respond(QUERY_USAGE)
+        return
+    
+    index = await load_history()
+    if index is None:
+        await event.respond("❌ Historique indisponible (base des résultats absente ou budget mémoire dépassé)")
+        return
+    try:
+        result = history_index.run_query(index, params)
+    except ValueError:
+        await event.respond(QUERY_USAGE)
+        return
+    await event.respond(format_query(result))
+
+PROFILES_USAGE = f"""❌ Usage:
+• `/profiles` - Liste des profils
+• `/profiles add <nom> <canal> [{PARAMS_USAGE}]`
+• `/profiles set <nom> [{PARAMS_USAGE}]`
+• `/profiles del <nom>`"""
+
+async def check_profile_channel(profile) -> bool:
+    """Vérifie l'accès du bot au canal d'un profil (le pool d'expéditeurs réessaiera chaque bot sur ce canal)."""
+    if sender_pool is not None:
+        sender_pool.reset_access(profile.channel_id)
+    try:
+        entity = await client.get_entity(profile.channel_id)
+        profile.channel_ok = True
+        logger.info("✅ Canal du profil %s accessible: %s", profile.name, getattr(entity, 'title', profile.channel_id))
+    except Exception as e:
+        profile.channel_ok = False
+        logger.error("❌ Canal du profil %s (%s) non accessible: %s", profile.name, profile.channel_id, e)
+    return profile.channel_ok
+
+async def cmd_profiles(event, args: str):
+    """Commande /profiles - Profils de stratégie publiant dans leurs propres canaux."""
+    parts = args.split()
+    action = parts[0].lower() if parts else 'list'
+    try:
+        if action == 'list':
+            if not len(profiles):
+                await event.respond("🎛️ Aucun profil supplémentaire\n\n" + PROFILES_USAGE[2:])
+                return
+            lines = [f"🎛️ **Profils ({len(profiles)})**"]
+            for profile in profiles:
+                lines.append(f"\n**{profile.name}** → {profile.channel_id} {'✅' if profile.channel_ok else '❌'}\n"
+                             f"• {profile.describe()}\n"
+                             f"• Actives: {len(profile.state.pending_predictions)} | Dernier prédit: #{profile.state.last_predicted_game}")
+            await event.respond('\n'.join(lines))
+        elif action == 'add' and len(parts) >= 3:
+            profile = profiles.add(parts[1].lower(), int(parts[2]), parse_params(parts[3:]))
+            ok = await check_profile_channel(profile)
+            await event.respond(f"✅ Profil **{profile.name}** ajouté → {profile.channel_id} {'✅' if ok else '❌'}\n"
+                                f"• {profile.describe()}" +
+                                ("" if ok else "\n\n⚠️ Ajoutez le bot comme administrateur de ce canal."))
+        elif action == 'set' and len(parts) >= 3 and profiles.get(parts[1].lower()):
+            profile = profiles.get(parts[1].lower())
+            profiles.update(profile, parse_params(parts[2:]))
+            await event.respond(f"✅ Profil **{profile.name}**: {profile.describe()}")
+        elif action == 'del' and len(parts) == 2 and profiles.remove(parts[1].lower()):
+            await event.respond(f"🗑️ Profil **{parts[1].lower()}** supprimé")
+        else:
+            await event.respond(PROFILES_USAGE)
+    except ValueError:
+        await event.respond(PROFILES_USAGE)
+
+async def cmd_help(event, args: str):
+    """Affiche l'aide."""
+    mode_str = "🧠 Intelligent" if state.intelligent_mode else "📐 Statique"
     await event.respond(f"""🤖 **Bot de Prédiction Baccarat**
 
 **📌 Commandes de configuration:**
@@ -772,6 +1078,17 @@ async def cmd_help(event):
 • `/eca reset` - Réinitialiser les écarts
 • `/inter` - Basculer entre mode intelligent/statique
 • `/stop` - Activer/désactiver les notifications privées
+• `/loglevel <niveau>` - Niveau de journalisation (DEBUG, INFO...)
+• `/mem [start|stop]` - Empreinte mémoire par structure
+• `/profile <s>` - Profiler le bot pendant s secondes
+• `/export [du] [au] [csv|ndjson]` - Historique des prédictions en fichier
+• `/analytics [k] [rebuild]` - Transitions observées et règles suggérées
+• `/query [streak|seq] ...` - Séries et séquences dans l'historique
+• `/profiles [add|set|del] ...` - Profils publiant dans d'autres canaux
+
+**📬 Notifications privées (tous):**
+• `/subscribe` - Recevoir les prédictions et résultats
+• `/unsubscribe` - Ne plus les recevoir
 
 **📊 Commandes d'information:**
 • `/status` - État du bot
@@ -794,15 +1111,8 @@ async def cmd_help(event):
 • Source 1 (prédictions): {SOURCE_CHANNEL_1_ID}
 • Source 2 (vérifications): {SOURCE_CHANNEL_2_ID}""")
 
-@client.on(events.NewMessage(pattern='/deploy'))
-async def cmd_deploy(event):
+async def cmd_deploy(event, args: str):
     """Commande /deploy - Fournit le lien de téléchargement des fichiers."""
-    if event.is_group or event.is_channel:
-        return
-    if event.sender_id != ADMIN_ID and ADMIN_ID != 0:
-        await event.respond("Commande réservée à l'administrateur")
-        return
-    
     deploy_url = f"https://{os.getenv('REPL_SLUG', 'bot')}.{os.getenv('REPL_OWNER', 'user')}.repl.co/download" if os.getenv('REPL_SLUG') else f"http://localhost:{PORT}/download"
     
     await event.respond(f"""📦 **Téléchargement pour Render.com**
@@ -828,23 +1138,86 @@ async def cmd_deploy(event):
 **Fichiers inclus:**
 • main.py - Code principal du bot
 • config.py - Configuration
+• game_cycle.py - Cycle des jeux (1 à 1440)
+• scheduler.py - Planificateur (reset, plages horaires, expirations)
+• logging_setup.py - Journalisation asynchrone JSON
+• replication.py - Réplicas actif/veille (bail de publication)
+• state.py - Modèle d'état du moteur
+• memory_report.py - Rapport mémoire (/mem)
+• parsing.py - Analyse des messages sources
+• result_store.py / import_export.py - Base des résultats et import des exports
+• profiler.py - Profilage à la demande (/profile)
+• health.py - Sondes /health et /ready
+• clock.py - Horloge injectable (réelle ou simulée)
+• engine.py - Moteur de prédiction (sans I/O)
+• subscribers.py - Abonnés et diffusion des notifications privées
+• freshness.py - Retard source → canal (percentiles, alerte)
+• prediction_export.py - Export CSV/NDJSON de l'historique (/export, /api/export)
+• analytics.py - Matrices de transition et règles suggérées (/analytics)
+• history_index.py - Index des séries et séquences (/query, /api/query)
+• profiles.py - Profils de stratégie (/profiles)
+• sender_pool.py - Pool de bots expéditeurs (SENDER_BOT_TOKENS)
+• memory_governor.py - Budget mémoire des caches (MEMORY_BUDGET_MB)
 • requirements.txt - Dépendances Python
 • render.yaml - Configuration Render.com
 • README_DEPLOY.md - Instructions détaillées""")
 
+# --- Routeur de commandes (chat privé uniquement) ---
+
+_COMMAND_RE = re.compile(r"/([A-Za-z_]+)(?:@\w+)?\s*(.*)", re.DOTALL)
+
+# nom -> (gestionnaire, réservé à l'administrateur)
+COMMANDS = {
+    'k': (cmd_k, True),
+    'a': (cmd_a, True),
+    'r': (cmd_r, True),
+    'eca': (cmd_eca, True),
+    'inter': (cmd_inter, True),
+    'stop': (cmd_stop, True),
+    'status': (cmd_status, True),
+    'reset': (cmd_reset, True),
+    'help': (cmd_help, False),
+    'deploy': (cmd_deploy, True),
+    'loglevel': (cmd_loglevel, True),
+    'mem': (cmd_mem, True),
+    'profile': (cmd_profile, True),
+    'subscribe': (cmd_subscribe, False),
+    'unsubscribe': (cmd_unsubscribe, False),
+    'export': (cmd_export, True),
+    'analytics': (cmd_analytics, True),
+    'query': (cmd_query, True),
+    'profiles': (cmd_profiles, True),
+}
+
+async def handle_command(event):
+    """Point d'entrée unique des commandes: test du préfixe puis dispatch par dictionnaire."""
+    text = event.raw_text
+    if not text or text[0] != '/':
+        return
+    
+    match = _COMMAND_RE.match(text)
+    if not match:
+        return
+    entry = COMMANDS.get(match.group(1).lower())
+    if entry is None:
+        return
+    
+    handler, admin_only = entry
+    if admin_only and event.sender_id != ADMIN_ID and ADMIN_ID != 0:
+        await event.respond("Commande réservée à l'administrateur")
+        return
+    
+    await handler(event, match.group(2).strip())
+
 async def download_zip(request):
     """Route pour télécharger le fichier ZIP déployable."""
-    files_to_include = [
-        'main.py',
-        'config.py', 
-        'requirements.txt',
-        'render.yaml',
-        'README_DEPLOY.md'
-    ]
+    
+    import zipfile
+    from aiohttp import web
     
     zip_buffer = io.BytesIO()
     with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
-        for filename in files_to_include:
+        for filename in DEPLOY_FILES:
             if os.path.exists(filename):
                 with open(filename, 'r', encoding='utf-8') as f:
                     content = f.read()
@@ -863,63 +1236,339 @@ async def download_zip(request):
     )
 
 async def index(request):
+    from aiohttp import web
     html = f"""<!DOCTYPE html>
 <html>
 <head><title>Bot Prédiction Baccarat</title></head>
 <body>
 <h1>🎯 Bot de Prédiction Baccarat</h1>
 <p>Le bot est en ligne.</p>
-<p><strong>Jeu actuel:</strong> #{current_game_number}</p>
-<p><strong>Paramètres:</strong> k={k_position}, a={a_offset}, r={r_offset}</p>
+<p><strong>Jeu actuel:</strong> #{state.current_game_number}</p>
+<p><strong>Paramètres:</strong> k={state.k_position}, a={state.a_offset}, r={state.r_offset}</p>
 </body>
 </html>"""
     return web.Response(text=html, content_type='text/html', status=200)
 
 async def health_check(request):
-    return web.Response(text="OK", status=200)
+    """Vivacité: boucle asyncio réactive, client Telegram connecté, planificateur en marche."""
+    from aiohttp import web
+    ok, report = health.report()
+    return web.json_response(report, status=200 if ok else 503)
+
+async def ready_check(request):
+    """Disponibilité: vivacité + fraîcheur des canaux sources + envois Telegram en attente."""
+    from aiohttp import web
+    ok, report = health.report(readiness=True)
+    return web.json_response(report, status=200 if ok else 503)
+
+def telegram_check():
+    connected = client is not None and client.is_connected()
+    return connected, 'connecté' if connected else 'déconnecté'
+
+def scheduler_check():
+    sched = scheduler.health()
+    return sched['running'], sched['last_error']
+
+def source_backlog_check():
+    pending = {source: len(backlog) for source, backlog in source_backlog.items()}
+    return max(pending.values()) <= HEALTH_MAX_SOURCE_BACKLOG, {'pending': pending, 'max': HEALTH_MAX_SOURCE_BACKLOG}
+
+def fanout_check():
+    pending = fanout.status()['pending'] if fanout is not None else 0
+    return pending <= HEALTH_MAX_FANOUT_PENDING, {'pending': pending, 'max': HEALTH_MAX_FANOUT_PENDING}
+
+def setup_health():
+    """Enregistre les vérifications propres au bot et démarre la mesure du retard de boucle."""
+    health.add_check('telegram', telegram_check)
+    health.add_check('scheduler', scheduler_check)
+    health.add_check('channels', lambda: (
+        source_channel_1_ok and source_channel_2_ok,
+        {'source_1': source_channel_1_ok, 'source_2': source_channel_2_ok, 'prediction': prediction_channel_ok},
+    ), critical=False)
+    # Files d'attente internes, pour /ready seulement: messages sources à traiter, notifications privées
+    health.add_check('source_backlog', source_backlog_check, critical=False)
+    health.add_check('fanout', fanout_check, critical=False)
+    health.watch_feed('source_1')
+    health.watch_feed('source_2')
+    health.start()
+
+def shrink_dedup(excess: int) -> int:
+    """Vide l'anti-doublon des messages sources (un doublon éventuel est sans effet sur les prédictions)."""
+    freed = memory_report.deep_sizeof(state.processed_messages)
+    state.processed_messages.clear()
+    return freed
+
+def shrink_history(excess: int) -> int:
+    """
+    Libère les caches de l'index, puis l'index lui-même si cela ne suffit pas: l'historique
+    est déjà en base (results.db), l'index sera reconstruit à la prochaine requête.
+    """
+    global history
+    if history is None:
+        return 0
+    freed = history.release_caches()
+    if freed < excess:
+        freed += history.footprint()
+        history = None
+        logger.warning("🧠 Index de l'historique déversé sur disque (reconstruit depuis la base à la demande)")
+    return freed
+
+def shrink_matrices(excess: int) -> int:
+    global transition_matrices
+    if transition_matrices is None:
+        return 0
+    freed = transition_matrices.footprint()
+    transition_matrices = None
+    logger.warning("🧠 Matrices de transition libérées (recalculées au prochain /analytics)")
+    return freed
+
+def setup_memory():
+    """Enregistre les structures suivies par le gouverneur mémoire (réduites par priorité croissante)."""
+    memory.register('history_index', lambda: history.footprint() if history is not None else 0,
+                    shrink_history, priority=10)
+    memory.register('sender_owners', lambda: sender_pool.footprint() if sender_pool is not None else 0,
+                    lambda excess: sender_pool.trim(excess) if sender_pool is not None else 0, priority=20)
+    memory.register('processed_messages', lambda: memory_report.deep_sizeof(state.processed_messages),
+                    shrink_dedup, priority=30)
+    memory.register('transition_matrices',
+                    lambda: transition_matrices.footprint() if transition_matrices is not None else 0,
+                    shrink_matrices, priority=40)
+    memory.register('pending_predictions', lambda: memory_report.deep_sizeof(state.pending_predictions))
+    memory.register('profiles', lambda: sum(memory_report.deep_sizeof(profile.state) for profile in profiles))
+    memory.register('fanout_queue', lambda: fanout.footprint() if fanout is not None else 0)
+    memory.start()
+    if memory.budget:
+        logger.info("🧠 Budget mémoire des caches: %s", memory_report.format_size(memory.budget))
+
+def is_admin_request(request) -> bool:
+    """Authentification des routes d'administration par jeton (en-tête Authorization: Bearer)."""
+    if not ADMIN_HTTP_TOKEN:
+        return False
+    return request.headers.get('Authorization', '') == f"Bearer {ADMIN_HTTP_TOKEN}"
+
+async def debug_profile(request):
+    """Route /debug/profile?seconds=30&format=pstats|collapsed"""
+    from aiohttp import web
+    if not is_admin_request(request):
+        return web.Response(text="Forbidden", status=403)
+    try:
+        seconds = int(request.query.get('seconds', '30'))
+    except ValueError:
+        return web.Response(text="seconds invalide", status=400)
+    output = request.query.get('format', 'pstats')
+    if output not in ('pstats', 'collapsed'):
+        return web.Response(text="format: pstats ou collapsed", status=400)
+    if profiler.running:
+        return web.Response(text="Profilage déjà en cours", status=409)
+    
+    result = await profiler.profile(seconds, cprofile=output == 'pstats', sampling=output == 'collapsed')
+    body = result.pstats_text if output == 'pstats' else result.collapsed
+    return web.Response(text=body, content_type='text/plain')
+
+async def api_export(request):
+    """Route /api/export?from=AAAA-MM-JJ&to=AAAA-MM-JJ&format=csv|ndjson (historique des prédictions, en flux)"""
+    from aiohttp import web
+    if not is_admin_request(request):
+        return web.Response(text="Forbidden", status=403)
+    if result_store is None:
+        return web.Response(text="Historique indisponible", status=503)
+    fmt = request.query.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return web.Response(text="format: csv ou ndjson", status=400)
+    try:
+        day_from = parse_day(request.query.get('from', ''))
+        day_to = parse_day(request.query.get('to', ''))
+    except ValueError:
+        return web.Response(text="from/to: AAAA-MM-JJ", status=400)
+    
+    content_type, extension = EXPORT_FORMATS[fmt]
+    response = web.StreamResponse(headers={
+        'Content-Type': f"{content_type}; charset=utf-8",
+        'Content-Disposition': f'attachment; filename="predictions.{extension}"',
+    })
+    await response.prepare(request)
+    count = await stream_predictions(result_store, response.write, fmt, day_from, day_to)
+    await response.write_eof()
+    logger.info("Export HTTP: %s prédiction(s) (%s)", count, fmt)
+    return response
+
+async def api_query(request):
+    """Route /api/query?type=streak|sequence|current&... (mêmes requêtes que /query, en JSON)"""
+    from aiohttp import web
+    if not is_admin_request(request):
+        return web.Response(text="Forbidden", status=403)
+    index = await load_history()
+    if index is None:
+        return web.Response(text="Historique indisponible", status=503)
+    try:
+        result = history_index.run_query(index, dict(request.query))
+    except ValueError as e:
+        return web.Response(text=str(e), status=400)
+    return web.json_response(result, dumps=lambda data: json.dumps(data, ensure_ascii=False))
 
 async def start_web_server():
     """Démarre le serveur web."""
+    from aiohttp import web
     app = web.Application()
     app.router.add_get('/', index)
     app.router.add_get('/health', health_check)
+    app.router.add_get('/ready', ready_check)
     app.router.add_get('/download', download_zip)
+    app.router.add_get('/debug/profile', debug_profile)
+    app.router.add_get('/api/export', api_export)
+    app.router.add_get('/api/query', api_query)
     
     runner = web.AppRunner(app)
     await runner.setup()
     site = web.TCPSite(runner, '0.0.0.0', PORT)
     await site.start()
-    logger.info(f"Serveur web démarré sur le port {PORT}")
+    logger.info("Serveur web démarré sur le port %s", PORT)
 
-async def schedule_daily_reset():
-    """Tâche planifiée pour la réinitialisation quotidienne à 00h59 WAT."""
-    wat_tz = timezone(timedelta(hours=1))
-    reset_time = time(0, 59, tzinfo=wat_tz)
-    
-    logger.info(f"Tâche de reset planifiée pour {reset_time} WAT.")
+async def fetch_recent_predictions(channel_id: int, last_message_id: int, limit: int):
+    """
+    Derniers messages d'un canal de prédiction, en un seul appel groupé.
+    Un compte utilisateur lit l'historique (iter_messages); un compte bot n'y a pas accès
+    et relit par identifiants la plage précédant le dernier message publié.
+    """
+    from telethon.errors import BotMethodInvalidError
+    try:
+        return [msg async for msg in client.iter_messages(channel_id, limit=limit)]
+    except BotMethodInvalidError:
+        if not last_message_id:
+            return []
+        ids = list(range(last_message_id, max(0, last_message_id - limit), -1))
+        return [msg for msg in await client.get_messages(channel_id, ids=ids) if msg is not None]
+
+async def reconcile_predictions():
+    """
+    Reprise après redémarrage: reconstruit les prédictions ⏳ du jour courant à partir
+    du canal de prédiction principal puis de ceux des profils (message_id inclus) pour que
+    la vérification continue.
+    Seules les prédictions dont le jeu cible est encore à venir (après le dernier jeu reçu
+    des canaux sources) et dans le délai d'expiration sont reprises. Les autres ont perdu
+    leurs jeux de vérification pendant l'interruption: marquées ❔ (non vérifiables), pas ❌.
+    """
+    await reconcile_channel(None)
+    save_config()
+    for profile in profiles:
+        await reconcile_channel(profile)
+    if len(profiles):
+        profiles.save()
+
+async def reconcile_channel(profile):
+    """Reprise des prédictions ⏳ du canal d'un profil (None = profil principal)."""
+    channel_id, channel_ok, channel_state = prediction_channel(profile)
+    if not (channel_id and channel_ok):
+        return
+    label = f"[{profile.name}] " if profile is not None else ""
+    try:
+        messages = await fetch_recent_predictions(channel_id, channel_state.last_prediction_message_id,
+                                                  RECONCILE_HISTORY_LIMIT)
+    except Exception as e:
+        logger.error("❌ %sReprise des prédictions impossible: %s", label, e)
+        return
     
-    while True:
-        now = datetime.now(wat_tz)
-        target_datetime = datetime.combine(now.date(), reset_time, tzinfo=wat_tz)
-        if now >= target_datetime:
-            target_datetime += timedelta(days=1)
-        
-        time_to_wait = (target_datetime - now).total_seconds()
-        logger.info(f"Prochain reset dans {timedelta(seconds=time_to_wait)}")
-        await asyncio.sleep(time_to_wait)
-        
-        logger.warning("🚨 RESET QUOTIDIEN À 00h59 WAT DÉCLENCHÉ!")
-        
-        global pending_predictions, processed_messages, current_game_number, last_predicted_game, ecart_index
-        
-        pending_predictions.clear()
-        processed_messages.clear()
-        current_game_number = 0
-        last_predicted_game = 0
-        ecart_index = 0
+    now = clock.now(WAT_TZ)
+    today = game_day(now)
+    last_game = state.current_game_number or (result_store.last_game(today) if result_store is not None else None)
+    seen = set()
+    restored = 0
+    unverifiable = []
+    for msg in messages:   # du plus récent au plus ancien: le dernier message d'un jeu fait foi
+        parsed = parse_prediction_message(msg.text or '') if msg.date else None
+        if parsed is None:
+            continue
+        game_number, suit, status = parsed
+        posted = msg.date.astimezone(WAT_TZ)
+        if game_number in seen or game_day(posted) != today:
+            continue
+        seen.add(game_number)
+        channel_state.last_prediction_message_id = max(channel_state.last_prediction_message_id, msg.id)
+        if status != '⏳' or game_number in channel_state.pending_predictions:
+            continue
         
-        save_config()
-        logger.warning("✅ Données réinitialisées pour le nouveau cycle")
+        pred = Prediction(game_number, suit, channel_state.r_offset + 1, message_id=msg.id, day=today,
+                          created_at=posted.timestamp())
+        remaining = PREDICTION_EXPIRY_MINUTES * 60 - (now - posted).total_seconds()
+        if remaining > 0 and (not last_game or cycle_distance(last_game, game_number) > 0):
+            if profile is None:
+                track_prediction(pred, remaining)
+            else:
+                track_profile_prediction(profile, pred, remaining)
+            restored += 1
+        else:
+            pred.status = PredictionStatus.UNVERIFIABLE
+            unverifiable.append(pred)
+    
+    if restored or unverifiable:
+        logger.warning("♻️ %sReprise: %s prédiction(s) ⏳ reconstruite(s), %s non vérifiable(s) (dernier jeu: #%s), sur %s messages lus",
+                       label, restored, len(unverifiable), last_game, len(messages))
+    if profile is None:
+        await publish_results(unverifiable)
+    else:
+        await publish_profile_results(profile, unverifiable)
+
+def daily_reset():
+    """Réinitialisation quotidienne à 00h59 WAT (début d'un nouveau cycle de jeux)."""
+    
+    logger.warning("🚨 RESET QUOTIDIEN À 00h59 WAT DÉCLENCHÉ!")
+    
+    state.reset_cycle()
+    profiles.reset_cycle()
+    
+    save_config()
+    logger.warning("✅ Données réinitialisées pour le nouveau cycle")
+
+def set_time_slot(time_slot: str):
+    """Bascule les règles du profil principal et des profils supplémentaires."""
+    engine.set_time_slot(time_slot)
+    profiles.set_time_slot(time_slot)
+
+def setup_scheduler(start: bool = True):
+    """
+    Enregistre les tâches quotidiennes et démarre le planificateur supervisé.
+    start=False: les ticks sont pilotés par l'appelant (simulation sur horloge virtuelle).
+    """
+    scheduler.add_daily('reset_quotidien', 0, 59, daily_reset)
+    scheduler.add_daily('plage_morning', 0, 0, lambda: set_time_slot('morning'))
+    scheduler.add_daily('plage_afternoon', 13, 0, lambda: set_time_slot('afternoon'))
+    scheduler.add_daily('plage_evening', 19, 1, lambda: set_time_slot('evening'))
+    set_time_slot(engine.current_time_slot())
+    if start:
+        scheduler.start()
+
+async def start_sender_pool():
+    """
+    Connecte les bots expéditeurs supplémentaires (sans réception de mises à jour: seul le
+    client principal lit les canaux). Un bot sans accès à un canal de prédiction est écarté.
+    """
+    from telethon import TelegramClient
+    from telethon.sessions import StringSession
+    
+    senders = [('principal', client)]
+    channels = [PREDICTION_CHANNEL_ID] + [profile.channel_id for profile in profiles]
+    for i, token in enumerate(SENDER_BOT_TOKENS, start=1):
+        extra = TelegramClient(StringSession(), API_ID, API_HASH, receive_updates=False)
+        try:
+            await extra.start(bot_token=token)
+            me = await extra.get_me()
+            for channel_id in channels:
+                await extra.get_entity(channel_id)
+        except Exception as e:
+            logger.error("❌ Expéditeur %s écarté: %s", i, e)
+            if extra.is_connected():
+                await extra.disconnect()
+            continue
+        senders.append((getattr(me, 'username', None) or f'expediteur_{i}', extra))
+    logger.info("📤 Pool de %s expéditeur(s): %s", len(senders), ', '.join(name for name, _ in senders))
+    return SenderPool(senders, max_wait=SENDER_MAX_WAIT)
+
+def on_lease_change(leader: bool):
+    """Informe l'admin d'une bascule de réplica."""
+    if leader and ADMIN_ID and ADMIN_ID != 0 and client is not None and client.is_connected():
+        scheduler.run_now(client.send_message, ADMIN_ID,
+                          f"👑 Réplica **{lease.holder_id}** actif: il publie désormais les prédictions.",
+                          name='alerte_bascule')
 
 async def start_bot():
     """Démarre le client Telegram."""
@@ -932,83 +1581,135 @@ async def start_bot():
         try:
             entity1 = await client.get_entity(SOURCE_CHANNEL_1_ID)
             source_channel_1_ok = True
-            logger.info(f"✅ Canal source 1 accessible: {getattr(entity1, 'title', SOURCE_CHANNEL_1_ID)}")
+            logger.info("✅ Canal source 1 accessible: %s", getattr(entity1, 'title', SOURCE_CHANNEL_1_ID))
         except Exception as e:
             source_channel_1_ok = False
-            logger.error(f"❌ Canal source 1 ({SOURCE_CHANNEL_1_ID}) non accessible: {e}")
+            logger.error("❌ Canal source 1 (%s) non accessible: %s", SOURCE_CHANNEL_1_ID, e)
         
         try:
             entity2 = await client.get_entity(SOURCE_CHANNEL_2_ID)
             source_channel_2_ok = True
-            logger.info(f"✅ Canal source 2 accessible: {getattr(entity2, 'title', SOURCE_CHANNEL_2_ID)}")
+            logger.info("✅ Canal source 2 accessible: %s", getattr(entity2, 'title', SOURCE_CHANNEL_2_ID))
         except Exception as e:
             source_channel_2_ok = False
-            logger.error(f"❌ Canal source 2 ({SOURCE_CHANNEL_2_ID}) non accessible: {e}")
+            logger.error("❌ Canal source 2 (%s) non accessible: %s", SOURCE_CHANNEL_2_ID, e)
         
         try:
             entity3 = await client.get_entity(PREDICTION_CHANNEL_ID)
             prediction_channel_ok = True
-            logger.info(f"✅ Canal prédiction accessible: {getattr(entity3, 'title', PREDICTION_CHANNEL_ID)}")
+            logger.info("✅ Canal prédiction accessible: %s", getattr(entity3, 'title', PREDICTION_CHANNEL_ID))
         except Exception as e:
             prediction_channel_ok = False
-            logger.error(f"❌ Canal prédiction ({PREDICTION_CHANNEL_ID}) non accessible: {e}")
+            logger.error("❌ Canal prédiction (%s) non accessible: %s", PREDICTION_CHANNEL_ID, e)
+        
+        for profile in profiles:
+            await check_profile_channel(profile)
         
         if ADMIN_ID and ADMIN_ID != 0:
             try:
+                profile_lines = ''.join(f"• Profil {profile.name} ({profile.channel_id}): "
+                                        f"{'✅' if profile.channel_ok else '❌'}\n" for profile in profiles)
                 status_msg = f"""🤖 **Bot démarré**
 
 **État des canaux:**
 • Source 1 ({SOURCE_CHANNEL_1_ID}): {'✅' if source_channel_1_ok else '❌'}
 • Source 2 ({SOURCE_CHANNEL_2_ID}): {'✅' if source_channel_2_ok else '❌'}
 • Prédiction ({PREDICTION_CHANNEL_ID}): {'✅' if prediction_channel_ok else '❌'}
-
+{profile_lines}
 **Paramètres:**
-• k={k_position}, a={a_offset}, r={r_offset}
-• Écarts: {ecart_list if ecart_list else f'[défaut: {DEFAULT_ECART}]'}
+• k={state.k_position}, a={state.a_offset}, r={state.r_offset}
+• Écarts: {state.ecart_list if state.ecart_list else f'[défaut: {DEFAULT_ECART}]'}
 
 ⚠️ Si un canal est ❌, ajoutez le bot comme administrateur dans ce canal."""
                 await client.send_message(ADMIN_ID, status_msg)
             except Exception as e:
-                logger.error(f"Erreur envoi status admin: {e}")
+                logger.error("Erreur envoi status admin: %s", e)
         
         return True
     except Exception as e:
-        logger.error(f"Erreur démarrage: {e}")
+        logger.error("Erreur démarrage: %s", e)
         return False
 
 async def main():
     """Fonction principale."""
+    global lease, subscribers, fanout, result_store, sender_pool
     try:
         load_config()
+        profiles.load()
+        result_store = ResultStore(RESULTS_DB_PATH)
+        result_store.start()
         
+        setup_health()
         await start_web_server()
         
+        if REPLICA_LEASE_PATH:
+            # Bail ouvert avant la connexion: tant qu'il n'est pas acquis, le réplica est en
+            # veille (is_publisher() faux) et ne publie rien pendant le démarrage
+            from replication import LeaseManager
+            lease = LeaseManager(REPLICA_LEASE_PATH, ttl=LEASE_TTL_SECONDS, heartbeat=LEASE_TTL_SECONDS / 3)
+            lease.on_change(on_lease_change)
+            lease.start()
+            scheduler.add_daily('purge_publications', 1, 30, lease.prune)
+        
         success = await start_bot()
         if not success:
             logger.error("Échec du démarrage du bot")
             return
         
-        asyncio.create_task(schedule_daily_reset())
+        if SENDER_BOT_TOKENS:
+            sender_pool = await start_sender_pool()
+        setup_memory()
+        
+        setup_scheduler()
+        await reconcile_predictions()
+        
+        subscribers = SubscriberStore(SUBSCRIBERS_DB_PATH)
+        fanout = FanOut(subscribers, client.send_message, global_rate=FANOUT_GLOBAL_RATE,
+                        per_chat_interval=FANOUT_PER_CHAT_INTERVAL)
+        fanout.start()
+        logger.info("📬 %s abonné(s) aux notifications privées", len(subscribers))
         
         logger.info("Bot opérationnel - En attente de messages...")
-        logger.info(f"Paramètres: k={k_position}, a={a_offset}, r={r_offset}, écarts={ecart_list}")
+        logger.info("Paramètres: k=%s, a=%s, r=%s, écarts=%s",
+                    state.k_position, state.a_offset, state.r_offset, state.ecart_list)
         
         await client.run_until_disconnected()
         
-    except Exception as e:
-        logger.error(f"Erreur dans main: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
+    except Exception:
+        logger.exception("Erreur dans main")
     finally:
-        if client.is_connected():
+        await health.stop()
+        await memory.stop()
+        await scheduler.stop()
+        if fanout is not None:
+            await fanout.stop()
+        if subscribers is not None:
+            subscribers.close()
+        if result_store is not None:
+            await result_store.stop()
+            result_store.close()
+        if lease is not None:
+            await lease.stop()
+        if sender_pool is not None:
+            for sender in sender_pool.senders[1:]:
+                await sender.client.disconnect()
+        if client is not None and client.is_connected():
             await client.disconnect()
 
-if __name__ == '__main__':
+def run():
+    """Point d'entrée: journalisation, vérification des identifiants, client Telegram, boucle asyncio."""
+    setup_logging(LOG_LEVEL)
+    if not check_credentials():
+        sys.exit(1)
+    logger.info("Configuration: SOURCE_1=%s, SOURCE_2=%s, PREDICTION=%s",
+                SOURCE_CHANNEL_1_ID, SOURCE_CHANNEL_2_ID, PREDICTION_CHANNEL_ID)
+    create_client()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
         logger.info("Bot arrêté par l'utilisateur")
-    except Exception as e:
-        logger.error(f"Erreur fatale: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
+    except Exception:
+        logger.exception("Erreur fatale")
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,154 @@
+"""
+Gouverneur mémoire pour les petites instances (plan gratuit de Render).
+
+Chaque structure qui peut grossir est enregistrée comme composant:
+- measure() -> octets: empreinte estimée, à coût faible (tailles des tableaux et des
+  entrées plutôt qu'un parcours complet des objets)
+- shrink(excès) -> octets libérés: éviction des entrées les plus anciennes (LRU), purge
+  d'un cache reconstructible, ou déversement sur disque d'un historique déjà en base;
+  absent = composant mesuré seulement (ex: prédictions actives)
+- priority: ordre de sacrifice, du plus petit (réduit en premier) au plus grand
+Une tâche de fond mesure les composants toutes les `interval` secondes. Au-delà du budget,
+les composants sont réduits par priorité jusqu'à redescendre sous low_water * budget.
+Tant que le budget est dépassé, over_budget() permet de refuser les constructions
+coûteuses (index, matrices): le bot se dégrade au lieu d'être tué par le manque de mémoire.
+"""
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def process_rss():
+    """Mémoire résidente du processus (octets), None si /proc n'est pas disponible."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class Component:
+    """Structure suivie par le gouverneur."""
+
+    __slots__ = ('name', 'measure', 'shrink', 'priority', 'size', 'shrinks', 'freed')
+
+    def __init__(self, name: str, measure, shrink=None, priority: int = 100):
+        self.name = name
+        self.measure = measure
+        self.shrink = shrink
+        self.priority = priority
+        self.size = 0           # Dernière mesure (octets)
+        self.shrinks = 0
+        self.freed = 0
+
+
+class MemoryGovernor:
+    """Budget mémoire partagé entre les composants enregistrés (budget 0 = mesure sans contrainte)."""
+
+    def __init__(self, budget: int = 0, low_water: float = 0.8, interval: float = 30.0):
+        self.budget = budget
+        self.low_water = low_water
+        self.interval = interval
+        self._components = {}
+        self._task = None
+        self.total = 0
+        self.stats = {'checks': 0, 'enforcements': 0, 'freed': 0}
+
+    def register(self, name: str, measure, shrink=None, priority: int = 100):
+        self._components[name] = Component(name, measure, shrink, priority)
+
+    def unregister(self, name: str):
+        self._components.pop(name, None)
+
+    # --- Mesure ---
+
+    def measure(self) -> int:
+        """Mesure tous les composants. Retourne le total (octets)."""
+        total = 0
+        for component in self._components.values():
+            try:
+                component.size = int(component.measure())
+            except Exception as e:
+                logger.error("Mesure mémoire %s impossible: %s", component.name, e)
+                component.size = 0
+            total += component.size
+        self.total = total
+        return total
+
+    def over_budget(self) -> bool:
+        return bool(self.budget) and self.total > self.budget
+
+    # --- Application du budget ---
+
+    def enforce(self) -> int:
+        """
+        Mesure puis, au-delà du budget, réduit les composants par priorité jusqu'à
+        low_water * budget. Retourne le nombre d'octets libérés.
+        """
+        self.stats['checks'] += 1
+        total = self.measure()
+        if not self.budget or total <= self.budget:
+            return 0
+
+        self.stats['enforcements'] += 1
+        target = int(self.budget * self.low_water)
+        freed_total = 0
+        for component in sorted(self._components.values(), key=lambda c: c.priority):
+            excess = total - freed_total - target
+            if excess <= 0:
+                break
+            if component.shrink is None or not component.size:
+                continue
+            try:
+                freed = int(component.shrink(excess) or 0)
+            except Exception as e:
+                logger.error("Réduction mémoire %s impossible: %s", component.name, e)
+                continue
+            if freed:
+                component.shrinks += 1
+                component.freed += freed
+                freed_total += freed
+                logger.warning("🧹 Mémoire: %s réduit de %s octets", component.name, freed)
+
+        self.stats['freed'] += freed_total
+        self.measure()
+        if self.over_budget():
+            logger.warning("🧠 Budget mémoire dépassé après réduction: %s / %s octets", self.total, self.budget)
+        return freed_total
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            self.enforce()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(), name='memory_governor')
+        return self._task
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # --- Rapport ---
+
+    def report(self) -> dict:
+        """Usage courant par composant (mesuré à l'appel), du plus gros au plus petit."""
+        self.measure()
+        components = sorted(self._components.values(), key=lambda c: c.size, reverse=True)
+        return {
+            'budget': self.budget,
+            'total': self.total,
+            'over_budget': self.over_budget(),
+            'rss': process_rss(),
+            'components': {c.name: {'bytes': c.size, 'priority': c.priority, 'shrinkable': c.shrink is not None,
+                                    'shrinks': c.shrinks, 'freed': c.freed} for c in components},
+            **self.stats,
+        }
@@ -0,0 +1,71 @@
+"""
+Rapport mémoire: empreinte de chaque structure de l'état du moteur
+(taille profonde) et principales allocations suivies par tracemalloc.
+tracemalloc n'est actif que sur demande (/mem start), son coût étant non nul.
+"""
+import sys
+import tracemalloc
+
+_ATOMIC = (str, bytes, int, float, bool, type(None))
+
+
+def deep_sizeof(obj, seen: set = None) -> int:
+    """Taille mémoire (octets) d'un objet et de tout ce qu'il référence, sans doublons."""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, _ATOMIC):
+        return size
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += deep_sizeof(key, seen) + deep_sizeof(value, seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += deep_sizeof(item, seen)
+    slots = getattr(type(obj), '__slots__', None)
+    if slots:
+        for name in slots:
+            if hasattr(obj, name):
+                size += deep_sizeof(getattr(obj, name), seen)
+    elif hasattr(obj, '__dict__') and not isinstance(obj, type):
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+
+def structure_report(state) -> dict:
+    """Empreinte de chaque champ de l'état (octets), triée par taille décroissante."""
+    sizes = {name: deep_sizeof(getattr(state, name)) for name in type(state).__slots__}
+    return dict(sorted(sizes.items(), key=lambda item: item[1], reverse=True))
+
+
+def start_tracing(frames: int = 1):
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def stop_tracing():
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def tracemalloc_top(limit: int = 10):
+    """(lignes les plus allocatrices, mémoire courante, pic) ou None si le suivi est inactif."""
+    if not tracemalloc.is_tracing():
+        return None
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    ))
+    stats = snapshot.statistics('lineno')[:limit]
+    current, peak = tracemalloc.get_traced_memory()
+    return stats, current, peak
+
+
+def format_size(size: int) -> str:
+    for unit in ('o', 'Ko', 'Mo'):
+        if abs(size) < 1024 or unit == 'Mo':
+            return f"{size:.0f} {unit}" if unit == 'o' else f"{size:.1f} {unit}"
+        size /= 1024
@@ -0,0 +1,103 @@
+"""
+Analyse des messages des canaux sources et du canal de prédiction (fonctions pures, sans I/O).
+Utilisée par le bot en direct et par l'import des exports Telegram.
+"""
+import re
+
+from config import ALL_SUITS
+
+_GAME_NUMBER_RE = re.compile(r"#N\s*(\d+)\.?", re.IGNORECASE)
+_GROUPS_RE = re.compile(r"\(([^)]*)\)")
+# Format écrit par send_prediction_to_channel: "🔵N🔵:♠️ statut :⏳"
+_PREDICTION_RE = re.compile(r"🔵(\d+)🔵:\s*(\S+?)\s*statut\s*:\s*(\S+)")
+
+
+def extract_game_number(message: str):
+    """Extrait le numéro de jeu du message."""
+    match = _GAME_NUMBER_RE.search(message)
+    if match:
+        return int(match.group(1))
+    return None
+
+
+def extract_parentheses_groups(message: str):
+    """Extrait le contenu entre parenthèses."""
+    return _GROUPS_RE.findall(message)
+
+
+def normalize_suits(group_str: str) -> str:
+    """Remplace les différentes variantes de symboles par un format unique."""
+    normalized = group_str.replace('❤️', '♥').replace('❤', '♥').replace('♥️', '♥')
+    normalized = normalized.replace('♠️', '♠').replace('♦️', '♦').replace('♣️', '♣')
+    return normalized
+
+
+def get_suits_in_group(group_str: str):
+    """Liste toutes les couleurs présentes dans une chaîne."""
+    normalized = normalize_suits(group_str)
+    return [s for s in ALL_SUITS if s in normalized]
+
+
+def get_suit_at_position(group_str: str, position: int) -> str:
+    """
+    Extrait la couleur à la position k dans le premier groupe.
+    Position commence à 1.
+    Exemple: "10♦️5♥️J♣️" avec position=1 retourne ♦, position=2 retourne ♥, position=3 retourne ♣
+    """
+    normalized = normalize_suits(group_str)
+    suits_found = []
+    for char in normalized:
+        if char in ALL_SUITS:
+            suits_found.append(char)
+    
+    if position <= 0 or position > len(suits_found):
+        return None
+    
+    return suits_found[position - 1]
+
+
+def has_suit_in_group(group_str: str, target_suit: str) -> bool:
+    """Vérifie si la couleur cible est présente dans le groupe."""
+    normalized = normalize_suits(group_str)
+    target_normalized = normalize_suits(target_suit)
+    for suit in ALL_SUITS:
+        if suit in target_normalized and suit in normalized:
+            return True
+    return False
+
+
+def is_message_finalized(message: str) -> bool:
+    """Vérifie si le message est un résultat final (non en cours)."""
+    if '⏰' in message:
+        return False
+    return '✅' in message or '🔰' in message
+
+
+def parse_finalized_result(message: str):
+    """
+    Analyse complète d'un message source: (numéro de jeu, premier groupe) pour
+    un résultat finalisé, None pour un jeu en cours ou un message sans jeu.
+    """
+    if not is_message_finalized(message):
+        return None
+    game_number = extract_game_number(message)
+    if game_number is None:
+        return None
+    groups = extract_parentheses_groups(message)
+    if not groups:
+        return None
+    return game_number, groups[0]
+
+
+def parse_prediction_message(message: str):
+    """
+    Analyse un message du canal de prédiction: (numéro de jeu, couleur, statut)
+    avec statut '⏳' (en cours), '✅N️⃣', '❌' ou '❔'; None si le format n'est pas reconnu.
+    """
+    match = _PREDICTION_RE.search(message)
+    if not match:
+        return None
+    suits = get_suits_in_group(match.group(2))
+    if len(suits) != 1:
+        return None
+    return int(match.group(1)), suits[0], match.group(3)
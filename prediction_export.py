@@ -0,0 +1,70 @@
+"""
+Export en flux de l'historique des prédictions (CSV ou NDJSON) depuis la base des résultats.
+Les lignes sont lues et encodées par lots dans un thread (la boucle asyncio n'est jamais
+bloquée par SQLite ni par l'encodage) et chaque lot est écrit aussitôt: mémoire constante,
+quelle que soit la période exportée. Utilisé par la route /api/export et la commande /export.
+"""
+import asyncio
+import csv
+import io
+import json
+from datetime import date
+
+from result_store import PREDICTION_COLUMNS
+
+CHUNK_ROWS = 1000
+
+# format -> (type MIME, extension)
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+
+def parse_day(value: str):
+    """Journée AAAA-MM-JJ validée, None si vide. ValueError si invalide."""
+    if not value:
+        return None
+    return date.fromisoformat(value).isoformat()
+
+
+def encode_chunk(rows, fmt: str, header: bool = False) -> bytes:
+    """Encode un lot de lignes (ordre de PREDICTION_COLUMNS)."""
+    if fmt == 'ndjson':
+        return ''.join(json.dumps(dict(zip(PREDICTION_COLUMNS, row)), ensure_ascii=False) + '\n'
+                       for row in rows).encode('utf-8')
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(PREDICTION_COLUMNS)
+    writer.writerows(rows)
+    return buffer.getvalue().encode('utf-8')
+
+
+async def stream_predictions(store, write, fmt: str = 'csv', day_from: str = None, day_to: str = None,
+                             chunk_rows: int = CHUNK_ROWS) -> int:
+    """
+    Écrit les prédictions entre deux journées via la coroutine write(bytes), lot par lot.
+    Retourne le nombre de lignes exportées.
+    """
+    chunks = store.prediction_chunks(day_from, day_to, chunk_rows)
+
+    def read_chunk():
+        rows = next(chunks, None)
+        return None if rows is None else (encode_chunk(rows, fmt), len(rows))
+
+    exported = 0
+    try:
+        if fmt == 'csv':
+            await write(encode_chunk([], fmt, header=True))
+        while True:
+            chunk = await asyncio.to_thread(read_chunk)   # Lecture et encodage hors de la boucle asyncio
+            if chunk is None:
+                return exported
+            await write(chunk[0])
+            exported += chunk[1]
+    finally:
+        try:
+            chunks.close()
+        except ValueError:
+            pass    # Annulé pendant la lecture d'un lot: la connexion sera fermée par le ramasse-miettes
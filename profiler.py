@@ -0,0 +1,106 @@
+"""
+Profilage à la demande du processus en cours.
+- cProfile sur le thread de la boucle asyncio -> texte pstats
+- échantillonneur (thread séparé, sys._current_frames) -> piles repliées
+  au format flamegraph ("a;b;c N")
+Rien n'est installé tant qu'aucun profilage n'est demandé: coût nul à l'arrêt.
+"""
+import asyncio
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+MAX_SECONDS = 300
+SAMPLE_INTERVAL = 0.005
+
+
+class ProfileResult:
+    def __init__(self, seconds: float, pstats_text: str = None, collapsed: str = None, samples: int = 0):
+        self.seconds = seconds
+        self.pstats_text = pstats_text
+        self.collapsed = collapsed
+        self.samples = samples
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class StackSampler(threading.Thread):
+    """Échantillonne périodiquement la pile d'un thread cible."""
+
+    def __init__(self, target_thread_id: int, interval: float = SAMPLE_INTERVAL):
+        super().__init__(name='stack-sampler', daemon=True)
+        self.target_thread_id = target_thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.target_thread_id)
+            if frame is None:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(labels))] += 1
+            self.samples += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def collapsed(self) -> str:
+        return '\n'.join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+
+class Profiler:
+    """Un seul profilage à la fois; les demandes concurrentes sont refusées."""
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    async def profile(self, seconds: float, cprofile: bool = True, sampling: bool = True,
+                      top: int = 40) -> ProfileResult:
+        seconds = max(1.0, min(float(seconds), MAX_SECONDS))
+        if self._lock.locked():
+            raise RuntimeError("Un profilage est déjà en cours")
+        async with self._lock:
+            sampler = StackSampler(threading.get_ident()) if sampling else None
+            prof = cProfile.Profile() if cprofile else None
+            start = time.perf_counter()
+            if sampler:
+                sampler.start()
+            if prof:
+                prof.enable()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                if prof:
+                    prof.disable()
+                if sampler:
+                    sampler.stop()
+            elapsed = time.perf_counter() - start
+
+            result = ProfileResult(elapsed)
+            if prof:
+                out = io.StringIO()
+                pstats.Stats(prof, stream=out).sort_stats('cumulative').print_stats(top)
+                result.pstats_text = out.getvalue()
+            if sampler:
+                result.collapsed = sampler.collapsed()
+                result.samples = sampler.samples
+            return result
@@ -0,0 +1,168 @@
+"""
+Profils de stratégie: plusieurs produits de prédiction alimentés par les mêmes canaux sources.
+
+Chaque profil a son canal de prédiction, ses paramètres (k, a, r, écarts, mode intelligent
+ou statique) et ses prédictions actives, dans son propre PredictionEngine. Les messages
+sources sont analysés, dédoublonnés et enregistrés une seule fois par le moteur principal;
+chaque profil reçoit les résultats déjà analysés (engine.ingest): un profil de plus ne coûte
+que sa vérification, sa décision et sa publication, sans connexion Telegram supplémentaire.
+
+Profils persistés dans un fichier JSON (PROFILES_PATH), modifiés par la commande /profiles:
+    [{"name": "inter", "channel_id": -100..., "k_position": 2, "intelligent_mode": true, ...}]
+Le profil principal (PREDICTION_CHANNEL_ID, bot_config.json) n'en fait pas partie.
+"""
+import json
+import logging
+import os
+import re
+
+from config import DEFAULT_ECART
+from engine import PredictionEngine
+from state import EngineState
+
+logger = logging.getLogger(__name__)
+
+NAME_RE = re.compile(r'^[a-z0-9_-]{1,32}$')
+
+PARAMS_USAGE = "k=<n> a=<n> r=<0-10> eca=<n1,n2|reset> inter|statique"
+
+
+def parse_params(tokens) -> dict:
+    """
+    Paramètres d'un profil écrits comme dans les commandes (k=2 a=1 r=2 eca=3,2 inter).
+    Retourne les champs de EngineState à modifier. ValueError si un paramètre est invalide.
+    """
+    params = {}
+    for token in tokens:
+        name, _, value = token.lower().partition('=')
+        if name == 'inter' and not value:
+            params['intelligent_mode'] = True
+        elif name == 'statique' and not value:
+            params['intelligent_mode'] = False
+        elif name == 'k' and int(value) >= 1:
+            params['k_position'] = int(value)
+        elif name == 'a' and int(value) >= 0:
+            params['a_offset'] = int(value)
+        elif name == 'r' and 0 <= int(value) <= 10:
+            params['r_offset'] = int(value)
+        elif name == 'eca':
+            ecarts = [] if value in ('reset', '0') else [int(x) for x in value.split(',') if x.strip()]
+            if not all(e >= 1 for e in ecarts):
+                raise ValueError(token)
+            params['ecart_list'] = ecarts
+            params['ecart_index'] = 0
+        else:
+            raise ValueError(token)
+    return params
+
+
+class Profile:
+    """Profil de stratégie: canal de publication et moteur de prédiction dédié."""
+
+    __slots__ = ('name', 'channel_id', 'engine', 'channel_ok')
+
+    def __init__(self, name: str, channel_id: int, engine: PredictionEngine):
+        self.name = name
+        self.channel_id = channel_id
+        self.engine = engine
+        self.channel_ok = False     # Accès au canal vérifié au démarrage ou à l'ajout
+
+    @property
+    def state(self) -> EngineState:
+        return self.engine.state
+
+    def to_config(self) -> dict:
+        return {'name': self.name, 'channel_id': self.channel_id, **self.state.to_config()}
+
+    def describe(self) -> str:
+        state = self.state
+        ecarts = state.ecart_list if state.ecart_list else f"[défaut: {DEFAULT_ECART}]"
+        mode = "🧠 intelligent" if state.intelligent_mode else "📐 statique"
+        return f"k={state.k_position}, a={state.a_offset}, r={state.r_offset}, écarts={ecarts}, {mode}"
+
+    def __repr__(self):
+        return f"Profile({self.name} -> {self.channel_id})"
+
+
+class ProfileSet:
+    """Profils supplémentaires, dans l'ordre d'ajout, et leur fichier de persistance."""
+
+    def __init__(self, path: str, clock=None):
+        self.path = path
+        self.clock = clock
+        self._profiles = {}
+
+    def __iter__(self):
+        return iter(list(self._profiles.values()))
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    def get(self, name: str):
+        return self._profiles.get(name)
+
+    # --- Persistance ---
+
+    def _create(self, name: str, channel_id: int, config: dict) -> Profile:
+        engine = PredictionEngine(clock=self.clock)
+        engine.state.apply_config(config)
+        profile = Profile(name, channel_id, engine)
+        self._profiles[name] = profile
+        return profile
+
+    def load(self):
+        """Charge les profils du fichier JSON (absent = aucun profil)."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                entries = json.load(f)
+            for entry in entries:
+                self._create(entry['name'], int(entry['channel_id']), entry)
+            logger.info("%s profil(s) chargé(s): %s", len(self._profiles), ', '.join(self._profiles))
+        except Exception as e:
+            logger.error("Erreur chargement profils: %s", e)
+
+    def save(self):
+        try:
+            with open(self.path, 'w') as f:
+                json.dump([profile.to_config() for profile in self._profiles.values()], f)
+            logger.debug("Profils sauvegardés")
+        except Exception as e:
+            logger.error("Erreur sauvegarde profils: %s", e)
+
+    # --- Gestion ---
+
+    def add(self, name: str, channel_id: int, params: dict = None) -> Profile:
+        """Nouveau profil (paramètres par défaut complétés par params). ValueError si le nom est invalide ou pris."""
+        if not NAME_RE.match(name) or name in self._profiles:
+            raise ValueError(name)
+        profile = self._create(name, channel_id, {})
+        self.update(profile, params or {})
+        logger.info("Profil %s ajouté (canal %s): %s", name, channel_id, profile.describe())
+        return profile
+
+    def update(self, profile: Profile, params: dict):
+        for field, value in params.items():
+            setattr(profile.state, field, value)
+        self.save()
+
+    def remove(self, name: str):
+        """Supprime un profil (ses prédictions actives sont abandonnées). Retourne le profil ou None."""
+        profile = self._profiles.pop(name, None)
+        if profile is not None:
+            profile.state.clear_pending()
+            self.save()
+            logger.info("Profil %s supprimé", name)
+        return profile
+
+    # --- Cycle et plages horaires ---
+
+    def set_time_slot(self, time_slot: str):
+        for profile in self._profiles.values():
+            profile.engine.set_time_slot(time_slot)
+
+    def reset_cycle(self):
+        for profile in self._profiles.values():
+            profile.state.reset_cycle()
+        self.save()
@@ -0,0 +1,206 @@
+"""
+Réplicas actif/veille sur une même machine.
+Tous les processus reçoivent et analysent les messages (état chaud), mais
+seul le détenteur du bail (ligne SQLite renouvelée par battement de coeur)
+publie. Chaque publication est réservée dans la même base avant l'envoi:
+un jeu cible n'est jamais publié deux fois, même juste après une bascule.
+Les réservations sont propres à chaque profil de stratégie ('' = profil principal).
+"""
+import asyncio
+import logging
+import os
+import socket
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS lease (
+    name TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+_PUBLICATIONS = """
+CREATE TABLE IF NOT EXISTS publications (
+    profile TEXT NOT NULL DEFAULT '',
+    day TEXT NOT NULL,
+    target_game INTEGER NOT NULL,
+    holder TEXT NOT NULL,
+    message_id INTEGER NOT NULL DEFAULT 0,
+    claimed_at REAL NOT NULL,
+    PRIMARY KEY (profile, day, target_game)
+);
+"""
+
+# Base créée avant les profils (clé (day, target_game)): réservations reprises pour le profil principal
+_MIGRATE_PUBLICATIONS = f"""
+BEGIN IMMEDIATE;
+ALTER TABLE publications RENAME TO publications_old;
+{_PUBLICATIONS}
+INSERT OR IGNORE INTO publications (day, target_game, holder, message_id, claimed_at)
+    SELECT day, target_game, holder, message_id, claimed_at FROM publications_old;
+DROP TABLE publications_old;
+COMMIT;
+"""
+
+
+class LeaseManager:
+    """Bail de publication partagé entre processus via une base SQLite locale."""
+
+    def __init__(self, path: str, name: str = 'publisher', ttl: float = 3.0, heartbeat: float = 1.0,
+                 holder_id: str = None):
+        self.path = path
+        self.name = name
+        self.ttl = ttl
+        self.heartbeat = heartbeat
+        self.holder_id = holder_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.is_leader = False
+        self.leader_since = None
+        self.failovers = 0
+        self._expires_at = 0.0
+        self._task = None
+        self._on_change = []
+        self._db = sqlite3.connect(path, timeout=1.0, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(publications)")]
+        self._db.executescript(_MIGRATE_PUBLICATIONS if columns and 'profile' not in columns else _PUBLICATIONS)
+
+    def on_change(self, callback):
+        """Enregistre callback(is_leader) appelé à chaque changement de rôle."""
+        self._on_change.append(callback)
+
+    @property
+    def holds_lease(self) -> bool:
+        """Bail détenu et encore valide localement (garde contre un battement manqué)."""
+        return self.is_leader and time.time() < self._expires_at
+
+    def try_acquire(self) -> bool:
+        """Acquiert ou renouvelle le bail si libre, expiré ou déjà détenu."""
+        now = time.time()
+        try:
+            self._db.execute("BEGIN IMMEDIATE")
+            row = self._db.execute("SELECT holder, expires_at FROM lease WHERE name = ?", (self.name,)).fetchone()
+            acquired = row is None or row[0] == self.holder_id or row[1] < now
+            if acquired:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO lease (name, holder, expires_at) VALUES (?, ?, ?)",
+                    (self.name, self.holder_id, now + self.ttl),
+                )
+            self._db.execute("COMMIT")
+        except sqlite3.Error as e:
+            if self._db.in_transaction:
+                self._db.execute("ROLLBACK")
+            logger.error("Erreur bail de publication: %s", e)
+            acquired = False
+
+        if acquired:
+            self._expires_at = now + self.ttl
+        self._set_leader(acquired)
+        return acquired
+
+    def release(self):
+        """Libère le bail (arrêt propre) pour une bascule immédiate."""
+        if not self.is_leader:
+            return
+        try:
+            self._db.execute("DELETE FROM lease WHERE name = ? AND holder = ?", (self.name, self.holder_id))
+        except sqlite3.Error as e:
+            logger.error("Erreur libération du bail: %s", e)
+        self._set_leader(False)
+
+    def _set_leader(self, leader: bool):
+        if leader == self.is_leader:
+            return
+        self.is_leader = leader
+        if leader:
+            self.leader_since = time.time()
+            self.failovers += 1
+            logger.warning("👑 Bail acquis: ce processus (%s) publie désormais", self.holder_id)
+        else:
+            self.leader_since = None
+            logger.warning("💤 Bail perdu: ce processus (%s) passe en veille", self.holder_id)
+        for callback in self._on_change:
+            try:
+                callback(leader)
+            except Exception:
+                logger.exception("Erreur callback changement de rôle")
+
+    def claim_publication(self, day: str, target_game: int, profile: str = '') -> bool:
+        """
+        Réserve la publication d'un jeu cible d'un profil. Échoue si le bail n'est plus
+        détenu ou si un autre processus l'a déjà réservée.
+        """
+        if not self.holds_lease:
+            return False
+        now = time.time()
+        try:
+            self._db.execute("BEGIN IMMEDIATE")
+            row = self._db.execute("SELECT holder, expires_at FROM lease WHERE name = ?", (self.name,)).fetchone()
+            if row is None or row[0] != self.holder_id or row[1] < now:
+                self._db.execute("ROLLBACK")
+                return False
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO publications (profile, day, target_game, holder, claimed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (profile, day, target_game, self.holder_id, now),
+            )
+            self._db.execute("COMMIT")
+            return cursor.rowcount == 1
+        except sqlite3.Error as e:
+            if self._db.in_transaction:
+                self._db.execute("ROLLBACK")
+            logger.error("Erreur réservation publication #%s: %s", target_game, e)
+            return False
+
+    def record_message_id(self, day: str, target_game: int, message_id: int, profile: str = ''):
+        try:
+            self._db.execute(
+                "UPDATE publications SET message_id = ? WHERE profile = ? AND day = ? AND target_game = ?",
+                (message_id, profile, day, target_game),
+            )
+        except sqlite3.Error as e:
+            logger.error("Erreur enregistrement msg_id #%s: %s", target_game, e)
+
+    def published_message_id(self, day: str, target_game: int, profile: str = '') -> int:
+        """msg_id publié par n'importe quel processus pour ce jeu du profil (0 si inconnu)."""
+        row = self._db.execute(
+            "SELECT message_id FROM publications WHERE profile = ? AND day = ? AND target_game = ?",
+            (profile, day, target_game),
+        ).fetchone()
+        return row[0] if row else 0
+
+    def prune(self, keep_days: int = 3):
+        """Supprime les réservations des anciennes journées."""
+        self._db.execute("DELETE FROM publications WHERE claimed_at < ?", (time.time() - keep_days * 86400,))
+
+    async def _run(self):
+        while True:
+            self.try_acquire()
+            await asyncio.sleep(self.heartbeat)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self.try_acquire()
+            self._task = asyncio.create_task(self._run())
+        return self._task
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self.release()
+
+    def status(self) -> dict:
+        return {
+            'holder_id': self.holder_id,
+            'leader': self.holds_lease,
+            'leader_since': self.leader_since,
+            'failovers': self.failovers,
+        }
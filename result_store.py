@@ -0,0 +1,220 @@
+"""
+Stockage local (SQLite) des résultats finalisés des canaux sources et des prédictions publiées.
+- results: une ligne par (journée de jeu, numéro de jeu, canal source)
+- predictions: une ligne par (profil, journée de jeu, jeu cible), mise à jour à la clôture
+Les écritures du bot passent par une tâche d'écriture unique (start/submit_*): les lots en
+attente sont écrits en une transaction dans un thread, hors de la boucle asyncio, dans
+l'ordre de soumission (une prédiction clôturée n'est jamais écrasée par son état ⏳).
+"""
+import asyncio
+import logging
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    day TEXT NOT NULL,            -- journée de jeu (reset à 00h59 WAT)
+    game_number INTEGER NOT NULL, -- 1 à MAX_GAME_NUMBER
+    source INTEGER NOT NULL,      -- 1 ou 2
+    first_group TEXT NOT NULL,    -- contenu brut du premier groupe
+    suits INTEGER NOT NULL,       -- masque des couleurs du premier groupe
+    posted_at TEXT,               -- date du message source (ISO)
+    PRIMARY KEY (day, game_number, source)
+) WITHOUT ROWID;
+"""
+
+_PREDICTIONS = """
+CREATE TABLE IF NOT EXISTS predictions (
+    day TEXT NOT NULL,            -- journée de jeu de la publication
+    target_game INTEGER NOT NULL,
+    suit TEXT NOT NULL,           -- couleur prédite (♠ ♥ ♦ ♣)
+    status TEXT NOT NULL,         -- pending, won, lost, expired, unverifiable
+    result TEXT NOT NULL,         -- statut affiché dans le canal (⏳, ✅0️⃣, ❌...)
+    check_count INTEGER NOT NULL, -- essai de la réussite (won) ou essais effectués
+    max_checks INTEGER NOT NULL,
+    message_id INTEGER NOT NULL,  -- message du canal de prédiction (0 = non publié)
+    created_at TEXT NOT NULL,     -- publication (ISO, WAT)
+    finalized_at TEXT,            -- clôture (ISO, WAT)
+    profile TEXT NOT NULL DEFAULT '', -- profil de stratégie ('' = profil principal)
+    PRIMARY KEY (profile, day, target_game)
+) WITHOUT ROWID;
+"""
+
+# Colonnes des exports de prédictions, dans l'ordre
+PREDICTION_COLUMNS = ('day', 'target_game', 'suit', 'status', 'result', 'check_count', 'max_checks',
+                      'message_id', 'created_at', 'finalized_at', 'profile')
+
+# Base créée avant les profils (clé (day, target_game)): prédictions reprises pour le profil principal
+_MIGRATE_PREDICTIONS = f"""
+BEGIN IMMEDIATE;
+ALTER TABLE predictions RENAME TO predictions_old;
+{_PREDICTIONS}
+INSERT INTO predictions ({', '.join(PREDICTION_COLUMNS[:-1])})
+    SELECT {', '.join(PREDICTION_COLUMNS[:-1])} FROM predictions_old;
+DROP TABLE predictions_old;
+COMMIT;
+"""
+
+
+class ResultStore:
+    """Accès à la base des résultats; insertions groupées en une transaction."""
+
+    def __init__(self, path: str):
+        self.path = path
+        # Connexion partagée avec le thread d'écriture, accès sérialisés par _lock
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(predictions)")]
+        self._db.executescript(_MIGRATE_PREDICTIONS if columns and 'profile' not in columns else _PREDICTIONS)
+        self._queue = None
+        self._task = None
+        self.stats = {'batches': 0, 'writes': 0, 'errors': 0}
+
+    def insert_results(self, rows) -> int:
+        """
+        Insère des lignes (day, game_number, source, first_group, suits, posted_at).
+        Les doublons sont ignorés. Retourne le nombre de lignes nouvelles.
+        """
+        with self._lock:
+            before = self._db.total_changes
+            with self._db:
+                self._insert_results(rows)
+            return self._db.total_changes - before
+
+    def _insert_results(self, rows):
+        self._db.executemany(
+            "INSERT OR IGNORE INTO results (day, game_number, source, first_group, suits, posted_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+    def iter_results(self, source: int):
+        """
+        Générateur des résultats d'un canal source (day, game_number, first_group, suits, posted_at),
+        par journée puis jeu, sur une connexion dédiée (utilisable depuis un thread).
+        """
+        db = sqlite3.connect(self.path, check_same_thread=False)
+        try:
+            yield from db.execute(
+                "SELECT day, game_number, first_group, suits, posted_at FROM results "
+                "WHERE source = ? ORDER BY day, game_number",
+                (source,),
+            )
+        finally:
+            db.close()
+
+    def last_game(self, day: str):
+        """Dernier jeu reçu des canaux sources pour une journée (date du message), None si aucun."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT game_number FROM results WHERE day = ? ORDER BY posted_at DESC LIMIT 1", (day,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def save_prediction(self, row: tuple):
+        """Insère ou met à jour une prédiction (valeurs dans l'ordre de PREDICTION_COLUMNS)."""
+        with self._lock, self._db:
+            self._save_prediction(row)
+
+    def _save_prediction(self, row: tuple):
+        self._db.execute(
+            f"INSERT OR REPLACE INTO predictions ({', '.join(PREDICTION_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(PREDICTION_COLUMNS))})",
+            row,
+        )
+
+    # --- Tâche d'écriture ---
+
+    def submit_results(self, rows):
+        """Insertion de résultats hors de la boucle (écriture directe si la tâche n'est pas démarrée)."""
+        self._submit(self._insert_results, list(rows))
+
+    def submit_prediction(self, row: tuple):
+        """Enregistrement d'une prédiction hors de la boucle (écriture directe si la tâche n'est pas démarrée)."""
+        self._submit(self._save_prediction, row)
+
+    def _submit(self, write, arg):
+        if self._queue is None:
+            self._write_batch([(write, arg)])
+        else:
+            self._queue.put_nowait((write, arg))
+
+    def _write_batch(self, batch):
+        """Écrit un lot en une transaction (thread d'écriture). Une erreur n'annule que ce lot."""
+        try:
+            with self._lock, self._db:
+                for write, arg in batch:
+                    write(arg)
+        except sqlite3.Error as e:
+            self.stats['errors'] += 1
+            logger.error("Erreur écriture base des résultats (%s écriture(s) perdues): %s", len(batch), e)
+            return
+        self.stats['batches'] += 1
+        self.stats['writes'] += len(batch)
+
+    async def _run(self):
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            await asyncio.to_thread(self._write_batch, batch)
+
+    def start(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(), name='result_writer')
+        return self._task
+
+    async def stop(self):
+        """Arrête la tâche d'écriture après avoir écrit les lots en attente."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._queue is not None:
+            batch = []
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            self._queue = None
+            if batch:
+                self._write_batch(batch)
+
+    def prediction_chunks(self, day_from: str = None, day_to: str = None, chunk_size: int = 1000):
+        """
+        Générateur de lots de prédictions (tuples dans l'ordre de PREDICTION_COLUMNS), triés
+        par journée puis publication, entre deux journées incluses (AAAA-MM-JJ, None = sans borne).
+        Lecture sur une connexion dédiée, utilisable depuis un thread: un export ne bloque
+        pas les écritures du bot et la mémoire reste bornée à un lot.
+        """
+        db = sqlite3.connect(self.path, check_same_thread=False)
+        try:
+            cursor = db.execute(
+                f"SELECT {', '.join(PREDICTION_COLUMNS)} FROM predictions "
+                "WHERE day >= ? AND day <= ? ORDER BY day, created_at",
+                (day_from or '', day_to or '9999-12-31'),
+            )
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            db.close()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,286 @@
+"""
+Planificateur supervisé basé sur une roue de temporisation hiérarchique.
+- Minuteries relatives (expiration des prédictions): roue secondes/minutes/heures
+  pilotée par l'horloge monotone, insensible aux changements d'heure système.
+- Tâches quotidiennes (reset 00h59, changements de plage horaire): évaluées à
+  chaque tick sur l'heure murale WAT, une seule exécution par jour même si
+  l'horloge saute en avant ou en arrière.
+- La boucle est relancée automatiquement en cas d'erreur et expose son état.
+- L'heure est lue via une horloge injectable (clock.py): en simulation, tick()
+  est appelé directement après chaque avance de l'horloge virtuelle.
+"""
+import asyncio
+import logging
+import math
+from datetime import datetime, timedelta, timezone
+
+from clock import SystemClock
+
+logger = logging.getLogger(__name__)
+
+WAT_TZ = timezone(timedelta(hours=1))
+
+TICK_SECONDS = 1.0
+CLOCK_JUMP_TOLERANCE = 5.0   # Écart (s) entre horloge murale et monotone signalé comme saut
+RESTART_BACKOFF_MAX = 30.0
+
+_LEVELS = (
+    (60, 1),       # 60 emplacements d'une seconde
+    (60, 60),      # 60 emplacements d'une minute
+    (24, 3600),    # 24 emplacements d'une heure
+)
+
+
+class Timer:
+    """Minuterie planifiée dans la roue (annulable)."""
+
+    __slots__ = ('expires', 'callback', 'args', 'name', 'cancelled')
+
+    def __init__(self, expires: int, callback, args, name: str):
+        self.expires = expires
+        self.callback = callback
+        self.args = args
+        self.name = name
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TimerWheel:
+    """
+    Roue de temporisation hiérarchique à 3 niveaux (s, min, h).
+    Insertion et annulation O(1); les minuteries descendent d'un niveau
+    lorsque leur emplacement est atteint. Au-delà de 24h: liste de débordement.
+    """
+
+    def __init__(self):
+        self.tick = 0
+        self._wheels = [[[] for _ in range(size)] for size, _ in _LEVELS]
+        self._overflow = []
+        self.active = 0
+
+    def schedule(self, delay: float, callback, *args, name: str = '') -> Timer:
+        ticks = max(1, math.ceil(delay / TICK_SECONDS))
+        timer = Timer(self.tick + ticks, callback, args, name or getattr(callback, '__name__', 'timer'))
+        self._place(timer)
+        self.active += 1
+        return timer
+
+    def _place(self, timer: Timer):
+        delta = timer.expires - self.tick
+        for level, (size, resolution) in enumerate(_LEVELS):
+            if delta < size * resolution:
+                self._wheels[level][(timer.expires // resolution) % size].append(timer)
+                return
+        self._overflow.append(timer)
+
+    def _cascade(self, level: int):
+        size, resolution = _LEVELS[level]
+        index = (self.tick // resolution) % size
+        bucket, self._wheels[level][index] = self._wheels[level][index], []
+        for timer in bucket:
+            if not timer.cancelled:
+                self._place(timer)
+            else:
+                self.active -= 1
+
+    def advance(self):
+        """Avance d'un tick et retourne les minuteries échues."""
+        self.tick += 1
+        if self.tick % 3600 == 0:
+            overflow, self._overflow = self._overflow, []
+            for timer in overflow:
+                self._place(timer)
+            self._cascade(2)
+        if self.tick % 60 == 0:
+            self._cascade(1)
+
+        bucket, self._wheels[0][self.tick % 60] = self._wheels[0][self.tick % 60], []
+        due = []
+        for timer in bucket:
+            if timer.cancelled:
+                self.active -= 1
+            elif timer.expires <= self.tick:
+                self.active -= 1
+                due.append(timer)
+            else:
+                self._place(timer)
+        return due
+
+
+class DailyJob:
+    """Tâche exécutée chaque jour à heure fixe (heure WAT)."""
+
+    def __init__(self, name: str, hour: int, minute: int, callback):
+        self.name = name
+        self.hour = hour
+        self.minute = minute
+        self.callback = callback
+        self.last_run_date = None
+        self.next_run = None
+
+    def compute_next(self, now: datetime):
+        target = now.replace(hour=self.hour, minute=self.minute, second=0, microsecond=0)
+        if now >= target or self.last_run_date == target.date():
+            target += timedelta(days=1)
+        self.next_run = target
+
+
+class Scheduler:
+    """Boucle de tick supervisée qui pilote la roue et les tâches quotidiennes."""
+
+    def __init__(self, tz=WAT_TZ, clock=None):
+        self.tz = tz
+        self.clock = clock or SystemClock()
+        self.wheel = TimerWheel()
+        self.daily_jobs = []
+        self.stats = {}
+        self.restarts = 0
+        self.clock_jumps = 0
+        self.last_error = None
+        self.last_tick_at = None
+        self._task = None
+        self._pending_tasks = set()
+        self._mono_start = None
+        self._last_clocks = None   # (monotone, murale) du tick précédent
+
+    # --- Planification ---
+
+    def call_later(self, delay: float, callback, *args, name: str = '') -> Timer:
+        """Planifie callback(*args) dans `delay` secondes (fonction ou coroutine)."""
+        return self.wheel.schedule(delay, callback, *args, name=name)
+
+    def run_now(self, callback, *args, name: str = ''):
+        """
+        Exécute callback(*args) tout de suite sous supervision: la tâche d'une coroutine est
+        conservée jusqu'à sa fin et ses erreurs sont journalisées et comptées dans health().
+        """
+        self._run_callback(name, callback, args)
+
+    def add_daily(self, name: str, hour: int, minute: int, callback):
+        job = DailyJob(name, hour, minute, callback)
+        job.compute_next(self.clock.now(self.tz))
+        self.daily_jobs.append(job)
+        logger.info("Tâche quotidienne '%s' planifiée: prochaine exécution %s", name,
+                    job.next_run.strftime('%Y-%m-%d %H:%M'))
+        return job
+
+    # --- Exécution ---
+
+    def _record(self, name: str, error: Exception = None):
+        entry = self.stats.setdefault(name, {'runs': 0, 'failures': 0, 'last_error': None, 'last_run': None})
+        entry['runs'] += 1
+        entry['last_run'] = self.clock.now(self.tz).isoformat(timespec='seconds')
+        if error is not None:
+            entry['failures'] += 1
+            entry['last_error'] = repr(error)
+
+    def _run_callback(self, name: str, callback, args=()):
+        try:
+            result = callback(*args)
+        except Exception as e:
+            logger.error("Tâche planifiée '%s' en erreur: %s", name, e)
+            self._record(name, e)
+            return
+        if asyncio.iscoroutine(result):
+            task = asyncio.ensure_future(result)
+            self._pending_tasks.add(task)
+            task.add_done_callback(lambda t: self._on_task_done(name, t))
+        else:
+            self._record(name)
+
+    def _on_task_done(self, name: str, task: asyncio.Task):
+        self._pending_tasks.discard(task)
+        if task.cancelled():
+            self._record(name, asyncio.CancelledError())
+            return
+        error = task.exception()
+        if error is not None:
+            logger.error("Tâche planifiée '%s' en erreur: %s", name, error)
+        self._record(name, error)
+
+    def _run_daily_jobs(self, now: datetime):
+        for job in self.daily_jobs:
+            if job.next_run is not None and now >= job.next_run:
+                job.last_run_date = job.next_run.date()
+                job.compute_next(now)
+                self._run_callback(job.name, job.callback)
+
+    def tick(self):
+        """Exécute les minuteries échues et les tâches quotidiennes dues à l'instant de l'horloge."""
+        mono = self.clock.monotonic()
+        wall = self.clock.now(self.tz)
+        if self._mono_start is None:
+            self._mono_start = mono
+        if self._last_clocks is not None:
+            last_mono, last_wall = self._last_clocks
+            drift = (wall - last_wall).total_seconds() - (mono - last_mono)
+            if abs(drift) > CLOCK_JUMP_TOLERANCE:
+                self.clock_jumps += 1
+                logger.warning("Saut d'horloge détecté (%+.0fs), replanification des tâches quotidiennes", drift)
+                for job in self.daily_jobs:
+                    job.compute_next(wall)
+        self._last_clocks = (mono, wall)
+
+        # Rattrapage si la boucle a été bloquée plusieurs secondes
+        target_tick = int((mono - self._mono_start) / TICK_SECONDS)
+        while self.wheel.tick < target_tick:
+            for timer in self.wheel.advance():
+                self._run_callback(timer.name, timer.callback, timer.args)
+
+        self._run_daily_jobs(wall)
+        self.last_tick_at = wall
+
+    async def _run(self):
+        if self._mono_start is None:
+            self._mono_start = self.clock.monotonic()
+        while True:
+            await asyncio.sleep(TICK_SECONDS - ((self.clock.monotonic() - self._mono_start) % TICK_SECONDS))
+            self.tick()
+
+    async def _supervise(self):
+        backoff = 1.0
+        while True:
+            try:
+                await self._run()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.restarts += 1
+                self.last_error = repr(e)
+                logger.error("Planificateur arrêté sur erreur (%s), relance dans %.0fs", e, backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, RESTART_BACKOFF_MAX)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._supervise())
+        return self._task
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    # --- Observabilité ---
+
+    def health(self) -> dict:
+        now = self.clock.now(self.tz)
+        lag = (now - self.last_tick_at).total_seconds() if self.last_tick_at else None
+        return {
+            'running': self._task is not None and not self._task.done(),
+            'last_tick_age': lag,
+            'restarts': self.restarts,
+            'last_error': self.last_error,
+            'clock_jumps': self.clock_jumps,
+            'active_timers': self.wheel.active,
+            'daily_jobs': {
+                job.name: job.next_run.strftime('%Y-%m-%d %H:%M') if job.next_run else None
+                for job in self.daily_jobs
+            },
+            'jobs': self.stats,
+        }
@@ -0,0 +1,222 @@
+"""
+Pool d'expéditeurs: bots supplémentaires (SENDER_BOT_TOKENS) qui se partagent les envois et
+les éditions dans les canaux de prédiction, chacun sous ses propres limites Telegram.
+Le client principal reste seul à lire les canaux sources et les commandes; il fait aussi
+partie du pool.
+- Envoi: expéditeur disponible suivant (tourniquet). Un FloodWait met l'expéditeur en
+  pause et l'envoi repart aussitôt sur un autre; si tous sont en pause, attente du
+  premier libre (au plus max_wait secondes). Un expéditeur sans accès au canal (bot non
+  administrateur d'un canal ajouté après le démarrage) en est écarté et l'envoi repart
+  sur un autre
+- Édition: toujours par l'expéditeur du message (un bot ne peut éditer que ses propres
+  messages). Propriétaire inconnu (message repris au redémarrage): chaque expéditeur à tour
+  de rôle, le premier accepté est mémorisé
+Client de substitution en mémoire pour les vérifications sans Telegram: benchmarks/local_client.py
+"""
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Erreurs Telegram d'une édition par un bot qui n'est pas l'auteur du message (nom de la classe Telethon)
+OWNER_ERRORS = frozenset({'MessageAuthorRequiredError', 'MessageIdInvalidError'})
+
+# Erreurs Telegram d'un envoi par un bot sans accès au canal (nom de la classe Telethon)
+ACCESS_ERRORS = frozenset({'ChatWriteForbiddenError', 'ChatAdminRequiredError', 'ChannelPrivateError',
+                           'UserBannedInChannelError', 'PeerIdInvalidError'})
+
+MAX_TRACKED_MESSAGES = 10_000   # Messages dont l'expéditeur est mémorisé (les plus anciens oubliés)
+OWNER_ENTRY_BYTES = 200         # Empreinte estimée d'une entrée (clé (chat, id), nœud de l'OrderedDict)
+
+
+class SendersPaused(Exception):
+    """Tous les expéditeurs sont en FloodWait pour plus de max_wait secondes."""
+
+    def __init__(self, seconds: float):
+        super().__init__(f"Tous les expéditeurs en pause pour {seconds:.0f}s")
+        self.seconds = math.ceil(seconds)
+
+
+class NoSenderAccess(Exception):
+    """Aucun expéditeur du pool n'a accès au canal."""
+
+    def __init__(self, entity):
+        super().__init__(f"Aucun expéditeur n'a accès au canal {entity}")
+        self.entity = entity
+
+
+class Sender:
+    """Un client d'envoi du pool et ses compteurs."""
+
+    __slots__ = ('name', 'client', 'paused_until', 'denied', 'stats')
+
+    def __init__(self, name: str, client):
+        self.name = name
+        self.client = client
+        self.paused_until = 0.0     # Fin du FloodWait imposé par Telegram (horloge monotone)
+        self.denied = set()         # Canaux refusés à cet expéditeur (ACCESS_ERRORS)
+        self.stats = {'sent': 0, 'edited': 0, 'flood_waits': 0, 'failed': 0}
+
+
+class SenderPool:
+    """
+    Répartit send_message/edit_message (mêmes signatures que Telethon) entre plusieurs clients.
+    senders: liste de (nom, client), le client principal en premier.
+    """
+
+    def __init__(self, senders, max_wait: float = 30.0, max_tracked: int = MAX_TRACKED_MESSAGES, clock=None):
+        self.senders = [Sender(name, client) for name, client in senders]
+        self.max_wait = max_wait
+        self.max_tracked = max_tracked
+        self.clock = clock or time.monotonic
+        self._next = 0
+        self._owners = OrderedDict()    # (chat, message_id) -> Sender, du moins au plus récemment utilisé
+        self.stats = {'failovers': 0, 'access_failovers': 0, 'unknown_owner': 0}
+
+    def __len__(self) -> int:
+        return len(self.senders)
+
+    # --- Expéditeurs ---
+
+    def _pick(self, now: float, entity=None):
+        """Expéditeur disponible suivant (tourniquet) ayant accès au canal, None si tous sont en pause."""
+        count = len(self.senders)
+        for i in range(count):
+            sender = self.senders[(self._next + i) % count]
+            if sender.paused_until <= now and entity not in sender.denied:
+                self._next = (self._next + i + 1) % count
+                return sender
+        return None
+
+    def _pause(self, sender: Sender, seconds: float):
+        sender.paused_until = max(sender.paused_until, self.clock() + seconds)
+        sender.stats['flood_waits'] += 1
+        logger.warning("⏳ Expéditeur %s: FloodWait de %ss", sender.name, seconds)
+
+    async def _wait(self, until: float):
+        """Attend la fin d'une pause, SendersPaused si elle dépasse max_wait."""
+        delay = until - self.clock()
+        if delay > self.max_wait:
+            raise SendersPaused(delay)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _remember(self, chat, message_id: int, sender: Sender):
+        owners = self._owners
+        owners[(chat, message_id)] = sender
+        owners.move_to_end((chat, message_id))
+        while len(owners) > self.max_tracked:
+            owners.popitem(last=False)
+
+    def owner(self, chat, message_id: int):
+        """Expéditeur d'un message publié par le pool, None s'il est inconnu."""
+        return self._owners.get((chat, message_id))
+
+    # --- Envois ---
+
+    def reset_access(self, entity):
+        """Oublie les refus d'accès à un canal (droits accordés depuis): chaque expéditeur y sera réessayé."""
+        for sender in self.senders:
+            sender.denied.discard(entity)
+
+    async def send_message(self, entity, message, **kwargs):
+        error = None
+        while True:
+            allowed = [s for s in self.senders if entity not in s.denied]
+            if not allowed:
+                raise error or NoSenderAccess(entity)
+            sender = self._pick(self.clock(), entity)
+            if sender is None:
+                await self._wait(min(s.paused_until for s in allowed))
+                continue
+            try:
+                sent = await sender.client.send_message(entity, message, **kwargs)
+            except Exception as e:
+                seconds = getattr(e, 'seconds', None)
+                if seconds is None:
+                    sender.stats['failed'] += 1
+                    if type(e).__name__ not in ACCESS_ERRORS:
+                        raise
+                    sender.denied.add(entity)
+                    self.stats['access_failovers'] += 1
+                    logger.warning("🚫 Expéditeur %s sans accès au canal %s: %s", sender.name, entity, e)
+                    error = e
+                    continue
+                self._pause(sender, seconds)
+                self.stats['failovers'] += 1
+                continue
+            sender.stats['sent'] += 1
+            self._remember(entity, sent.id, sender)
+            return sent
+
+    async def _edit(self, sender: Sender, entity, message_id: int, text, kwargs):
+        """Édition par un expéditeur donné: en FloodWait, on attend (pas de bascule possible)."""
+        while True:
+            await self._wait(sender.paused_until)
+            try:
+                result = await sender.client.edit_message(entity, message_id, text, **kwargs)
+            except Exception as e:
+                seconds = getattr(e, 'seconds', None)
+                if seconds is None:
+                    raise
+                self._pause(sender, seconds)
+                continue
+            sender.stats['edited'] += 1
+            return result
+
+    async def edit_message(self, entity, message_id: int, text, **kwargs):
+        sender = self._owners.get((entity, message_id))
+        if sender is not None:
+            self._owners.move_to_end((entity, message_id))
+            try:
+                return await self._edit(sender, entity, message_id, text, kwargs)
+            except Exception:
+                sender.stats['failed'] += 1
+                raise
+
+        # Propriétaire inconnu: chaque expéditeur à tour de rôle
+        self.stats['unknown_owner'] += 1
+        error = None
+        for sender in self.senders:
+            try:
+                result = await self._edit(sender, entity, message_id, text, kwargs)
+            except Exception as e:
+                if type(e).__name__ not in OWNER_ERRORS:
+                    sender.stats['failed'] += 1
+                    raise
+                error = e
+                continue
+            self._remember(entity, message_id, sender)
+            return result
+        raise error
+
+    # --- Mémoire ---
+
+    def footprint(self) -> int:
+        return len(self._owners) * OWNER_ENTRY_BYTES
+
+    def trim(self, nbytes: int) -> int:
+        """
+        Oublie les expéditeurs des messages les moins récemment utilisés (leur édition
+        essaiera chaque expéditeur). Retourne les octets libérés.
+        """
+        count = min(len(self._owners), -(-nbytes // OWNER_ENTRY_BYTES))
+        for _ in range(count):
+            self._owners.popitem(last=False)
+        return count * OWNER_ENTRY_BYTES
+
+    # --- Statistiques ---
+
+    def status(self) -> dict:
+        now = self.clock()
+        return {
+            'senders': [{'name': s.name, 'paused': max(0.0, round(s.paused_until - now, 1)), 'denied': len(s.denied),
+                         **s.stats}
+                        for s in self.senders],
+            'tracked': len(self._owners),
+            **self.stats,
+        }
+
@@ -0,0 +1,138 @@
+"""
+Modèle d'état compact du moteur de prédiction.
+- Prediction: une prédiction en cours (__slots__, couleur en petit entier, statut enum)
+- EngineState: tout l'état mutable du moteur (paramètres, cycle, prédictions actives)
+"""
+from enum import IntEnum
+
+from config import (
+    SUIT_DISPLAY, VERIFICATION_EMOJIS,
+    DEFAULT_K, DEFAULT_A, DEFAULT_R,
+)
+from game_cycle import GameCycle, SUIT_CODES, CODE_SUITS
+
+
+class PredictionStatus(IntEnum):
+    PENDING = 0   # ⏳ en attente de vérification
+    WON = 1       # ✅ couleur trouvée à N+check_count
+    LOST = 2      # ❌ aucun essai réussi
+    EXPIRED = 3   # ❌ jeux de vérification jamais reçus
+    UNVERIFIABLE = 4   # ❔ jeux passés pendant une interruption (reprise au redémarrage)
+
+
+class Prediction:
+    """Prédiction en cours pour un jeu cible."""
+
+    __slots__ = ('game', 'suit_code', 'status', 'check_count', 'max_checks',
+                 'message_id', 'day', 'created_at', 'expiry_timer')
+
+    def __init__(self, game: int, suit: str, max_checks: int, message_id: int = 0, day: str = None, *,
+                 created_at: float):
+        self.game = game
+        self.suit_code = SUIT_CODES[suit]
+        self.status = PredictionStatus.PENDING
+        self.check_count = 0
+        self.max_checks = max_checks
+        self.message_id = message_id
+        self.day = day
+        self.created_at = created_at       # Horloge de l'appelant (virtuelle en simulation)
+        self.expiry_timer = None
+
+    @property
+    def suit(self) -> str:
+        return CODE_SUITS[self.suit_code]
+
+    @property
+    def suit_display(self) -> str:
+        return SUIT_DISPLAY[self.suit]
+
+    @property
+    def status_text(self) -> str:
+        """Statut affiché dans le canal de prédiction."""
+        if self.status == PredictionStatus.PENDING:
+            return '⏳'
+        if self.status == PredictionStatus.WON:
+            return VERIFICATION_EMOJIS.get(self.check_count, f"✅{self.check_count}️⃣")
+        if self.status == PredictionStatus.UNVERIFIABLE:
+            return '❔'
+        return '❌'
+
+    @property
+    def is_final(self) -> bool:
+        return self.status != PredictionStatus.PENDING
+
+    def cancel_expiry(self):
+        if self.expiry_timer is not None:
+            self.expiry_timer.cancel()
+            self.expiry_timer = None
+
+    def __repr__(self):
+        return f"Prediction(#{self.game} {self.suit} {self.status.name} {self.check_count}/{self.max_checks})"
+
+
+class EngineState:
+    """État mutable du moteur: paramètres configurables, cycle et prédictions actives."""
+
+    __slots__ = ('pending_predictions', 'processed_messages', 'current_game_number', 'latest_game', 'last_predicted_game', 'waiting',
+                 'game_cycle', 'k_position', 'a_offset', 'r_offset', 'ecart_list', 'ecart_index',
+                 'intelligent_mode', 'admin_notifications', 'last_prediction_message_id')
+
+    # Champs persistés dans bot_config.json (nom -> valeur par défaut)
+    CONFIG_FIELDS = {
+        'k_position': DEFAULT_K,
+        'a_offset': DEFAULT_A,
+        'r_offset': DEFAULT_R,
+        'ecart_list': [],
+        'ecart_index': 0,
+        'last_predicted_game': 0,
+        'intelligent_mode': False,
+        'admin_notifications': True,
+        'last_prediction_message_id': 0,
+    }
+
+    def __init__(self):
+        self.pending_predictions = {}      # jeu cible -> Prediction
+        self.waiting = {}                  # jeu attendu (N+check_count) -> jeux cibles des prédictions qui l'attendent
+        self.processed_messages = set()
+        self.current_game_number = 0
+        self.latest_game = {}              # source -> jeu finalisé le plus récent reçu de cette source
+        self.last_predicted_game = 0
+        self.game_cycle = GameCycle()      # Résultats et prédictions du cycle courant (1 à MAX_GAME_NUMBER)
+        self.k_position = DEFAULT_K        # Position de la carte à utiliser (1, 2, 3...)
+        self.a_offset = DEFAULT_A          # Offset pour la prédiction (N+a)
+        self.r_offset = DEFAULT_R          # Nombre d'essais de vérification (0 à 10)
+        self.ecart_list = []               # Liste des écarts personnalisés
+        self.ecart_index = 0               # Index actuel dans la liste des écarts
+        self.intelligent_mode = False      # Mode intelligent: prédit la carte exacte à position k
+        self.admin_notifications = True    # Envoyer les notifications au chat privé admin
+        self.last_prediction_message_id = 0  # Dernier message publié (reprise au démarrage)
+
+    def to_config(self) -> dict:
+        return {name: getattr(self, name) for name in self.CONFIG_FIELDS}
+
+    def apply_config(self, config: dict):
+        for name, default in self.CONFIG_FIELDS.items():
+            value = config.get(name, default)
+            setattr(self, name, list(value) if isinstance(default, list) else value)
+
+    def clear_pending(self):
+        """Vide les prédictions actives et annule leurs minuteries d'expiration."""
+        for pred in self.pending_predictions.values():
+            pred.cancel_expiry()
+        self.pending_predictions.clear()
+        self.waiting.clear()
+
+    def reset_cycle(self):
+        """Remise à zéro pour un nouveau cycle de jeux (reset quotidien)."""
+        self.clear_pending()
+        self.processed_messages.clear()
+        self.game_cycle.reset()
+        self.current_game_number = 0
+        self.latest_game.clear()
+        self.last_predicted_game = 0
+        self.ecart_index = 0
+
+    def reset_all(self):
+        """Reset complet: cycle et paramètres par défaut."""
+        self.reset_cycle()
+        self.apply_config({})
@@ -0,0 +1,226 @@
+"""
+Abonnés aux notifications privées (prédictions et résultats).
+- SubscriberStore: abonnés persistés dans une base SQLite locale (/subscribe, /unsubscribe)
+- FanOut: diffusion en tâche de fond. Chaque notification est rendue une seule fois puis
+  livrée par lots d'une seconde sous la limite globale de Telegram (~30 messages/s) et
+  la limite par chat (1 message/s). notify() ne fait que mettre en file: le traitement
+  des canaux sources n'attend jamais les envois, même avec des milliers d'abonnés.
+- Les abonnés qui ont bloqué le bot (ou supprimé leur compte) sont retirés automatiquement.
+"""
+import asyncio
+import logging
+import sqlite3
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS subscribers (
+    chat_id INTEGER PRIMARY KEY,
+    subscribed_at REAL NOT NULL
+);
+"""
+
+# Erreurs Telegram définitives: l'abonné ne recevra plus jamais de message (nom de la classe Telethon)
+BLOCKED_ERRORS = frozenset({
+    'UserIsBlockedError',           # Le bot a été bloqué
+    'InputUserDeactivatedError',    # Compte supprimé
+    'UserDeactivatedError',
+    'UserDeactivatedBanError',
+    'PeerIdInvalidError',           # Chat inconnu du bot
+    'ChatWriteForbiddenError',
+})
+
+THROUGHPUT_WINDOW = 60.0   # Fenêtre (s) du débit de livraison affiché
+PENDING_ENTRY_BYTES = 80   # Empreinte estimée d'une livraison en file (tuple + chat_id; texte partagé)
+
+
+class SubscriberStore:
+    """Abonnés persistés dans SQLite, avec une copie en mémoire pour la diffusion."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db = sqlite3.connect(path, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._ids = {row[0] for row in self._db.execute("SELECT chat_id FROM subscribers")}
+
+    def add(self, chat_id: int) -> bool:
+        """Abonne un chat. False s'il l'était déjà."""
+        if chat_id in self._ids:
+            return False
+        self._db.execute("INSERT OR IGNORE INTO subscribers (chat_id, subscribed_at) VALUES (?, ?)",
+                         (chat_id, time.time()))
+        self._ids.add(chat_id)
+        return True
+
+    def remove(self, chat_id: int) -> bool:
+        """Désabonne un chat. False s'il ne l'était pas."""
+        if chat_id not in self._ids:
+            return False
+        self._db.execute("DELETE FROM subscribers WHERE chat_id = ?", (chat_id,))
+        self._ids.discard(chat_id)
+        return True
+
+    def __contains__(self, chat_id: int) -> bool:
+        return chat_id in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def chat_ids(self) -> list:
+        """Instantané des abonnés (la diffusion en cours n'est pas affectée par les (dés)abonnements)."""
+        return list(self._ids)
+
+    def close(self):
+        self._db.close()
+
+
+class FanOut:
+    """
+    File de livraison des notifications aux abonnés.
+    send(chat_id, text) est la coroutine d'envoi (client.send_message en production).
+    """
+
+    def __init__(self, store: SubscriberStore, send, global_rate: int = 25, per_chat_interval: float = 1.0,
+                 max_pending: int = 100_000):
+        self.store = store
+        self.send = send
+        self.global_rate = max(1, global_rate)
+        self.per_chat_interval = per_chat_interval
+        self.max_pending = max_pending
+        self._pending = deque()     # (chat_id, texte): le texte est partagé par toutes les livraisons d'une notification
+        self._next_allowed = {}     # chat_id -> instant monotone du prochain envoi permis
+        self._wakeup = asyncio.Event()
+        self._paused_until = 0.0    # FloodWait global imposé par Telegram
+        self._task = None
+        self._delivered_at = deque()
+        self.stats = {'notifications': 0, 'delivered': 0, 'failed': 0, 'removed': 0, 'dropped': 0, 'flood_waits': 0}
+
+    # --- Mise en file ---
+
+    def notify(self, text: str) -> int:
+        """Met en file une notification pour tous les abonnés, sans attendre. Retourne le nombre de livraisons."""
+        chat_ids = self.store.chat_ids()
+        if not chat_ids:
+            return 0
+        if len(self._pending) + len(chat_ids) > self.max_pending:
+            self.stats['dropped'] += len(chat_ids)
+            logger.warning("📭 File de diffusion pleine (%s en attente): notification abandonnée", len(self._pending))
+            return 0
+        self._pending.extend((chat_id, text) for chat_id in chat_ids)
+        self.stats['notifications'] += 1
+        self._wakeup.set()
+        return len(chat_ids)
+
+    # --- Livraison ---
+
+    def _next_batch(self, now: float) -> list:
+        """
+        Jusqu'à global_rate livraisons vers des chats distincts et disponibles, dans l'ordre de la file.
+        Les livraisons vers un chat encore limité restent en tête de file.
+        """
+        batch, deferred, chats = [], [], set()
+        pending = self._pending
+        while pending and len(batch) < self.global_rate:
+            delivery = pending.popleft()
+            chat_id = delivery[0]
+            if chat_id in chats or self._next_allowed.get(chat_id, 0.0) > now:
+                deferred.append(delivery)
+                if len(deferred) >= self.global_rate * 4:
+                    break       # Tête de file bloquée par quelques chats: on attend la fenêtre suivante
+                continue
+            chats.add(chat_id)
+            batch.append(delivery)
+        pending.extendleft(reversed(deferred))
+        return batch
+
+    async def _deliver(self, chat_id: int, text: str):
+        try:
+            await self.send(chat_id, text)
+        except Exception as e:
+            name = type(e).__name__
+            if name in BLOCKED_ERRORS:
+                if self.store.remove(chat_id):
+                    self._next_allowed.pop(chat_id, None)
+                    self.stats['removed'] += 1
+                    logger.info("🚫 Abonné %s retiré (%s)", chat_id, name)
+                return
+            seconds = getattr(e, 'seconds', None)
+            if seconds is not None:
+                # FloodWait: pause globale puis nouvel essai de cette livraison
+                self.stats['flood_waits'] += 1
+                self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+                self._pending.appendleft((chat_id, text))
+                logger.warning("⏳ Diffusion: FloodWait de %ss imposé par Telegram", seconds)
+                return
+            self.stats['failed'] += 1
+            logger.error("Erreur livraison à l'abonné %s: %s", chat_id, e)
+            return
+        now = time.monotonic()
+        self._next_allowed[chat_id] = now + self.per_chat_interval
+        self._delivered_at.append(now)
+        self._prune_deliveries(now)
+        self.stats['delivered'] += 1
+
+    async def _run(self):
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue
+
+            window_start = time.monotonic()
+            batch = self._next_batch(window_start)
+            if batch:
+                await asyncio.gather(*(self._deliver(chat_id, text) for chat_id, text in batch))
+            # Une fenêtre d'une seconde par lot: au plus global_rate envois par seconde
+            await asyncio.sleep(max(0.0, 1.0 - (time.monotonic() - window_start)))
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(), name='fanout')
+        return self._task
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # --- Statistiques ---
+
+    def _prune_deliveries(self, now: float):
+        delivered_at = self._delivered_at
+        while delivered_at and delivered_at[0] < now - THROUGHPUT_WINDOW:
+            delivered_at.popleft()
+
+    def footprint(self) -> int:
+        """Empreinte estimée de la file de livraison (octets)."""
+        return len(self._pending) * PENDING_ENTRY_BYTES
+
+    def throughput(self) -> float:
+        """Livraisons par seconde sur la dernière minute."""
+        now = time.monotonic()
+        self._prune_deliveries(now)
+        delivered_at = self._delivered_at
+        if not delivered_at:
+            return 0.0
+        return len(delivered_at) / min(THROUGHPUT_WINDOW, max(1.0, now - delivered_at[0]))
+
+    def status(self) -> dict:
+        return {
+            'subscribers': len(self.store),
+            'pending': len(self._pending),
+            'per_second': round(self.throughput(), 1),
+            'running': self._task is not None and not self._task.done(),
+            **self.stats,
+        }
@@ -0,0 +1,63 @@
+from datetime import datetime
+
+from clock import VirtualClock
+from engine import Prediction, PredictionEngine, PredictionStatus, WAT_TZ
+from game_cycle import suits_mask
+
+
+def make_engine():
+    return PredictionEngine(clock=VirtualClock(datetime(2026, 1, 1, 10, 0, tzinfo=WAT_TZ)))
+
+
+def test_reset_cycle_clears_latest_game_watermark():
+    engine = make_engine()
+    engine.ingest(1, [(700, 'K♥️5♣️', None)])
+    assert engine.state.latest_game == {1: 700}
+
+    engine.state.reset_cycle()
+    assert engine.state.latest_game == {}
+
+    decisions = []
+    for game in (1, 2, 300):
+        _, decision = engine.ingest(1, [(game, 'K♥️5♣️', None)])
+        decisions.append(decision)
+    assert engine.shed['stale_targets'] == 0
+    assert decisions[0] is not None and decisions[0].target_game == 1
+    assert decisions[2] is not None and decisions[2].target_game == 300
+
+
+def test_stale_target_shed_before_reset():
+    engine = make_engine()
+    engine.state.a_offset = 0
+    engine.ingest(1, [(700, 'K♥️5♣️', None)])
+    assert engine.decide(650, 'K♥️5♣️') is None
+    assert engine.shed['stale_targets'] == 1
+
+
+def test_check_game_uses_waiting_index():
+    engine = make_engine()
+    engine.add_prediction(Prediction(10, '♦', 2, created_at=engine.clock.time()))
+    assert engine.state.waiting == {10: {10}}
+    assert engine.check_game(9) == []
+
+    engine.record_results(1, [(10, 'K♠️5♣️')])
+    assert engine.state.waiting == {11: {10}}
+
+    finalized = engine.record_results(1, [(11, 'K♦️5♣️')])
+    assert [pred.game for pred in finalized] == [10]
+    assert finalized[0].status == PredictionStatus.WON
+    assert engine.state.waiting == {}
+
+
+def test_conflicting_priority_result_does_not_reopen_closed_prediction():
+    engine = make_engine()
+    engine.state.r_offset = 0
+    engine.add_prediction(Prediction(11, '♥', 1, created_at=engine.clock.time()))
+
+    [lost] = engine.record_results(1, [(11, 'K♠️5♣️')])
+    assert lost.status == PredictionStatus.LOST
+
+    # Source 2 (prioritaire par défaut) contredit: le cache est corrigé, la clôture reste
+    assert engine.record_results(2, [(11, 'K♥️5♣️')]) == []
+    assert lost.status == PredictionStatus.LOST
+    assert engine.state.game_cycle.result_mask(11) == suits_mask('K♥️5♣️')
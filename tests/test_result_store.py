@@ -0,0 +1,25 @@
+import asyncio
+
+from result_store import ResultStore
+
+
+def prediction_row(status: str):
+    return ('2026-01-01', 10, '♦', status, '⏳', 0, 2, 5, '2026-01-01T10:00:00', None, '')
+
+
+def test_writer_keeps_submission_order(tmp_path):
+    store = ResultStore(str(tmp_path / 'results.db'))
+
+    async def run():
+        store.start()
+        store.submit_results([('2026-01-01', 9, 1, 'K♥️5♣️', 2, '2026-01-01T10:00:00+01:00')])
+        store.submit_prediction(prediction_row('pending'))
+        store.submit_prediction(prediction_row('won'))
+        await store.stop()
+
+    asyncio.run(run())
+    assert store.count() == 1
+    assert store.last_game('2026-01-01') == 9
+    [[row]] = list(store.prediction_chunks())
+    assert row[3] == 'won'
+    store.close()
@@ -0,0 +1,122 @@
+import asyncio
+from datetime import datetime
+
+import scheduler
+from clock import VirtualClock
+from scheduler import Scheduler, WAT_TZ
+
+
+def make_scheduler(start=datetime(2026, 1, 1, 10, 0, tzinfo=WAT_TZ)):
+    clock = VirtualClock(start)
+    sched = Scheduler(WAT_TZ, clock=clock)
+    sched.tick()
+    return sched, clock
+
+
+def run_for(sched, clock, seconds, step=1):
+    for _ in range(int(seconds // step)):
+        clock.advance(step)
+        sched.tick()
+
+
+def test_call_later_fires_on_time_across_wheel_levels():
+    sched, clock = make_scheduler()
+    fired = {}
+
+    def record(name):
+        fired[name] = sched.wheel.tick
+
+    # Secondes, minutes, heures, puis débordement au-delà de 24h
+    delays = {'secondes': 5, 'minutes': 125, 'heures': 7322, 'debordement': 2 * 86400 + 17}
+    for name, delay in delays.items():
+        sched.call_later(delay, record, name, name=name)
+    assert sched.wheel.active == 4
+
+    run_for(sched, clock, 2 * 86400 + 60, step=7)
+    assert fired == delays
+    assert sched.wheel.active == 0
+    assert sched.stats['heures']['runs'] == 1
+
+
+def test_cancelled_timer_never_fires_at_any_level():
+    sched, clock = make_scheduler()
+    fired = []
+    timers = [sched.call_later(delay, fired.append, delay) for delay in (3, 600, 5 * 3600, 30 * 3600)]
+    kept = sched.call_later(601, fired.append, 601)
+    for timer in timers:
+        timer.cancel()
+
+    run_for(sched, clock, 31 * 3600, step=60)
+    assert fired == [601]
+    assert not kept.cancelled
+    assert sched.wheel.active == 0
+
+
+def test_daily_job_runs_once_per_day():
+    sched, clock = make_scheduler(datetime(2026, 1, 1, 0, 30, tzinfo=WAT_TZ))
+    runs = []
+    sched.add_daily('reset', 0, 59, lambda: runs.append(clock.now(WAT_TZ).date()))
+
+    # Trois jours de ticks réguliers, puis un retour de l'heure murale à la veille au soir:
+    # la tâche du 3 n'est pas rejouée et celle du 4 s'exécute une seule fois
+    run_for(sched, clock, 3 * 86400, step=30)
+    assert [day.day for day in runs] == [1, 2, 3]
+
+    clock.advance(60)
+    sched.tick()
+    clock.set(datetime(2026, 1, 3, 23, 0, tzinfo=WAT_TZ))
+    sched.tick()
+    run_for(sched, clock, 3 * 3600, step=30)
+    assert [day.day for day in runs] == [1, 2, 3, 4]
+    assert sched.clock_jumps == 1
+    assert sched.stats['reset']['runs'] == 4
+    assert sched.stats['reset']['failures'] == 0
+
+
+def test_failing_callback_is_recorded_without_stopping_the_wheel():
+    sched, clock = make_scheduler()
+    fired = []
+
+    def boom():
+        raise RuntimeError('envoi impossible')
+
+    sched.call_later(2, boom, name='boom')
+    sched.call_later(3, fired.append, 'suivante', name='suivante')
+    run_for(sched, clock, 5)
+
+    assert fired == ['suivante']
+    assert sched.stats['boom']['failures'] == 1
+    assert 'envoi impossible' in sched.stats['boom']['last_error']
+    assert sched.health()['jobs']['suivante']['failures'] == 0
+
+
+def test_supervisor_restarts_loop_after_tick_raises(monkeypatch):
+    sched, clock = make_scheduler()
+    real_sleep = asyncio.sleep
+    # Ticks et délai de relance réduits à un passage de boucle
+    monkeypatch.setattr(scheduler.asyncio, 'sleep', lambda delay: real_sleep(0))
+    calls = []
+    real_tick = sched.tick
+
+    def flaky_tick():
+        calls.append(clock.monotonic())
+        if len(calls) == 1:
+            raise RuntimeError('tick cassé')
+        clock.advance(1)
+        real_tick()
+
+    sched.tick = flaky_tick
+
+    async def run():
+        sched.start()
+        while len(calls) < 3:
+            await real_sleep(0)
+        health = sched.health()
+        await sched.stop()
+        return health
+
+    health = asyncio.run(run())
+    assert health['running']
+    assert health['restarts'] == 1
+    assert 'tick cassé' in health['last_error']
+    assert sched.health()['running'] is False
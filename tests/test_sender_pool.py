@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from benchmarks.local_client import ChatWriteForbiddenError, LocalClient, LocalNetwork
+from sender_pool import SenderPool
+
+CHANNEL = -100
+
+
+def test_flood_wait_fails_over_and_owner_stays_sticky():
+    now = [0.0]
+    clock = lambda: now[0]  # noqa: E731
+    network = LocalNetwork()
+    bot0 = LocalClient('bot0', network, rate=1, period=60, clock=clock)
+    bot1 = LocalClient('bot1', network, rate=1, period=60, clock=clock)
+    pool = SenderPool([('bot0', bot0), ('bot1', bot1)], clock=clock)
+
+    async def run():
+        await bot0.send_message(CHANNEL, 'quota bot0 épuisé')
+
+        sent = await pool.send_message(CHANNEL, 'prédiction ⏳')
+        assert sent.author == 'bot1'
+        assert pool.stats['failovers'] == 1
+        assert pool.owner(CHANNEL, sent.id).name == 'bot1'
+
+        # Fin du FloodWait de bot0: l'édition reste à l'auteur du message
+        now[0] = 61.0
+        calls_bot0 = bot0.calls
+        await pool.edit_message(CHANNEL, sent.id, 'prédiction ✅')
+        assert network.messages[(CHANNEL, sent.id)].text == 'prédiction ✅'
+        assert bot0.calls == calls_bot0
+        assert pool.stats['unknown_owner'] == 0
+        assert pool.owner(CHANNEL, sent.id).name == 'bot1'
+
+    asyncio.run(run())
+
+
+def test_channel_without_access_fails_over_to_another_bot():
+    network = LocalNetwork()
+    bot0 = LocalClient('bot0', network, denied={CHANNEL})
+    bot1 = LocalClient('bot1', network)
+    pool = SenderPool([('bot0', bot0), ('bot1', bot1)])
+
+    async def run():
+        first = await pool.send_message(CHANNEL, 'prédiction 1')
+        second = await pool.send_message(CHANNEL, 'prédiction 2')
+        assert (first.author, second.author) == ('bot1', 'bot1')
+        assert pool.stats['access_failovers'] == 1
+        assert bot0.calls == 0
+
+        # Canal refusé à tous: l'erreur d'accès remonte au lieu de perdre l'envoi en silence
+        bot1.denied.add(-200)
+        bot0.denied.add(-200)
+        with pytest.raises(ChatWriteForbiddenError):
+            await pool.send_message(-200, 'prédiction 3')
+
+    asyncio.run(run())
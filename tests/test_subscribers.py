@@ -0,0 +1,118 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import subscribers
+from benchmarks.local_client import FloodWaitError, UserIsBlockedError
+from subscribers import FanOut, SubscriberStore
+
+
+class StubClient:
+    """send_message(chat_id, text) sur horloge virtuelle, avec erreurs programmées par chat."""
+
+    def __init__(self, now):
+        self.now = now
+        self.sent = []          # (instant, chat_id, texte)
+        self.errors = {}        # chat_id -> liste d'erreurs levées aux prochains envois
+
+    async def send_message(self, chat_id, text):
+        errors = self.errors.get(chat_id)
+        if errors:
+            raise errors.pop(0)
+        self.sent.append((self.now[0], chat_id, text))
+
+
+@pytest.fixture
+def now(monkeypatch):
+    current = [0.0]
+    real_sleep = asyncio.sleep
+
+    async def virtual_sleep(delay):
+        current[0] += delay
+        await real_sleep(0)
+
+    # La boucle de diffusion attend sur l'horloge virtuelle: aucune vraie pause
+    monkeypatch.setattr(subscribers, 'time', SimpleNamespace(monotonic=lambda: current[0], time=time.time))
+    monkeypatch.setattr(subscribers.asyncio, 'sleep', virtual_sleep)
+    return current
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SubscriberStore(str(tmp_path / 'subscribers.db'))
+    yield store
+    store.close()
+
+
+def deliver_all(fanout, notifications):
+    """Diffuse les notifications et attend que chaque livraison soit livrée, retirée ou en échec."""
+    async def run():
+        fanout.start()
+        expected = sum(fanout.notify(text) for text in notifications)
+        done = lambda: sum(fanout.stats[key] for key in ('delivered', 'removed', 'failed'))  # noqa: E731
+        start = done()
+        while done() - start < expected:
+            await asyncio.sleep(0)
+        await fanout.stop()
+    asyncio.run(run())
+
+
+def test_rate_limited_globally_and_per_chat(now, store):
+    for chat_id in range(1, 6):
+        store.add(chat_id)
+    client = StubClient(now)
+    fanout = FanOut(store, client.send_message, global_rate=2, per_chat_interval=1.0)
+
+    deliver_all(fanout, ['prédiction #10', 'résultat #10'])
+
+    assert len(client.sent) == 10
+    assert fanout.stats['delivered'] == 10
+    per_window = {}
+    last_sent = {}
+    for at, chat_id, text in client.sent:
+        per_window[int(at)] = per_window.get(int(at), 0) + 1
+        if chat_id in last_sent:
+            assert at - last_sent[chat_id][0] >= 1.0
+            assert (last_sent[chat_id][1], text) == ('prédiction #10', 'résultat #10')
+        last_sent[chat_id] = (at, text)
+    assert max(per_window.values()) <= 2
+
+
+def test_blocked_subscriber_is_removed(now, store):
+    for chat_id in (1, 2, 3):
+        store.add(chat_id)
+    client = StubClient(now)
+    client.errors[2] = [UserIsBlockedError()]
+    fanout = FanOut(store, client.send_message)
+
+    deliver_all(fanout, ['prédiction #10'])
+    assert 2 not in store
+    assert fanout.stats['removed'] == 1
+    assert fanout.stats['failed'] == 0
+
+    # Notification suivante (nouvelle boucle): l'abonné retiré n'est plus servi
+    fanout = FanOut(store, client.send_message)
+    deliver_all(fanout, ['résultat #10'])
+    assert sorted(chat_id for _, chat_id, text in client.sent if text == 'résultat #10') == [1, 3]
+    assert fanout.status()['subscribers'] == 2
+    assert fanout.stats['removed'] == 0
+
+
+def test_flood_wait_pauses_delivery_then_retries(now, store):
+    for chat_id in (1, 2):
+        store.add(chat_id)
+    client = StubClient(now)
+    client.errors[1] = [FloodWaitError(30)]
+    fanout = FanOut(store, client.send_message, global_rate=1)
+
+    deliver_all(fanout, ['prédiction #10'])
+
+    assert fanout.stats['flood_waits'] == 1
+    assert fanout.stats['delivered'] == 2
+    assert fanout.stats['failed'] == 0
+    # La livraison refusée est reprise en tête de file après la pause imposée
+    assert [chat_id for _, chat_id, _ in client.sent] == [1, 2]
+    assert client.sent[0][0] >= 30
+    assert 1 in store